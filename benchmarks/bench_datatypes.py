@@ -0,0 +1,78 @@
+# micro benchmark: compares datatypes.classify_value with the literal_eval based classification used before
+# classifies all non-empty values of the sample data in folder data
+# run from any directory: python benchmarks/bench_datatypes.py
+
+import csv
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from ast import literal_eval
+
+REPO_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(REPO_FOLDER, "src"))
+
+import datatypes  # noqa: E402
+
+
+# classification of a value as it was done before datatypes.classify_value
+def classify_value_literal_eval(value):
+    try:
+        dat = literal_eval(value.replace(",", "."))
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return "TEXT"
+    if isinstance(dat, int):
+        return "INTEGER"
+    elif isinstance(dat, float):
+        return "REAL"
+    return "TEXT"
+
+
+# returns all non-empty values of csv and xml files in a folder and its subfolders
+def collect_values(data_folder):
+    values = []
+    for folder, _, filenames in os.walk(data_folder):
+        for filename in filenames:
+            path = os.path.join(folder, filename)
+            if filename.endswith(".csv"):
+                for encoding in ["utf-8-sig", "cp1252"]:
+                    try:
+                        with open(path, newline="", encoding=encoding) as file:
+                            file_values = []
+                            for row in csv.reader(file, delimiter=";"):
+                                file_values.extend([value for value in row if value != ""])
+                        values.extend(file_values)
+                        break
+                    except UnicodeDecodeError:
+                        continue
+            elif filename.endswith(".xml"):
+                try:
+                    for element in ET.parse(path).iter():
+                        if element.text is not None and element.text.strip() != "":
+                            values.append(element.text)
+                except ET.ParseError:
+                    continue
+    return values
+
+
+def main():
+    values = collect_values(os.path.join(REPO_FOLDER, "data"))
+
+    start = time.perf_counter()
+    result_literal_eval = [classify_value_literal_eval(value) for value in values]
+    time_literal_eval = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result_classify = [datatypes.classify_value(value) for value in values]
+    time_classify = time.perf_counter() - start
+
+    differences = sum(1 for a, b in zip(result_literal_eval, result_classify) if a != b)
+    print("values classified:        %s" % len(values))
+    print("literal_eval:             %.3f s" % time_literal_eval)
+    print("classify_value:           %.3f s" % time_classify)
+    print("speedup:                  %.1fx" % (time_literal_eval / time_classify))
+    print("different classification: %s" % differences)
+
+
+if __name__ == "__main__":
+    main()
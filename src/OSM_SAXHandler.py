@@ -1,17 +1,22 @@
 from xml.sax import handler
 
-from ast import literal_eval
+import datatypes
 
 
 # Handler for OSM data
 # Inspects data to find all data keys and data types
+# tree_callback: function that is called with the dictionary of every tree as soon as its node is complete
+# if no callback is given, all trees are collected in a list instead (see get_tree_list())
+# tree_tag: tuple (key, value) of tag, that identifies trees (e.g. ("natural", "tree")). If None, all nodes are trees
 class OSMHandlerInspector(handler.ContentHandler):
 
-    def __init__(self):
+    def __init__(self, tree_callback=None, tree_tag=None):
         handler.ContentHandler.__init__(self)
 
-        self.__attribute_dict = {}
+        self.__inspector = datatypes.DataTypeInspector()  # collects all data keys and their data types
 
+        self.__tree_callback = tree_callback
+        self.__tree_tag = tree_tag
         self.__tree_list = []
         self.__activeTree = None
         
@@ -20,51 +25,37 @@ class OSMHandlerInspector(handler.ContentHandler):
             self.__activeTree = {"OSM_ID": int(atts["id"]),
                                  "X_VALUE": float(atts["lon"]),
                                  "Y_VALUE": float(atts["lat"])}
-            self.__tree_list.append(self.__activeTree)
 
-        if name == "tag":
-            key = atts["k"]
-            value = atts["v"]
+        # tags of ways and relations are ignored, only nodes are trees
+        if name == "tag" and self.__activeTree is not None:
+            self.__activeTree["%s" % atts["k"]] = atts["v"]
 
-            if key not in self.__attribute_dict:
-                self.__attribute_dict[key] = [False, False, False]
-
-            self.check_datatype(key, value)
-
-            self.__activeTree["%s" % key] = value
+    def endElement(self, name):
+        if name == "node":
+            self.add_tree(self.__activeTree)
+            self.__activeTree = None
 
-    def check_datatype(self, key, value):
-        try:
-            dat = literal_eval(value.replace(",", "."))
+    # adds a tree: dictionary with keys OSM_ID, X_VALUE (longitude), Y_VALUE (latitude) and all tags of the node
+    # can also be called directly to add nodes that are not read from xml (e.g. from pbf files)
+    # nodes without tree tag are skipped
+    def add_tree(self, tree):
+        if self.__tree_tag is not None and tree.get(self.__tree_tag[0]) != self.__tree_tag[1]:
+            return
 
-            if not dat:
-                return
+        for key, value in tree.items():
+            if key != "OSM_ID" and key != "X_VALUE" and key != "Y_VALUE":
+                self.__inspector.inspect(key, value)
 
-            if isinstance(dat, int):
-                self.__attribute_dict[key][0] = True
-            elif isinstance(dat, float):
-                self.__attribute_dict[key][1] = True
-            else:
-                self.__attribute_dict[key][2] = True
-        except:
-            self.__attribute_dict[key][2] = True
+        if self.__tree_callback is not None:
+            self.__tree_callback(tree)
+        else:
+            self.__tree_list.append(tree)
 
     def get_columns(self):
         column_list = []
 
-        for key in self.__attribute_dict:
-            int_type_in_list = self.__attribute_dict[key][0]
-            real_type_in_list = self.__attribute_dict[key][1]
-            text_type_in_list = self.__attribute_dict[key][2]
-
-            if int_type_in_list and not real_type_in_list and not text_type_in_list:
-                data_type = "INTEGER"
-            elif real_type_in_list and not text_type_in_list:
-                data_type = "REAL"
-            else:
-                data_type = "TEXT"
-
-            column_list.append(["'%s'" % key, data_type, True])
+        for key in self.__inspector.get_keys():
+            column_list.append(["'%s'" % key, self.__inspector.get_datatype(key), True])
 
         return column_list
 
@@ -2,6 +2,8 @@ import uuid
 import math
 
 import default_gui
+import analysis_core
+import progress_gui
 
 import wx
 
@@ -148,20 +150,6 @@ class CheckDuplicateGeom(default_gui.OnCheckDuplicateGeomDialog):
         if self.DuplicateGrid.GetNumberRows() > 0:
             self.DuplicateGrid.DeleteRows(numRows=self.DuplicateGrid.GetNumberRows())
 
-        # set max value of progressbar in gui
-        num_tablerecords = self.GetParent().db.get_number_of_tablerecords()
-        summands = num_tablerecords
-        summe = 0
-        while summands > 0:
-            summe += summands
-            summands -= 1
-        summe -= num_tablerecords
-        self.gauge.SetRange(summe)
-        self.gauge.SetValue(0)
-
-        # list with result of analysis
-        result_list = []
-
         # list of database columns to be queried
         # collist[0] = ID, collist[1] = xvalue, collist[2] = yvalue
         collist = []
@@ -172,31 +160,22 @@ class CheckDuplicateGeom(default_gui.OnCheckDuplicateGeomDialog):
         idx = self.yvalue.GetSelection()
         collist.append(self.yvalue.GetString(idx))
 
-        # fetch data from database
+        # fetch data from database, find trees closer than threshold (progress of analysis is shown in gauge)
+        # result_list: [id of first tree, id of second tree, distance] for every pair of duplicates
         data_cursor = self.GetParent().db.get_data_for_duplicatecheck_geom(collist)
-        for row in data_cursor:
-            self.gauge.SetValue(self.gauge.GetValue() + 1)
-            # coordinates for calculation
-            x1 = row[1]
-            y1 = row[2]
-            x2 = row[4]
-            y2 = row[5]
-
-            # calculate squared distance between both trees
-            try:
-                dist_sq = (x1 - x2) ** 2 + (y1 - y2) ** 2
-            except TypeError:
-                warningtext = "Cannot perform calculations with values in X or Y column.\n" \
-                              "Value in specified X or Y grid column is most likely not numeric.\n" \
-                              "Was the correct grid column chosen for X and Y value?"
-                msg = wx.MessageDialog(self, warningtext, caption="Error",
-                                       style=wx.OK | wx.CENTRE | wx.ICON_WARNING)
-                msg.ShowModal()
-                return
-
-            if dist_sq < float(self.threshold.GetLineText(0).replace(",", ".")) ** 2:
-                result_list.append([row[0], row[3], math.sqrt(dist_sq)])
-        self.gauge.SetValue(0)
+        threshold = float(self.threshold.GetLineText(0).replace(",", "."))
+        progress = progress_gui.WidgetProgress(self.gauge)
+        try:
+            result_list = analysis_core.find_duplicate_geoms(data_cursor, threshold, progress)
+        except TypeError:
+            warningtext = "Cannot perform calculations with values in X or Y column.\n" \
+                          "Value in specified X or Y grid column is most likely not numeric.\n" \
+                          "Was the correct grid column chosen for X and Y value?"
+            msg = wx.MessageDialog(self, warningtext, caption="Error",
+                                   style=wx.OK | wx.CENTRE | wx.ICON_WARNING)
+            msg.ShowModal()
+            return
+        progress.reset()
 
         # show result in gui
         if len(result_list) > 0:
@@ -620,7 +599,7 @@ class AnalyzeGeometryDialog(default_gui.OnCheckGeometryDialog):
                 except:
                     pass
 
-            analyzer = AnalyzeTreeGeoms(x, y, refheight, height, trunk, crown, crown_height)
+            analyzer = analysis_core.AnalyzeTreeGeoms(x, y, refheight, height, trunk, crown, crown_height)
             valid = True
             message = ""
 
@@ -700,223 +679,3 @@ class AnalyzeGeometryDialog(default_gui.OnCheckGeometryDialog):
 
         if self.crown_height_col.GetSelection() != wx.NOT_FOUND:
             self.__col_settings.set_crown_height(self.crown_height_col.GetStringSelection())
-
-
-class AnalyzeTreeGeoms:
-    # all parameters must be the same unit
-    # trunk and crown must BOTH be diam
-    def __init__(self, x, y, ref, height, trunk_diam, crown_diam, crown_height=None):
-        self.__Height = height
-        self.__TrunkDiam = trunk_diam
-        self.__CrownDiam = crown_diam
-        self.__CrownHeight = crown_height
-
-        self.__x = x
-        self.__y = y
-        self.__ref_height = ref
-
-    def analyze_coordinates(self):
-        valid = True
-        msg = ""
-
-        if self.__x is None:
-            valid = False
-            msg = "No easting value specified"
-
-        if self.__y is None:
-            valid = False
-            msg = "No northing value specified"
-
-        if self.__ref_height is None:
-            valid = False
-            msg = "No reference height value specified"
-
-        return valid, msg
-
-    # analyze values: height
-    def analyze_height(self):
-        valid, msg = self.analyze_coordinates()
-
-        if self.__Height == 0:
-            valid = False
-            msg = "Height is 0"
-        elif self.__Height is None:
-            valid = False
-            msg = "No height value specified"
-        elif self.__Height < 0:
-            valid = False
-            msg = "Hight is smaller that 0"
-
-        return valid, msg
-
-    # analyze values: height, crown
-    def analyze_height_crown(self):
-        valid, msg = self.analyze_height()
-
-        if self.__CrownDiam == 0:
-            valid = False
-            msg = "Crown diameter is 0"
-        elif self.__CrownDiam is None:
-            valid = False
-            msg = "No crown diameter specified"
-        elif self.__CrownDiam < 0:
-            valid = False
-            msg = "Crown diameter is smaller than 0"
-
-        return valid, msg
-
-    # analyze values: height, crown, trunk, crown shape ellipsoid height depends on tree height
-    def analyze_height_crown_trunk(self):
-        valid, msg = self.analyze_height_crown()
-
-        if self.__TrunkDiam == 0:
-            valid = False
-            msg = "Trunk diameter is 0"
-        elif self.__TrunkDiam is None:
-            valid = False
-            msg = "No trunk diameter specified"
-        elif self.__TrunkDiam < 0:
-            valid = False
-            msg = "Trunk diameter is smaller than 0"
-
-        if self.__Height is not None and self.__TrunkDiam is not None and self.__CrownDiam is not None:
-            if self.__TrunkDiam > self.__CrownDiam:
-                valid = False
-                msg = "Trunk diameter is greater than crown diameter"
-            if self.__TrunkDiam > self.__Height:
-                valid = False
-                msg = "Trunk diameter is greater than tree height"
-
-        return valid, msg
-
-    # analyze values: height, crown, trunk for spheric crown shape
-    def analyze_height_crown_trunk_sphere(self):
-        valid, msg = self.analyze_height_crown_trunk()
-
-        if self.__Height is not None and self.__CrownDiam is not None and self.__CrownDiam > self.__Height:
-            valid = False
-            msg = "Crown diameter is greater than tree height"
-
-        return valid, msg
-
-    # analyze values: height, crown, trunk for crown from crown height value
-    def analyze_height_crown_trunk_nosphere(self):
-        valid, msg = self.analyze_height_crown_trunk()
-
-        if self.__CrownHeight == 0:
-            valid = False
-            msg = "Crown height is 0"
-        elif self.__CrownHeight is None:
-            valid = False
-            msg = "No crown height specified"
-        elif self.__CrownHeight < 0:
-            valid = False
-            msg = "Crown height is smaller than 0"
-
-        if self.__Height is not None and self.__CrownHeight is not None and self.__CrownHeight > self.__Height:
-            valid = False
-            msg = "Crown height is greater than tree height."
-
-        return valid, msg
-
-    # method to analyze parameters, Deprecated and not used in Program
-    def analyze_old(self):
-        valid = True
-        msg = ""
-
-        if self.__Height == 0:
-            valid = False
-            msg = "Height is 0"
-        elif self.__Height is None:
-            valid = False
-            msg = "No height value specified"
-        elif self.__Height < 0:
-            valid = False
-            msg = "Hight is smaller that 0"
-
-        if self.__TrunkDiam == 0:
-            valid = False
-            msg = "Trunk diameter is 0"
-        elif self.__TrunkDiam is None:
-            valid = False
-            msg = "No trunk diameter specified"
-        elif self.__TrunkDiam < 0:
-            valid = False
-            msg = "Trunk diameter is smaller than 0"
-
-        if self.__CrownDiam == 0:
-            valid = False
-            msg = "Crown diameter is 0"
-        elif self.__CrownDiam is None:
-            valid = False
-            msg = "No crown diameter specified"
-        elif self.__CrownDiam < 0:
-            valid = False
-            msg = "Crown diameter is smaller than 0"
-
-        if self.__Height is not None and self.__TrunkDiam is not None and self.__CrownDiam is not None:
-            if self.__TrunkDiam > self.__CrownDiam:
-                valid = False
-                msg = "Trunk diameter is greater than crown diameter"
-            if self.__CrownDiam > self.__Height:
-                valid = False
-                msg = "Crown diameter is greater than tree height"
-            if self.__TrunkDiam > self.__Height:
-                valid = False
-                msg = "Trunk diameter is greater than tree height"
-
-        return valid, msg
-
-
-class BoundingBox:
-    def __init__(self):
-        self.__xMin = float("inf")
-        self.__xMax = 0
-        self.__yMin = float("inf")
-        self.__yMax = 0
-        self.__zMin = float("inf")
-        self.__zMax = 0
-
-    def set_xmin(self, val):
-        self.__xMin = val
-
-    def set_ymin(self, val):
-        self.__yMin = val
-
-    def set_zmin(self, val):
-        self.__zMin = val
-
-    def set_xmax(self, val):
-        self.__xMax = val
-
-    def set_ymax(self, val):
-        self.__yMax = val
-
-    def set_zmax(self, val):
-        self.__zMax = val
-
-    # compares coordinates to bbox, extends bbox if necessary
-    def compare(self, x_val, y_val, z_val=1):
-        if x_val < self.__xMin:
-            self.set_xmin(x_val)
-
-        if x_val > self.__xMax:
-            self.set_xmax(x_val)
-
-        if y_val < self.__yMin:
-            self.set_ymin(y_val)
-
-        if y_val > self.__yMax:
-            self.set_ymax(y_val)
-
-        if z_val < self.__zMin:
-            self.set_zmin(z_val)
-
-        if z_val > self.__zMax:
-            self.set_zmax(z_val)
-
-    # returns bounding box coordinates
-    def get_bbox(self):
-        min_vals = [self.__xMin, self.__yMin, self.__zMin]
-        max_vals = [self.__xMax, self.__yMax, self.__zMax]
-        return [min_vals, max_vals]
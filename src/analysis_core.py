@@ -0,0 +1,293 @@
+import math
+
+import progress
+
+# neighbour cells of a grid cell, that are compared with the cell itself (see find_duplicate_geoms)
+# only half of the neighbours are listed, the other half compares with this cell from their side
+FORWARD_NEIGHBOURS = [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]
+
+# grid cells are slightly larger than the threshold: trees closer than the threshold are always in neighbouring
+# cells, also if dividing their coordinates by the cell size is affected by rounding errors
+CELL_SIZE_MARGIN = 1e-6
+
+
+class AnalyzeTreeGeoms:
+    # all parameters must be the same unit
+    # trunk and crown must BOTH be diam
+    def __init__(self, x, y, ref, height, trunk_diam, crown_diam, crown_height=None):
+        self.__Height = height
+        self.__TrunkDiam = trunk_diam
+        self.__CrownDiam = crown_diam
+        self.__CrownHeight = crown_height
+
+        self.__x = x
+        self.__y = y
+        self.__ref_height = ref
+
+    def analyze_coordinates(self):
+        valid = True
+        msg = ""
+
+        if self.__x is None:
+            valid = False
+            msg = "No easting value specified"
+
+        if self.__y is None:
+            valid = False
+            msg = "No northing value specified"
+
+        if self.__ref_height is None:
+            valid = False
+            msg = "No reference height value specified"
+
+        return valid, msg
+
+    # analyze values: height
+    def analyze_height(self):
+        valid, msg = self.analyze_coordinates()
+
+        if self.__Height == 0:
+            valid = False
+            msg = "Height is 0"
+        elif self.__Height is None:
+            valid = False
+            msg = "No height value specified"
+        elif self.__Height < 0:
+            valid = False
+            msg = "Hight is smaller that 0"
+
+        return valid, msg
+
+    # analyze values: height, crown
+    def analyze_height_crown(self):
+        valid, msg = self.analyze_height()
+
+        if self.__CrownDiam == 0:
+            valid = False
+            msg = "Crown diameter is 0"
+        elif self.__CrownDiam is None:
+            valid = False
+            msg = "No crown diameter specified"
+        elif self.__CrownDiam < 0:
+            valid = False
+            msg = "Crown diameter is smaller than 0"
+
+        return valid, msg
+
+    # analyze values: height, crown, trunk, crown shape ellipsoid height depends on tree height
+    def analyze_height_crown_trunk(self):
+        valid, msg = self.analyze_height_crown()
+
+        if self.__TrunkDiam == 0:
+            valid = False
+            msg = "Trunk diameter is 0"
+        elif self.__TrunkDiam is None:
+            valid = False
+            msg = "No trunk diameter specified"
+        elif self.__TrunkDiam < 0:
+            valid = False
+            msg = "Trunk diameter is smaller than 0"
+
+        if self.__Height is not None and self.__TrunkDiam is not None and self.__CrownDiam is not None:
+            if self.__TrunkDiam > self.__CrownDiam:
+                valid = False
+                msg = "Trunk diameter is greater than crown diameter"
+            if self.__TrunkDiam > self.__Height:
+                valid = False
+                msg = "Trunk diameter is greater than tree height"
+
+        return valid, msg
+
+    # analyze values: height, crown, trunk for spheric crown shape
+    def analyze_height_crown_trunk_sphere(self):
+        valid, msg = self.analyze_height_crown_trunk()
+
+        if self.__Height is not None and self.__CrownDiam is not None and self.__CrownDiam > self.__Height:
+            valid = False
+            msg = "Crown diameter is greater than tree height"
+
+        return valid, msg
+
+    # analyze values: height, crown, trunk for crown from crown height value
+    def analyze_height_crown_trunk_nosphere(self):
+        valid, msg = self.analyze_height_crown_trunk()
+
+        if self.__CrownHeight == 0:
+            valid = False
+            msg = "Crown height is 0"
+        elif self.__CrownHeight is None:
+            valid = False
+            msg = "No crown height specified"
+        elif self.__CrownHeight < 0:
+            valid = False
+            msg = "Crown height is smaller than 0"
+
+        if self.__Height is not None and self.__CrownHeight is not None and self.__CrownHeight > self.__Height:
+            valid = False
+            msg = "Crown height is greater than tree height."
+
+        return valid, msg
+
+    # method to analyze parameters, Deprecated and not used in Program
+    def analyze_old(self):
+        valid = True
+        msg = ""
+
+        if self.__Height == 0:
+            valid = False
+            msg = "Height is 0"
+        elif self.__Height is None:
+            valid = False
+            msg = "No height value specified"
+        elif self.__Height < 0:
+            valid = False
+            msg = "Hight is smaller that 0"
+
+        if self.__TrunkDiam == 0:
+            valid = False
+            msg = "Trunk diameter is 0"
+        elif self.__TrunkDiam is None:
+            valid = False
+            msg = "No trunk diameter specified"
+        elif self.__TrunkDiam < 0:
+            valid = False
+            msg = "Trunk diameter is smaller than 0"
+
+        if self.__CrownDiam == 0:
+            valid = False
+            msg = "Crown diameter is 0"
+        elif self.__CrownDiam is None:
+            valid = False
+            msg = "No crown diameter specified"
+        elif self.__CrownDiam < 0:
+            valid = False
+            msg = "Crown diameter is smaller than 0"
+
+        if self.__Height is not None and self.__TrunkDiam is not None and self.__CrownDiam is not None:
+            if self.__TrunkDiam > self.__CrownDiam:
+                valid = False
+                msg = "Trunk diameter is greater than crown diameter"
+            if self.__CrownDiam > self.__Height:
+                valid = False
+                msg = "Crown diameter is greater than tree height"
+            if self.__TrunkDiam > self.__Height:
+                valid = False
+                msg = "Trunk diameter is greater than tree height"
+
+        return valid, msg
+
+
+class BoundingBox:
+    def __init__(self):
+        self.__xMin = float("inf")
+        self.__xMax = 0
+        self.__yMin = float("inf")
+        self.__yMax = 0
+        self.__zMin = float("inf")
+        self.__zMax = 0
+
+    def set_xmin(self, val):
+        self.__xMin = val
+
+    def set_ymin(self, val):
+        self.__yMin = val
+
+    def set_zmin(self, val):
+        self.__zMin = val
+
+    def set_xmax(self, val):
+        self.__xMax = val
+
+    def set_ymax(self, val):
+        self.__yMax = val
+
+    def set_zmax(self, val):
+        self.__zMax = val
+
+    # compares coordinates to bbox, extends bbox if necessary
+    def compare(self, x_val, y_val, z_val=1):
+        if x_val < self.__xMin:
+            self.set_xmin(x_val)
+
+        if x_val > self.__xMax:
+            self.set_xmax(x_val)
+
+        if y_val < self.__yMin:
+            self.set_ymin(y_val)
+
+        if y_val > self.__yMax:
+            self.set_ymax(y_val)
+
+        if z_val < self.__zMin:
+            self.set_zmin(z_val)
+
+        if z_val > self.__zMax:
+            self.set_zmax(z_val)
+
+    # returns bounding box coordinates
+    def get_bbox(self):
+        min_vals = [self.__xMin, self.__yMin, self.__zMin]
+        max_vals = [self.__xMax, self.__yMax, self.__zMax]
+        return [min_vals, max_vals]
+
+
+# finds pairs of trees, that are closer to each other than threshold (2D distance)
+# trees: iterable of (id, x, y), in order of rows in database
+# trees are sorted into a grid of square cells with edge length threshold, a tree is only compared with
+# trees in its own and in neighbouring cells. Runtime grows almost linearly with number of trees
+# returns list of [id of first tree, id of second tree, distance], ordered like pairs of trees in the table
+# (by position of first tree, then of second tree). Raises TypeError, if a coordinate is not a number
+# reporter: ProgressReporter (see module progress), progress value is number of processed grid cells
+def find_duplicate_geoms(trees, threshold, reporter=None):
+    if reporter is None:
+        reporter = progress.ProgressReporter()
+
+    trees = list(trees)
+    if len(trees) < 2:
+        return []  # no pairs to compare
+    for tree in trees:
+        for value in tree[1:3]:
+            if not isinstance(value, (int, float)):
+                raise TypeError("Coordinate is not a number: %r" % (value,))
+
+    threshold_sq = threshold ** 2
+    if threshold_sq == 0:
+        return []  # no distance is smaller than 0
+    cell_size = abs(threshold) * (1 + CELL_SIZE_MARGIN)
+
+    # sort trees into grid cells: {(column, row): list of tree positions}
+    # trees without finite coordinates are never closer than threshold to another tree
+    grid = {}
+    for position, tree in enumerate(trees):
+        col = tree[1] / cell_size
+        row = tree[2] / cell_size
+        if not (math.isfinite(col) and math.isfinite(row)):
+            continue
+        grid.setdefault((math.floor(col), math.floor(row)), []).append(position)
+
+    # compare trees of every cell with trees of the same cell and of neighbouring cells
+    # positions in cells are ascending, first tree of a pair is always the one with the lower position
+    # candidate pairs are generated lazily, so cells with many trees do not allocate all their pairs at once
+    pairs = []
+    reporter.start(len(grid))
+    for (col, row), cell in grid.items():
+        for col_offset, row_offset in FORWARD_NEIGHBOURS:
+            if col_offset == 0 and row_offset == 0:
+                candidates = ((cell[i], cell[j]) for i in range(len(cell)) for j in range(i + 1, len(cell)))
+            else:
+                neighbour = grid.get((col + col_offset, row + row_offset))
+                if neighbour is None:
+                    continue
+                candidates = ((min(a, b), max(a, b)) for a in cell for b in neighbour)
+
+            for first, second in candidates:
+                x1, y1 = trees[first][1], trees[first][2]
+                x2, y2 = trees[second][1], trees[second][2]
+                dist_sq = (x1 - x2) ** 2 + (y1 - y2) ** 2
+                if dist_sq < threshold_sq:
+                    pairs.append((first, second, dist_sq))
+        reporter.advance()
+    reporter.finish()
+
+    pairs.sort()
+    return [[trees[first][0], trees[second][0], math.sqrt(dist_sq)] for first, second, dist_sq in pairs]
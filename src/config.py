@@ -104,6 +104,33 @@ class ColumnNames:
     def get_geom(self):
         return self.__geom
 
+    # returns all column settings as dictionary, e.g. to store them in a project file
+    def get_settings(self):
+        return {"id": self.__id,
+                "x": self.__x,
+                "y": self.__y,
+                "ref_height": self.__RefHeight,
+                "tree_height": [self.__TreeHeight, self.__TreeHeightUnit],
+                "trunk_diam": [self.__TrunkDiam, self.__TrunkDiamMode, self.__TrunkDiamUnit],
+                "crown_diam": [self.__CrownDiam, self.__CrownDiamMode, self.__CrownDiamUnit],
+                "class": self.__Class,
+                "species": self.__Species,
+                "crown_height": self.__CrownHeight,
+                "geom": self.__geom}
+
+    # restores column settings from a dictionary created by get_settings()
+    def set_settings(self, settings):
+        self.set_id(settings.get("id"))
+        self.set_coordinates(settings.get("x"), settings.get("y"))
+        self.set_ref_height(settings.get("ref_height"))
+        self.set_tree_height(*settings.get("tree_height", [None, None]))
+        self.set_trunk_diam(*settings.get("trunk_diam", [None, None, None]))
+        self.set_crown_diam(*settings.get("crown_diam", [None, None, None]))
+        self.set_class(settings.get("class"))
+        self.set_species(settings.get("species"))
+        self.set_crown_height(settings.get("crown_height"))
+        self.set_geom(settings.get("geom"))
+
 
 def get_program_name():
     return "tree3d"
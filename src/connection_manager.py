@@ -0,0 +1,274 @@
+# this module manages all connections to the database file of the program
+# connections are opened once with spatialite loaded and spatial metadata initialized
+# released connections are kept open and handed out again, so following enrichment or export steps
+# do not need to load spatialite again
+# bulk updates write values of many rows through a connection with a single statement
+
+import hashlib
+import sqlite3
+import threading
+
+# performance profiles: settings (pragmas) of connections for different kinds of work
+# journal_mode is a setting of the database file, not of a connection. All profiles use write-ahead logging,
+# so connections of the gui thread and worker threads (enrichment, export) can read while another one writes
+# other pragmas only affect the connection they are applied to
+# cache_size: negative values are KiB, mmap_size: bytes, temp_store: 0 = default, 2 = memory
+PROFILES = {"safe": [["journal_mode", "WAL"],
+                     ["synchronous", "FULL"],
+                     ["cache_size", -2000],
+                     ["mmap_size", 0],
+                     ["temp_store", 0]],
+            "bulk-import": [["journal_mode", "WAL"],
+                            ["synchronous", "OFF"],
+                            ["cache_size", -262144],
+                            ["mmap_size", 268435456],
+                            ["temp_store", 2]],
+            "read-heavy export": [["journal_mode", "WAL"],
+                                  ["synchronous", "NORMAL"],
+                                  ["cache_size", -131072],
+                                  ["mmap_size", 1073741824],
+                                  ["temp_store", 2]]}
+
+DEFAULT_PROFILE = "safe"  # profile of connections, if no other profile is selected
+BULK_IMPORT_PROFILE = "bulk-import"  # profile used during imports of files and OSM data
+EXPORT_PROFILE = "read-heavy export"  # profile used during export
+
+
+# returns uri of a shared in-memory database
+# all connections opened with this uri use the same database, as long as one of them is open
+# name: unique name of database (e.g. path the database would be stored at)
+def get_memory_database_uri(name):
+    return "file:tree3d_%s?mode=memory&cache=shared" % hashlib.md5(name.encode("utf-8")).hexdigest()
+
+
+# returns True, if path is uri of an in-memory database
+def is_memory_database(databasepath):
+    return databasepath.startswith("file:") and "mode=memory" in databasepath
+
+
+# custom exception: performance profile does not exist
+class UnknownProfileException(Exception):
+    pass
+
+
+# custom exception: performance profile cannot be applied, since connection has uncommitted changes
+class OpenTransactionException(Exception):
+    pass
+
+
+# applies performance profile to a connection
+# journal mode and synchronous cannot be changed in a transaction: pending changes must be committed by the caller
+# raises UnknownProfileException, if profile does not exist
+# raises OpenTransactionException, if connection has uncommitted changes
+def apply_profile(con, profile):
+    if profile not in PROFILES:
+        raise UnknownProfileException("Unknown performance profile: %s" % profile)
+    if con.in_transaction:
+        raise OpenTransactionException("Performance profile cannot be changed: connection has uncommitted changes")
+    for pragma, value in PROFILES[profile]:
+        if pragma == "journal_mode":
+            current = con.execute("PRAGMA journal_mode;").fetchone()[0]
+            if current.upper() == value or current == "memory":
+                continue  # journal mode of in-memory databases cannot be changed
+            try:
+                con.execute("PRAGMA journal_mode = %s;" % value)
+            except sqlite3.OperationalError:
+                pass  # database is locked by another connection: journal mode is changed by next connection
+        else:
+            con.execute("PRAGMA %s = %s;" % (pragma, value))
+
+
+# pool of open database connections, grouped by database file
+class ConnectionPool:
+    def __init__(self):
+        self.__lock = threading.Lock()  # connections are requested by the gui thread and by worker threads
+        self.__idle = {}  # database path: list of released connections, ready to be handed out again
+        self.__open = {}  # database path: list of all open connections (idle and in use)
+        self.__spatialite_status = {}  # connection: [True/False if spatialite is loaded, error message]
+        self.__profiles = {}  # connection: name of performance profile currently applied to connection
+        self.__default_profiles = {}  # database path: profile of connections, if no profile is requested
+
+    # returns connection to database file with spatialite loaded (if possible)
+    # an idle connection is reused, a new connection is only opened if all connections are in use
+    # profile: performance profile of connection. If None, default profile of database file is used
+    def get_connection(self, databasepath, profile=None):
+        if profile is None:
+            profile = self.get_default_profile(databasepath)
+        if profile not in PROFILES:
+            raise UnknownProfileException("Unknown performance profile: %s" % profile)
+
+        con = None
+        with self.__lock:
+            idle = self.__idle.get(databasepath, [])
+            if idle:
+                con = idle.pop()
+
+        if con is None:
+            con = self.open_connection(databasepath)
+            with self.__lock:
+                self.__open.setdefault(databasepath, []).append(con)
+        self.set_profile(con, profile)
+        return con
+
+    # applies performance profile to a connection, if it does not use this profile already
+    def set_profile(self, con, profile):
+        if self.__profiles.get(con) != profile:
+            apply_profile(con, profile)
+            self.__profiles[con] = profile
+
+    # returns name of performance profile applied to a connection
+    def get_profile(self, con):
+        return self.__profiles.get(con)
+
+    # sets profile of connections to a database file, that are requested without profile
+    def set_default_profile(self, databasepath, profile):
+        if profile not in PROFILES:
+            raise UnknownProfileException("Unknown performance profile: %s" % profile)
+        self.__default_profiles[databasepath] = profile
+
+    # returns profile of connections to a database file, that are requested without profile
+    def get_default_profile(self, databasepath):
+        return self.__default_profiles.get(databasepath, DEFAULT_PROFILE)
+
+    # opens a new connection, loads spatialite and initializes spatial metadata, if it does not exist yet
+    # connection may be used by other threads, after it has been released
+    def open_connection(self, databasepath):
+        con = sqlite3.connect(databasepath, check_same_thread=False, uri=True)
+        if is_memory_database(databasepath):
+            # connections to shared in-memory databases lock tables, not the database:
+            # readers do not wait for tables locked by a writer
+            con.execute("PRAGMA read_uncommitted = 1;")
+        status = [False, ""]
+        try:
+            con.enable_load_extension(True)
+            con.execute('SELECT load_extension("mod_spatialite");')
+            cursor = con.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' "
+                                 "AND name = 'spatial_ref_sys';")
+            if cursor.fetchone()[0] == 0:
+                con.execute('SELECT InitSpatialMetaData(1);')
+                con.commit()
+            status[0] = True
+        except (sqlite3.OperationalError, AttributeError) as e:
+            status[1] = str(e)
+        self.__spatialite_status[con] = status
+        return con
+
+    # returns status of spatialite of a connection: [True/False if spatialite is loaded, error message]
+    def get_spatialite_status(self, con):
+        return self.__spatialite_status.get(con, [False, ""])
+
+    # hands connection back to the pool
+    # uncommitted changes are rolled back, so the next user gets a connection without open transaction
+    def release_connection(self, con):
+        if con.in_transaction:
+            con.rollback()
+        with self.__lock:
+            for databasepath, connections in self.__open.items():
+                if con in connections:
+                    if con not in self.__idle.setdefault(databasepath, []):
+                        self.__idle[databasepath].append(con)
+                    return
+        con.close()  # connection does not belong to pool (anymore)
+
+    # closes all connections to a database file (e.g. before the file is deleted)
+    # if databasepath is None, all connections of all database files are closed
+    def close_connections(self, databasepath=None):
+        with self.__lock:
+            if databasepath is None:
+                paths = list(self.__open.keys())
+            else:
+                paths = [databasepath]
+            for path in paths:
+                for con in self.__open.pop(path, []):
+                    self.__spatialite_status.pop(con, None)
+                    self.__profiles.pop(con, None)
+                    con.close()
+                self.__idle.pop(path, None)
+
+
+POOL = ConnectionPool()
+
+
+# returns connection to database file from pool of the program
+# profile: performance profile of connection. If None, default profile of database file is used
+def get_connection(databasepath, profile=None):
+    return POOL.get_connection(databasepath, profile)
+
+
+# applies performance profile to a connection of the pool
+def set_profile(con, profile):
+    POOL.set_profile(con, profile)
+
+
+# returns name of performance profile applied to a connection of the pool
+def get_profile(con):
+    return POOL.get_profile(con)
+
+
+# sets profile of connections to a database file, that are requested without profile
+def set_default_profile(databasepath, profile):
+    POOL.set_default_profile(databasepath, profile)
+
+
+# hands connection back to pool of the program
+def release_connection(con):
+    POOL.release_connection(con)
+
+
+# returns status of spatialite of a connection: [True/False if spatialite is loaded, error message]
+def get_spatialite_status(con):
+    return POOL.get_spatialite_status(con)
+
+
+# closes all connections to a database file, or all connections if databasepath is None
+def close_connections(databasepath=None):
+    POOL.close_connections(databasepath)
+
+
+BULK_UPDATE_TABLE_NAME = "bulk_update_values"  # temporary table, in which values of bulk updates are staged
+BULK_UPDATE_BATCH_SIZE = 10000  # number of values that are collected by BulkUpdate before they are written
+
+
+# writes values into a column of a table: every row gets the value of its key
+# values: list of (key, value) tuples. Keys are compared with key column (or lowercase key column)
+# values are bound as parameters and staged in a temporary table with primary key,
+# table is updated with one statement, so every row is looked up only once (no statement per row)
+def bulk_update(con, tablename, insert_col, key_col, values, key_lowercase=False):
+    con.execute("CREATE TEMP TABLE IF NOT EXISTS %s (key PRIMARY KEY, value);" % BULK_UPDATE_TABLE_NAME)
+    con.execute("DELETE FROM temp.%s;" % BULK_UPDATE_TABLE_NAME)
+    con.executemany("INSERT OR REPLACE INTO temp.%s (key, value) VALUES (?, ?);" % BULK_UPDATE_TABLE_NAME, values)
+
+    if key_lowercase:
+        key_expression = 'lower(%s."%s")' % (tablename, key_col)
+    else:
+        key_expression = '%s."%s"' % (tablename, key_col)
+    con.execute('UPDATE %s SET "%s" = (SELECT value FROM temp.%s WHERE key = %s) '
+                'WHERE %s IN (SELECT key FROM temp.%s);'
+                % (tablename, insert_col, BULK_UPDATE_TABLE_NAME, key_expression,
+                   key_expression, BULK_UPDATE_TABLE_NAME))
+    con.execute("DELETE FROM temp.%s;" % BULK_UPDATE_TABLE_NAME)
+
+
+# collects values of a column row by row and writes them with bulk_update() in batches
+# flush() must be called after the last value has been added
+class BulkUpdate:
+    def __init__(self, con, tablename, insert_col, key_col, key_lowercase=False):
+        self.__con = con
+        self.__TableName = tablename
+        self.__InsertCol = insert_col
+        self.__KeyCol = key_col
+        self.__KeyLowercase = key_lowercase
+        self.__values = []  # (key, value) tuples waiting to be written
+
+    # adds value of row with key. Values are written, when batch is full
+    def add(self, key, value):
+        self.__values.append((key, value))
+        if len(self.__values) >= BULK_UPDATE_BATCH_SIZE:
+            self.flush()
+
+    # writes all collected values
+    def flush(self):
+        if self.__values:
+            bulk_update(self.__con, self.__TableName, self.__InsertCol, self.__KeyCol, self.__values,
+                        self.__KeyLowercase)
+            self.__values = []
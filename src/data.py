@@ -1,14 +1,29 @@
 import os
+import array
+import bz2
+import functools
 import csv
+import gzip
+import math
+import json
+import random
 import sqlite3
-from ast import literal_eval
 import xml.etree.ElementTree as ET
 import xml.sax
 
-import requests
-from pyproj import CRS, Transformer
-
 import OSM_SAXHandler
+import connection_manager
+import osm_pbf
+import overpass
+import datatypes
+import config
+import geometry
+
+PROJECT_TABLE_NAME = "tree3d_project"  # name of table in project files, that stores program state
+
+# xml files are only imported with streaming import by default, if at least this many tree elements are inspected
+# with smaller inspection limits, columns appearing after inspection would often be TEXT columns at the end of the table
+XML_STREAMING_MIN_INSPECTION_LIMIT = 100
 
 # custom exception: Too many items in a line:More than in table headers (used in CSV only)
 class TooManyItemsException(Exception):
@@ -20,20 +35,61 @@ class NotEnoughItemsException(Exception):
     pass
 
 
+# custom exception: File is not a tree3d project file (used when opening projects only)
+class InvalidProjectException(Exception):
+    pass
+
+
+# custom exception: import has been cancelled by user (see Database.cancel_import)
+class ImportCancelledException(Exception):
+    pass
+
+
+# decorator for import methods: database connection uses the import performance profile while data is imported
+# afterwards, the performance profile of the database is restored (also if import fails)
+# rows inserted by a failed or cancelled import are rolled back, before the profile is restored
+def bulk_import(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._ImportCancelled = False
+        connection_manager.set_profile(self._DbConnection, self._ImportProfile)
+        try:
+            return method(self, *args, **kwargs)
+        except BaseException:
+            self._DbConnection.rollback()
+            raise
+        finally:
+            connection_manager.set_profile(self._DbConnection, self._PerformanceProfile)
+    return wrapper
+
+
 class Database:
-    def __init__(self):
+    # dbfilepath: path of database file. If None, database is stored in temporary folder (see below)
+    # a separate path is needed to work with multiple databases at the same time (e.g. in parallel processes)
+    # in_memory: if True, database is not stored in a file but in memory (faster, if data fits into memory)
+    # the in-memory database is named after dbfilepath and shared by all connections of the program
+    # it only exists until the database is deleted, save_project() persists it
+    def __init__(self, dbfilepath=None, in_memory=False):
 
         self._DbFolderPath = ""  # Path to the folder where the database is stored
-        self.create_default_database_path()
-        self._DbFilePath = self.generate_filepath('\\tree3d_db.sqlite')
+        if dbfilepath is None:
+            self.create_default_database_path()
+            self._DbFilePath = self.generate_filepath('\\tree3d_db.sqlite')
+        else:
+            self._DbFolderPath = os.path.dirname(os.path.abspath(dbfilepath))
+            self._DbFilePath = dbfilepath
+        if in_memory:
+            self._DbFilePath = connection_manager.get_memory_database_uri(self._DbFilePath)
+        self._InMemory = in_memory
 
-        # Delete database file and folder
-        if os.path.exists(self._DbFilePath):
-            self.delete_db_file()
+        # Delete database file (or in-memory database) and folder
+        self.delete_db_file()
         if not os.path.exists(self._DbFolderPath):
             os.makedirs(self._DbFolderPath)
 
         self._SpatiaLiteLoaded = [False, ""]  # String gives error message if False, indicates if spatialite was loaded
+        self._PerformanceProfile = connection_manager.DEFAULT_PROFILE  # performance profile of database connection
+        self._ImportProfile = connection_manager.BULK_IMPORT_PROFILE  # performance profile used during imports
         self._DbConnection = None
         self._DbCursor = None
         self.establish_db_connection()  # connect to database
@@ -42,6 +98,7 @@ class Database:
         self._lTableColmnNames = []  # list of all table column names
 
         self._SQLGetAllDataStatement = ""  # SQL Statement to get all data
+        self._SQLSelectColumns = ""  # column part of SQL Statement to get all data (without SELECT and FROM)
 
         self._CreateTwoColID = False  # variable to determine weather a tree id should be created
         self._CreateTwoColIDColumns = []  # list storing the list-indexes of columns, from which id should be created
@@ -50,6 +107,13 @@ class Database:
         self._CreateRowid = False  # variable to determine weather sqlite rowid should be used
 
         self._ContainsGeom = False  # variable to indicate, if geom object has been generated
+        self._InvalidGeomCount = 0  # number of rows, whose coordinates could not be converted (see add_geometries)
+
+        self._IndexedColumns = set()  # columns of tree table known to have an index (see create_id_index)
+        self._SortPermutations = {}  # column: (data version, rowids sorted by column), see get_sort_permutation
+
+        self._ProgressReporter = None  # reports progress of imports (see set_progress_reporter)
+        self._ImportCancelled = False  # True, if running import should be stopped
 
     # Creates Database Path
     # Database is stored in temporary folder by default
@@ -67,10 +131,14 @@ class Database:
         path = path + '\\tree3d_data'
         self._DbFolderPath = path
 
-    # returns path of database file
+    # returns path of database file (uri of in-memory database)
     def get_db_filepath(self):
         return self._DbFilePath
 
+    # returns True, if database is stored in memory
+    def get_in_memory(self):
+        return self._InMemory
+
     # creates the database table to store the csv in
     # method may be vulnerable to sql injections
     def create_db_table(self):
@@ -130,25 +198,41 @@ class Database:
     def reset_database_table(self):
         self._DbCursor.execute("DROP TABLE IF EXISTS %s" % self._DbTreeTableName)
         self._lTableColmnNames = []
+        self._IndexedColumns = set()
+        self._SortPermutations = {}
         self._DbConnection.commit()
 
     # establishes database_connection: Creates Database File, Connection and Cursor
+    # connection is taken from connection pool, spatialite is already loaded
     def establish_db_connection(self):
-        self._DbConnection = sqlite3.connect(self._DbFilePath)
+        self._DbConnection = connection_manager.get_connection(self._DbFilePath, self._PerformanceProfile)
         self._DbCursor = self._DbConnection.cursor()
-        self._DbConnection.enable_load_extension(True)
-        try:
-            self._DbConnection.execute('SELECT load_extension("mod_spatialite")')
-            self._DbConnection.execute('SELECT InitSpatialMetaData(1);')
-            self._DbConnection.commit()
-            self._SpatiaLiteLoaded[0] = True
-        except sqlite3.OperationalError as e:
-            self._SpatiaLiteLoaded[1] = str(e)
+        self._SpatiaLiteLoaded = list(connection_manager.get_spatialite_status(self._DbConnection))
 
-    # closes database connection
+    # closes database connection: connection is handed back to connection pool
     def close_db_connection(self):
         if self._DbConnection is not None:
-            self._DbConnection.close()
+            connection_manager.release_connection(self._DbConnection)
+            self._DbConnection = None
+
+    # sets performance profile of database connection (see connection_manager.PROFILES)
+    # connections of enrichment steps use this profile as well, unless they request another profile
+    # pending changes must be committed before (see connection_manager.apply_profile)
+    # profile is applied to the connection first: if this fails, default profile of database is not changed either
+    def set_performance_profile(self, profile):
+        connection_manager.set_profile(self._DbConnection, profile)
+        connection_manager.set_default_profile(self._DbFilePath, profile)
+        self._PerformanceProfile = profile
+
+    # returns name of performance profile of database connection
+    def get_performance_profile(self):
+        return self._PerformanceProfile
+
+    # sets performance profile, that is used while data is imported
+    def set_import_profile(self, profile):
+        if profile not in connection_manager.PROFILES:
+            raise connection_manager.UnknownProfileException("Unknown performance profile: %s" % profile)
+        self._ImportProfile = profile
 
     # deletes database folder. If folder isnt empty: catch exception and do nothing
     def delete_db_folder(self):
@@ -159,7 +243,9 @@ class Database:
             pass
 
     # deletes database file
+    # all connections to database are closed, in-memory database is discarded when its last connection is closed
     def delete_db_file(self):
+        connection_manager.close_connections(self._DbFilePath)
         i = 1
         while os.path.exists(self._DbFilePath):
             try:
@@ -189,15 +275,14 @@ class Database:
     # generates SQL Statement to fetch all Data from Database table
     # Only Select, no sorting, no conditions etc
     def generate_sql_statement(self):
-        statement = "SELECT "
+        columns = ""
         for colname in self.get_column_names():
             if colname == "geom":
-                statement += 'AsText("geom"), '
+                columns += 'AsText("geom"), '
             else:
-                statement += '"%s", ' % colname
-        statement = statement[:-2]
-        statement += " FROM %s;" % self._DbTreeTableName
-        self._SQLGetAllDataStatement = statement
+                columns += '"%s", ' % colname
+        self._SQLSelectColumns = columns[:-2]
+        self._SQLGetAllDataStatement = "SELECT %s FROM %s;" % (self._SQLSelectColumns, self._DbTreeTableName)
 
     # fetches and returns table data from database
     def get_data(self):
@@ -217,6 +302,71 @@ class Database:
         self._DbCursor.execute(statement)
         return self._DbCursor
 
+    # fetches one page of table data (keyset pagination): only the requested rows are read from database
+    # page_size: maximum number of rows of page
+    # after: key of last row of previous page (returned by previous call), None for first page
+    # sort_col: rows are sorted by this column (and by rowid, if values are equal). If None, rows are sorted by rowid
+    # condition: optional sql condition (without WHERE) to filter rows, parameters: values of ? in condition
+    # offset: number of rows to skip (only needed to jump to a page, whose previous page is unknown)
+    # returns list of rows and key of last row, which is None if there are no more pages
+    def get_data_page(self, page_size, after=None, sort_col=None, descending=False, condition=None, parameters=(),
+                      offset=0):
+        if sort_col is None:
+            sort_expression = "rowid"
+        else:
+            sort_expression = '"%s"' % sort_col
+        conditions = []
+        parameters = list(parameters)
+        if condition is not None:
+            conditions.append("(%s)" % condition)
+
+        # rows after the key of the last row of the previous page
+        # NULL values are sorted first in ascending order and last in descending order
+        if after is not None:
+            last_value, last_rowid = after
+            if sort_col is None:
+                conditions.append("rowid %s ?" % ("<" if descending else ">"))
+                parameters.append(last_rowid)
+            elif not descending and last_value is None:
+                conditions.append("((%s IS NULL AND rowid > ?) OR %s IS NOT NULL)" % (sort_expression, sort_expression))
+                parameters.append(last_rowid)
+            elif not descending:
+                conditions.append("(%s > ? OR (%s = ? AND rowid > ?))" % (sort_expression, sort_expression))
+                parameters.extend([last_value, last_value, last_rowid])
+            elif last_value is None:
+                conditions.append("(%s IS NULL AND rowid < ?)" % sort_expression)
+                parameters.append(last_rowid)
+            else:
+                conditions.append("(%s < ? OR (%s = ? AND rowid < ?) OR %s IS NULL)"
+                                  % (sort_expression, sort_expression, sort_expression))
+                parameters.extend([last_value, last_value, last_rowid])
+
+        direction = "DESC" if descending else "ASC"
+        statement = "SELECT %s, %s, rowid FROM %s" % (self._SQLSelectColumns, sort_expression, self._DbTreeTableName)
+        if conditions:
+            statement += " WHERE " + " AND ".join(conditions)
+        statement += " ORDER BY %s %s, rowid %s LIMIT ? OFFSET ?;" % (sort_expression, direction, direction)
+        parameters.extend([page_size + 1, offset])  # one more row: shows if there is another page
+
+        rows = self._DbConnection.execute(statement, parameters).fetchall()
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last_key = (rows[-1][-2], rows[-1][-1])
+        else:
+            last_key = None
+        return [row[:-2] for row in rows], last_key
+
+    # iterates over table data page by page (see get_data_page), so the table is never held in memory at once
+    # yields lists of rows
+    def iter_data_pages(self, page_size, sort_col=None, descending=False, condition=None, parameters=()):
+        last_key = None
+        while True:
+            rows, last_key = self.get_data_page(page_size, last_key, sort_col, descending, condition, parameters)
+            if rows:
+                yield rows
+            if last_key is None:
+                return
+
     # alters sql statement to perform SELECT DISTINCT, includes WHERE condition
     def get_data_with_condition_distinct(self, wherestatement):
         statement = self._SQLGetAllDataStatement[0:7] + "DISTINCT " + self._SQLGetAllDataStatement[7:-1]
@@ -251,14 +401,12 @@ class Database:
         self._DbCursor.execute(statement)
         return self._DbCursor
 
-    # get data in a form so that it can find duplicates based on geometry
+    # get data to find duplicates based on geometry: id, x and y value of every tree, in order of rowid
+    # collist: [id column, x column, y column]
     def get_data_for_duplicatecheck_geom(self, collist):
         # generate sql statement
-        statement = "SELECT "
-        statement += 't1."%s", t1."%s", t1."%s", ' % (collist[0], collist[1], collist[2])
-        statement += 't2."%s", t2."%s", t2."%s" ' % (collist[0], collist[1], collist[2])
-        statement += "FROM %s as t1, %s as t2 " % (self._DbTreeTableName, self._DbTreeTableName)
-        statement += "WHERE t2.rowid > t1.rowid;"
+        statement = 'SELECT "%s", "%s", "%s" ' % (collist[0], collist[1], collist[2])
+        statement += "FROM %s ORDER BY rowid;" % self._DbTreeTableName
         self._DbCursor.execute(statement)
         return self._DbCursor
 
@@ -297,10 +445,128 @@ class Database:
         self.add_col_to_collist("geom", "GEOM")
         self.generate_sql_statement()
 
+    # creates point geometries from x and y value columns and stores them in new column "geom"
+    # geometries of all rows are created with one statement. Numeric coordinates are passed to MakePoint directly,
+    # text values are parsed as WKT (like point geometries created one by one), unparseable values result in NULL
+    # returns False if geometries could not be created. All changes are rolled back in this case
+    # number of rows with coordinates, that could not be converted to a point, is available with get_invalid_geom_count
+    def add_geometries(self, xcol, ycol, epsg):
+        self.add_geom_col(epsg)
+        self._InvalidGeomCount = 0
+
+        epsg = int(epsg)
+        statement = 'UPDATE %s SET "geom" = CASE ' \
+                    "WHEN typeof(\"%s\") IN ('integer', 'real') AND typeof(\"%s\") IN ('integer', 'real') " \
+                    'THEN MakePoint("%s", "%s", ?) ' \
+                    "ELSE GeomFromText('POINT(' || \"%s\" || ' ' || \"%s\" || ')', ?) END;" \
+                    % (self._DbTreeTableName, xcol, ycol, xcol, ycol, xcol, ycol)
+        try:
+            self._DbCursor.execute(statement, (epsg, epsg))
+            self._DbCursor.execute('SELECT COUNT(*) FROM %s WHERE "geom" IS NULL '
+                                   'AND "%s" IS NOT NULL AND "%s" IS NOT NULL;' % (self._DbTreeTableName, xcol, ycol))
+            self._InvalidGeomCount = self._DbCursor.fetchone()[0]
+        except sqlite3.OperationalError:
+            self.rollback()
+            self.remove_col_from_collist("geom")
+            return False
+        self.commit()
+        self.set_contains_geom(True)
+        return True
+
+    # returns number of rows, whose coordinates could not be converted into a point by last call of add_geometries
+    def get_invalid_geom_count(self):
+        return self._InvalidGeomCount
+
     # method to generate a spatial Index for a specific column
     def add_spatial_index(self, colname):
         self._DbCursor.execute("SELECT CreateSpatialIndex('elevation', '%s');" % colname)
 
+    # creates index on id column of tree table, so trees can be looked up quickly by their id
+    # must be called before trees are processed one by one (e.g. enrichment with DEM or point cloud)
+    # index is only created, if column is not indexed yet (e.g. IAI_TreeID, OSM_ID or index of project file)
+    def create_id_index(self, colname):
+        self.create_column_index(colname, "idindex")
+
+    # creates index on a column of tree table, if the column is not indexed yet
+    # name of new index: prefix_colname
+    def create_column_index(self, colname, prefix):
+        if colname is None or colname.upper() == "ROWID" or colname in self._IndexedColumns:
+            return
+
+        self._DbCursor.execute("PRAGMA index_list(%s);" % self._DbTreeTableName)
+        for index in self._DbCursor.fetchall():
+            index_cols = self._DbConnection.execute('PRAGMA index_info("%s");' % index[1]).fetchall()
+            if index_cols and index_cols[0][2] == colname:
+                self._IndexedColumns.add(colname)
+                return
+
+        self._DbCursor.execute('CREATE INDEX "%s_%s" ON %s("%s");' % (prefix, colname, self._DbTreeTableName, colname))
+        self._DbConnection.commit()
+        self._IndexedColumns.add(colname)
+
+    # sets progress reporter of imports (see module progress), None if progress should not be reported
+    # progress value is number of bytes read from input file, total is size of file (both 0, if they are unknown,
+    # e.g. download from OpenStreetMap), count is number of rows imported
+    # reporter is used by the thread running the import after every batch of rows
+    def set_progress_reporter(self, reporter):
+        self._ProgressReporter = reporter
+
+    # requests running import to stop. May be called by another thread than the one running the import
+    # import raises ImportCancelledException with its next progress report, imported rows are rolled back
+    def cancel_import(self):
+        self._ImportCancelled = True
+
+    # starts progress report of an import. bytes_total: size of input file, 0 if unknown
+    def start_import_progress(self, bytes_total=0):
+        if self._ProgressReporter is not None:
+            self._ProgressReporter.start(bytes_total)
+
+    # reports progress of running import to progress reporter
+    # raises ImportCancelledException, if import has been cancelled
+    def report_import_progress(self, rows, bytes_read=0):
+        if self._ProgressReporter is not None:
+            self._ProgressReporter.update(bytes_read, rows)
+        if self._ImportCancelled:
+            raise ImportCancelledException()
+
+    # reports final progress of import, after all rows have been inserted
+    def finish_import_progress(self, rows, bytes_read=0):
+        if self._ProgressReporter is not None:
+            self._ProgressReporter.update(bytes_read, rows)
+            self._ProgressReporter.finish()
+
+    # returns a value, that changes whenever data of the database is changed
+    # data_version changes with commits of other connections (enrichment, import), total_changes with every
+    # change made through the connection of this object
+    def get_data_version(self):
+        data_version = self._DbConnection.execute("PRAGMA data_version;").fetchone()[0]
+        return data_version, self._DbConnection.total_changes
+
+    # returns rowids of tree table sorted ascending by a column (NULL values first, equal values by rowid)
+    # position i of the list is the rowid of the i-th row in sorted order. For descending order, read list backwards
+    # column is indexed on first use, so rowids are read from index without sorting the table.
+    # list is cached per column: sorting by the same column again is free, as long as data has not been changed
+    def get_sort_permutation(self, sort_col):
+        version = self.get_data_version()
+        cached = self._SortPermutations.get(sort_col)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        self.create_column_index(sort_col, "sortindex")
+        self._DbCursor.execute('SELECT rowid FROM %s ORDER BY "%s", rowid;' % (self._DbTreeTableName, sort_col))
+        permutation = array.array("q", (row[0] for row in self._DbCursor))
+        self._SortPermutations[sort_col] = (self.get_data_version(), permutation)
+        return permutation
+
+    # returns rows of tree table (all columns of grid) with rowids, in order of rowids
+    def get_data_by_rowids(self, rowids):
+        statement = "SELECT %s, rowid FROM %s WHERE rowid IN (%s);" \
+                    % (self._SQLSelectColumns, self._DbTreeTableName, ", ".join("?" * len(rowids)))
+        rows = {}
+        for row in self._DbConnection.execute(statement, list(rowids)):
+            rows[row[-1]] = row[:-1]
+        return [rows[rowid] for rowid in rowids if rowid in rows]
+
     # method to add a column to the tree database table
     def add_col(self, name, datatype):
         # find out if a column with this name already exists
@@ -316,6 +582,11 @@ class Database:
         self.add_col_to_collist(name, datatype)
         self.generate_sql_statement()
 
+    # writes values into a column of the tree table: every row gets the value of its key (key column)
+    # values: list of (key, value) tuples. All values are written with one statement (see connection_manager)
+    def bulk_update(self, insert_col, key_col, values):
+        connection_manager.bulk_update(self._DbConnection, self._DbTreeTableName, insert_col, key_col, values)
+
     # method to add a column to the program's internal list of table columns
     def add_col_to_collist(self, name, datatype):
         if name not in self.get_column_names():
@@ -362,17 +633,101 @@ class Database:
     def get_contains_geom(self):
         return self._ContainsGeom
 
+    # saves the database as a project file: all tables (trees, elevation, pointcloud, convex hulls, ...)
+    # are copied into the project file using the sqlite backup api
+    # program state (table columns, id options, column settings) is stored in table tree3d_project
+    def save_project(self, filepath, column_settings):
+        self._DbConnection.commit()
+
+        project_con = sqlite3.connect(filepath)
+        try:
+            self._DbConnection.backup(project_con)
+            project_con.execute("PRAGMA journal_mode = DELETE;")  # project is a single file, without wal file
+
+            project_info = {"program_version": config.get_program_version(),
+                            "table_columns": self._lTableColmnNames,
+                            "create_id": self._CreateTwoColID,
+                            "id_columns": self._CreateTwoColIDColumns,
+                            "use_rowid": self._CreateRowid,
+                            "contains_geom": self._ContainsGeom,
+                            "column_settings": column_settings.get_settings()}
+
+            project_con.execute("DROP TABLE IF EXISTS %s;" % PROJECT_TABLE_NAME)
+            project_con.execute("CREATE TABLE %s (key TEXT PRIMARY KEY, value TEXT);" % PROJECT_TABLE_NAME)
+            project_con.executemany("INSERT INTO %s VALUES (?, ?);" % PROJECT_TABLE_NAME,
+                                    [(key, json.dumps(value)) for key, value in project_info.items()])
+            project_con.commit()
+        finally:
+            project_con.close()
+
+
+class DatabaseFromProject(Database):
+    def __init__(self, dbfilepath=None, in_memory=False):
+        super().__init__(dbfilepath, in_memory)
+
+    # method to open a project file that was saved using save_project()
+    # the project is copied into this database using the sqlite backup api, no data is imported again
+    # column settings stored in the project are applied to column_settings
+    @bulk_import
+    def open_project(self, filepath, column_settings):
+        project_con = sqlite3.connect(filepath)
+        try:
+            try:
+                project_con.execute("SELECT key, value FROM %s;" % PROJECT_TABLE_NAME)
+            except sqlite3.DatabaseError:
+                raise InvalidProjectException(filepath)
+
+            self._DbConnection.commit()
+            project_con.backup(self._DbConnection)
+        finally:
+            project_con.close()
+
+        # restore program state
+        self._DbCursor.execute("SELECT key, value FROM %s;" % PROJECT_TABLE_NAME)
+        project_info = {}
+        for key, value in self._DbCursor.fetchall():
+            project_info[key] = json.loads(value)
+        self._DbCursor.execute("DROP TABLE %s;" % PROJECT_TABLE_NAME)
+        self._DbConnection.commit()
+
+        # spatial metadata is missing, if project was saved without spatialite
+        if self._SpatiaLiteLoaded[0]:
+            self._DbCursor.execute("SELECT count(*) FROM sqlite_master WHERE type='table' AND name='spatial_ref_sys';")
+            if self._DbCursor.fetchone()[0] == 0:
+                self._DbConnection.execute('SELECT InitSpatialMetaData(1);')
+                self._DbConnection.commit()
+
+        self._lTableColmnNames = project_info["table_columns"]
+        self._CreateTwoColID = project_info["create_id"]
+        self._CreateTwoColIDColumns = project_info["id_columns"]
+        self._CreateRowid = project_info["use_rowid"]
+        self._ContainsGeom = project_info["contains_geom"]
+        column_settings.set_settings(project_info["column_settings"])
+
+        self.generate_sql_statement()
+
 
 class DatabaseFromCsv(Database):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, dbfilepath=None, in_memory=False):
+        super().__init__(dbfilepath, in_memory)
         self.__seperator = ""  # seperator in csv file
         self.__FileEncoding = ""  # file encoding of csv file
         self.__StartLine = 0  # line at which data starts (in case there are empty lines in the beginning)
 
+        self.__InsertBatchSize = 10000  # number of rows that are inserted into database at once
+        self.__InsertStatement = ""  # sql insert statement, compiled once before import starts
+        self.__Converters = []  # list of functions to convert csv values into their column data type
+        self.__UseReservoirSampling = False  # inspect randomly sampled rows of the whole file to detect data types
+
     # method to create database table from csv file
+    # rows inserted before an error are rolled back by decorator bulk_import
+    @bulk_import
     def import_csv_file(self, filepath):
         headers_found = False
+        batch = []  # list of converted rows, that will be inserted into database together
+        imported_rows = 0  # number of rows inserted into database so far
+        file_size = os.path.getsize(filepath)
+        self.start_import_progress(file_size)
         with open(filepath, newline='', encoding=self.__FileEncoding) as csvfile:
             filereader = csv.reader(csvfile, delimiter=self.__seperator)
             for idx, row in enumerate(filereader):
@@ -390,26 +745,40 @@ class DatabaseFromCsv(Database):
                         self._lTableColmnNames.append(["'IAI_TreeID'", "TEXT", True])
 
                     # Extract table column names from first row of csv file, create database table with it
+                    # data types of all columns are inspected together in one pass over the file
                     tableheaders = row
-                    col_num = len(tableheaders)
-                    for idx2, col in enumerate(tableheaders):
-                        try:
-                            coldata = ["'%s'" % col, self.get_csv_datatypes(filereader, csvfile, idx2, col_num), True]
-                            self._lTableColmnNames.append(coldata)
-                        except NotEnoughItemsException as e:
-                            raise NotEnoughItemsException("Line %s" % (idx + int(str(e))+2))
-                        except TooManyItemsException as e:
-                            raise TooManyItemsException("Line %s" % (idx + int(str(e))+2))
+                    try:
+                        self._lTableColmnNames.extend(self.get_csv_columns(filereader, csvfile, tableheaders))
+                    except NotEnoughItemsException as e:
+                        raise NotEnoughItemsException("Line %s" % (idx + int(str(e))+2))
+                    except TooManyItemsException as e:
+                        raise TooManyItemsException("Line %s" % (idx + int(str(e))+2))
 
                     self.create_db_table()
+                    self.compile_insert_statement()
+
+                    # all data rows are inserted within one transaction
+                    self._DbCursor.execute("BEGIN;")
                 else:
-                    # Insert data rows from csv file into database, raise exceptions if row is under- or overpopulated
+                    # Convert data rows from csv file, raise exceptions if row is under- or overpopulated
                     try:
-                        self.populate_db_table(row)
+                        batch.append(self.convert_row(row))
                     except NotEnoughItemsException:
                         raise NotEnoughItemsException(idx+1)
                     except TooManyItemsException:
                         raise TooManyItemsException(idx+1)
+
+                    # Insert rows into database once batch is full
+                    if len(batch) >= self.__InsertBatchSize:
+                        imported_rows += self.populate_db_table(batch)
+                        batch = []
+                        self.report_import_progress(imported_rows, csvfile.buffer.tell())
+
+            # insert remaining rows
+            if batch:
+                imported_rows += self.populate_db_table(batch)
+            self.finish_import_progress(imported_rows, file_size)
+
         if self._CreateTwoColID:
             self._DbCursor.execute("CREATE INDEX iaitreeidindex on trees(IAI_TreeID);")
         self._DbConnection.commit()
@@ -418,79 +787,82 @@ class DatabaseFromCsv(Database):
         self.generate_sql_statement()
         return True
 
-    # method to insert a row into the database
-    def populate_db_table(self, row):
-        if not self._CreateTwoColID and len(row) < self.get_number_of_columns():
-            raise NotEnoughItemsException
+    # method to compile sql insert statement and data type converters from table columns
+    # must be called after table columns have been determined, statement is reused for every row
+    def compile_insert_statement(self):
+        self.__InsertStatement = 'INSERT INTO %s VALUES (%s);' \
+                                 % (self._DbTreeTableName, ", ".join(["?"] * self.get_number_of_columns()))
+
+        self.__Converters = []
+        for col in self._lTableColmnNames:
+            if col[1] == "INTEGER":
+                self.__Converters.append(int)
+            elif col[1] == "REAL":
+                self.__Converters.append(convert_to_real)
+            else:
+                self.__Converters.append(str)
+
+    # method to convert a csv row into a row that can be inserted into database
+    # raises exceptions, if row is under- or overpopulated
+    def convert_row(self, row):
+        number_of_cols = self.get_number_of_columns()
+        if self._CreateTwoColID:
+            number_of_cols -= 1  # ID column is not in csv file
 
-        if self._CreateTwoColID and len(row) < self.get_number_of_columns()-1:
+        if len(row) < number_of_cols:
             raise NotEnoughItemsException
 
-        if len(row) > self.get_number_of_columns():
+        if len(row) > number_of_cols:
             raise TooManyItemsException
-        insert_row = []
+
         if self._CreateTwoColID:
             row.insert(0, "%s_%s" % (row[self._CreateTwoColIDColumns[0]], row[self._CreateTwoColIDColumns[1]]))
-        statement = 'INSERT INTO %s VALUES ('
-        for _ in row:
-            statement += "?, "
-        statement = statement[:-2] + ");"
-
-        for idx, element in enumerate(row):
-            if self._lTableColmnNames[idx][1] == "INTEGER" and element != "":
-                insert_row.append(int(element))
-            elif self._lTableColmnNames[idx][1] == "REAL" and element != "":
-                insert_row.append(float(element.replace(",", ".")))
-            elif element != "":
-                insert_row.append(element)
+
+        insert_row = []
+        for converter, element in zip(self.__Converters, row):
+            if element != "":
+                insert_row.append(converter(element))
             else:
                 insert_row.append(None)
-        self._DbCursor.execute(statement % self._DbTreeTableName, insert_row)
-
-    # method to automatically detect the data type of a column in the opened csv file.
-    # number of rows to be consider when det4000*12
-    # ermining data type can be configured using inspection_limit variable
-    # returns string "INTEGER", "REAL" or "TEXT", (data types used in sqlite databases)
-    def get_csv_datatypes(self, filereader, csvfile, col_index, number_of_cols):
+        return insert_row
+
+    # method to insert a list of converted rows into the database
+    # returns number of inserted rows
+    def populate_db_table(self, rows):
+        self._DbCursor.executemany(self.__InsertStatement, rows)
+        return len(rows)
+
+    # method to automatically detect the data types of all columns in the opened csv file.
+    # all columns are inspected together in a single pass over the inspected rows
+    # number of rows to be considered when determining data types can be configured using inspection_limit variable
+    # if reservoir sampling is used, inspected rows are sampled randomly from the whole file instead
+    # returns list of table columns: [column name, data type, True], data type is "INTEGER", "REAL" or "TEXT"
+    def get_csv_columns(self, filereader, csvfile, tableheaders):
         inspection_limit = self._DataInspectionLimit
+        number_of_cols = len(tableheaders)
 
-        int_type_in_list = False
-        real_type_in_list = False
-        text_type_in_list = False
-
-        # make data type prediction for each cell of one column
-        for index2, row in enumerate(filereader):
-
-            # break loop if row inspection limit is reached
-            if index2 > inspection_limit:
-                break
-
-            if not row:
-                continue
-
-            # if there is no value for an attribute in a row: ignore this row to prevent false data type predictions
-            if row[col_index] == "":
-                continue
-
-            if not self._CreateTwoColID and len(row) < number_of_cols:
-                raise NotEnoughItemsException(index2)
+        # rows from which data types will be predicted
+        if self.__UseReservoirSampling:
+            sample = self.get_csv_reservoir_sample(filereader, number_of_cols, inspection_limit + 1)
+        else:
+            sample = []
+            for index2, row in enumerate(filereader):
+                # break loop if row inspection limit is reached
+                if index2 > inspection_limit:
+                    break
 
-            if self._CreateTwoColID and len(row) < number_of_cols-1:
-                raise NotEnoughItemsException(index2)
+                if not row:
+                    continue
 
-            if len(row) > number_of_cols:
-                raise TooManyItemsException(index2)
+                self.check_csv_sample_row(row, index2, number_of_cols)
+                sample.append(row)
 
-            try:
-                dat = literal_eval(row[col_index].replace(",", "."))
-                if isinstance(dat, int):
-                    int_type_in_list = True
-                elif isinstance(dat, float):
-                    real_type_in_list = True
-                else:
-                    text_type_in_list = True
-            except:
-                text_type_in_list = True
+        # make data type prediction for each cell of the sampled rows
+        # columns are identified by their index
+        inspector = datatypes.DataTypeInspector()
+        for row in sample:
+            for col_index, value in enumerate(row):
+                inspector.inspect(col_index, value)
 
         # reset position of cursor in csvfile to line 1, because cursor has been moved in this method
         # method: move cursor back to line 0 and go to next lin
@@ -501,14 +873,44 @@ class DatabaseFromCsv(Database):
             csvfile.readline()
             counter += 1
 
-        if int_type_in_list and not real_type_in_list and not text_type_in_list:
-            data_type = "INTEGER"
-        elif real_type_in_list and not text_type_in_list:
-            data_type = "REAL"
-        else:
-            data_type = "TEXT"
+        column_list = []
+        for col_index, col in enumerate(tableheaders):
+            column_list.append(["'%s'" % col, inspector.get_datatype(col_index), True])
 
-        return data_type
+        return column_list
+
+    # method to draw a uniform random sample of rows from the whole csv file (reservoir sampling)
+    # the file is read once, only sample_size rows are kept in memory
+    def get_csv_reservoir_sample(self, filereader, number_of_cols, sample_size):
+        rand = random.Random(0)  # fixed seed: same file always results in same data types
+        sample = []
+        rows_seen = 0
+        for index2, row in enumerate(filereader):
+            if not row:
+                continue
+
+            self.check_csv_sample_row(row, index2, number_of_cols)
+
+            if rows_seen < sample_size:
+                sample.append(row)
+            else:
+                position = rand.randint(0, rows_seen)
+                if position < sample_size:
+                    sample[position] = row
+            rows_seen += 1
+        return sample
+
+    # method to validate number of items in an inspected row
+    # raises exception with the index of the row, if row is under- or overpopulated
+    def check_csv_sample_row(self, row, index, number_of_cols):
+        if not self._CreateTwoColID and len(row) < number_of_cols:
+            raise NotEnoughItemsException(index)
+
+        if self._CreateTwoColID and len(row) < number_of_cols-1:
+            raise NotEnoughItemsException(index)
+
+        if len(row) > number_of_cols:
+            raise TooManyItemsException(index)
 
     # sets csv seperator
     def set_seperator(self, sep):
@@ -518,14 +920,29 @@ class DatabaseFromCsv(Database):
     def set_file_encoding(self, codec):
         self.__FileEncoding = codec
 
+    # sets number of rows that are inserted into database at once
+    def set_insert_batch_size(self, value):
+        self.__InsertBatchSize = value
+
+    # sets variable weather data types should be detected from a random sample of the whole file
+    def set_use_reservoir_sampling(self, value):
+        self.__UseReservoirSampling = value
+
 
 class DatabaseFromXml(Database):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, dbfilepath=None, in_memory=False):
+        super().__init__(dbfilepath, in_memory)
         self.__XmlTree = None
         self.__RootNode = None  # Root node of xml tree
         self.__ns = {}  # xml namespaces: associates prefix with full qualified name
 
+        self.__InsertBatchSize = 10000  # number of rows that are inserted into database at once
+        self.__InsertStatements = {}  # {column signature: (sql insert statement, list of converters)}
+        self.__TableColumns = set()  # names of all columns in database table, to look up new columns quickly
+        self.__BatchSignature = None  # column signature of rows in current batch
+        self.__Batch = []  # rows waiting to be inserted, all rows share the same column signature
+
+    @bulk_import
     def import_xml_file(self, filepath, attribute_path, geom_path, ignorestring, tree):
         self.__XmlTree = tree
         self.__RootNode = self.__XmlTree.getroot()
@@ -535,56 +952,144 @@ class DatabaseFromXml(Database):
 
         # Create list with elements to ignore from string.
         # Format list: Remove leading and tailing whitespaces
-        ignorelist = ignorestring.split(";")
-        for idx, element in enumerate(ignorelist):
-            ignorelist[idx] = element.strip()
-
-            # add column for unique tree ID to data model
-            if self._CreateTwoColID:
-                self._lTableColmnNames.append(["'IAI_TreeID'", "TEXT", True])
-
-        # Inspect data: Find Columns to add to database table
-        # Find data type of each column
-        inspected_cols = []
-        for element in self.__RootNode.findall(attribute_path, self.__ns):
-            for subelement in element:
-                tag = subelement.tag
-                tag_no_pref = tag.split("}")[1]
-                if (tag_no_pref not in ignorelist) and (tag_no_pref not in inspected_cols):
-                    datatype = self.get_xml_datatype(attribute_path+"/"+tag)
-                    inspected_cols.append(tag_no_pref)
-                    self._lTableColmnNames.append(["'%s'" % tag_no_pref, datatype, True])
+        ignorelist = [element.strip() for element in ignorestring.split(";")]
 
-        # Add geometry columns to Table columns
         if geom_path != "":
-            self._lTableColmnNames.append(["'X_VALUE'", "REAL", True])
-            self._lTableColmnNames.append(["'Y_VALUE'", "REAL", True])
+            geom_subpath = geom_path.split("/", 2)[2]
+        else:
+            geom_subpath = None
+
+        # Inspect data: Find columns to add to database table and data type of each column in one pass
+        elements = self.__RootNode.findall(attribute_path, self.__ns)
+        self.create_xml_table(self.inspect_xml_elements(elements, ignorelist), geom_subpath is not None)
+
+        # insert all tree elements into database
+        # file has been parsed before: bytes read are estimated from the share of inserted elements
+        file_size = os.path.getsize(filepath)
+        self.start_import_progress(file_size)
+        for idx, element in enumerate(elements, 1):
+            self.insert_xml_element(element, ignorelist, geom_subpath)
+            if idx % self.__InsertBatchSize == 0:
+                self.report_import_progress(idx, file_size * idx // len(elements))
+        self.flush_xml_rows()
+        self.finish_import_progress(len(elements), file_size)
 
-        self.create_db_table()
+        if self._CreateTwoColID:
+            self._DbCursor.execute("CREATE INDEX iaitreeidindex on trees(IAI_TreeID);")
         self._DbConnection.commit()
+        if self._CreateRowid:
+            self._lTableColmnNames.insert(0, ["'ROWID'", "TEXT", True])
+        self.generate_sql_statement()
 
-        # create row (insert_row) that will be inserted into database
-        # create list of columns, to which the inserted data refers
-        for element in self.__RootNode.findall(attribute_path, self.__ns):
-            col_list = []
-            insert_row = []
-            if self._CreateTwoColID:
-                col_list.append("'IAI_TreeID'")
+    # collects column names (sub element tags) and data type evidence of all tree elements in one pass
+    # data type inspection of a column stops, once the data inspection limit is hit for this column
+    # returns DataTypeInspector with columns in order of their first appearance
+    def inspect_xml_elements(self, elements, ignorelist):
+        inspection_limit = self._DataInspectionLimit
+        inspector = datatypes.DataTypeInspector()
+        inspected_values = {}  # number of inspected values per column
+
+        for element in elements:
             for subelement in element:
-                if subelement.tag.split("}")[1] not in ignorelist:
-                    col_list.append("'%s'" % subelement.tag.split("}")[1])
-                    insert_row.append(subelement.text)
-                if geom_path != "":
-                    path = geom_path.split("/", 2)[2]
-                    for geom in subelement.findall(path, self.__ns):
-                        coords = geom.text.split(" ")
-                        col_list.append("'X_VALUE'")
-                        insert_row.append(str(coords[0]))
-                        col_list.append("'Y_VALUE'")
-                        insert_row.append(str(coords[1]))
-
-            # insert row into specified columns
-            self.populate_db_table(insert_row, col_list)
+                tag_no_pref = subelement.tag.split("}")[-1]
+                if tag_no_pref in ignorelist:
+                    continue
+                count = inspected_values.get(tag_no_pref, 0)
+                if count <= inspection_limit:
+                    inspector.inspect(tag_no_pref, subelement.text)
+                    inspected_values[tag_no_pref] = count + 1
+        return inspector
+
+    # returns True, if streaming import should be used for a xml file by default (see import_xml_file_streaming)
+    # streaming import needs a path of child steps only and an inspection limit, that usually finds all columns
+    def use_streaming_import(self, attribute_path):
+        return self._DataInspectionLimit >= XML_STREAMING_MIN_INSPECTION_LIMIT \
+            and get_xml_child_steps(attribute_path) is not None
+
+    # imports xml file in one incremental pass without loading the whole file into memory
+    # attribute_path must consist of child steps only (e.g. "./wfs:member/fis:s_wfs_baumbestand")
+    # tree elements of the first rows (data inspection limit) are kept to find columns and data types
+    # all following elements are inserted directly and removed from memory afterwards
+    # columns that appear for the first time after inspection are added as TEXT columns at the end of the table,
+    # so types and column order can differ from import_xml_file, which inspects all tree elements for columns
+    @bulk_import
+    def import_xml_file_streaming(self, filepath, attribute_path, geom_path, ignorestring):
+        steps = get_xml_child_steps(attribute_path)
+        if steps is None:
+            raise ValueError("XML path %s is not supported by streaming import" % attribute_path)
+
+        # Create list with elements to ignore from string.
+        # Format list: Remove leading and tailing whitespaces
+        ignorelist = [element.strip() for element in ignorestring.split(";")]
+
+        if geom_path != "":
+            geom_subpath = geom_path.split("/", 2)[2]
+        else:
+            geom_subpath = None
+
+        inspection_limit = self._DataInspectionLimit
+        buffered_elements = []  # tree elements inside inspection limit, inserted after table creation
+        table_created = False
+
+        self.__ns = {}
+        element_stack = []  # elements from root to current element
+        on_path_stack = []  # indicates for each element in element_stack, if it is part of attribute_path
+        elements_found = 0  # number of tree elements found in file so far
+        file_size = os.path.getsize(filepath)
+        self.start_import_progress(file_size)
+        with open(filepath, "rb") as xmlfile:
+            for event, node in ET.iterparse(xmlfile, events=["start-ns", "start", "end"]):
+                if event == "start-ns":
+                    self.__ns[node[0]] = node[1]
+                    continue
+
+                if event == "start":
+                    depth = len(element_stack)
+                    if depth == 0:
+                        on_path = True
+                    elif depth <= len(steps):
+                        on_path = on_path_stack[-1] and xml_tag_matches(node.tag, steps[depth - 1], self.__ns)
+                    else:
+                        on_path = False
+                    element_stack.append(node)
+                    on_path_stack.append(on_path)
+                    continue
+
+                # event == "end"
+                element_stack.pop()
+                on_path = on_path_stack.pop()
+                depth = len(element_stack)
+
+                if depth == len(steps) and on_path:
+                    elements_found += 1
+                    if elements_found % self.__InsertBatchSize == 0:
+                        self.report_import_progress(elements_found, xmlfile.tell())
+
+                    if not table_created:
+                        buffered_elements.append(node)
+
+                        # inspection limit reached: create table and insert elements inspected so far
+                        if len(buffered_elements) > inspection_limit:
+                            self.create_xml_table(self.inspect_xml_elements(buffered_elements, ignorelist),
+                                                  geom_subpath is not None)
+                            table_created = True
+                            for element in buffered_elements:
+                                self.insert_xml_element(element, ignorelist, geom_subpath)
+                            buffered_elements = []
+                    else:
+                        self.insert_xml_element(node, ignorelist, geom_subpath)
+
+                # remove processed elements from memory (elements deeper than attribute path are removed with parent)
+                if 0 < depth <= len(steps):
+                    element_stack[-1].remove(node)
+
+        # file contains less tree elements than inspection limit
+        if not table_created:
+            self.create_xml_table(self.inspect_xml_elements(buffered_elements, ignorelist), geom_subpath is not None)
+            for element in buffered_elements:
+                self.insert_xml_element(element, ignorelist, geom_subpath)
+        self.flush_xml_rows()
+        self.finish_import_progress(elements_found, file_size)
 
         if self._CreateTwoColID:
             self._DbCursor.execute("CREATE INDEX iaitreeidindex on trees(IAI_TreeID);")
@@ -593,79 +1098,105 @@ class DatabaseFromXml(Database):
             self._lTableColmnNames.insert(0, ["'ROWID'", "TEXT", True])
         self.generate_sql_statement()
 
-    # method to automatically detect the data type of an xml attribute
-    # number of rows to be consider when determining data type can be configured using inspection_limit variable
-    # returns string "INTEGER", "REAL" or "TEXT", (data types used in sqlite databases)
-    def get_xml_datatype(self, attribute_path):
-        inspection_limit = self._DataInspectionLimit
+    # creates database table from columns found during inspection of xml file
+    def create_xml_table(self, inspector, contains_geom):
+        # add column for unique tree ID to data model
+        if self._CreateTwoColID:
+            self._lTableColmnNames.append(["'IAI_TreeID'", "TEXT", True])
 
-        int_type_in_list = False
-        real_type_in_list = False
-        text_type_in_list = False
+        for tag in inspector.get_keys():
+            self._lTableColmnNames.append(["'%s'" % tag, inspector.get_datatype(tag), True])
 
-        for index, element in enumerate(self.__RootNode.findall(attribute_path, self.__ns)):
-            # stop data type inspection once the inspection limit is hit
-            if index > inspection_limit:
-                break
+        # Add geometry columns to Table columns
+        if contains_geom:
+            self._lTableColmnNames.append(["'X_VALUE'", "REAL", True])
+            self._lTableColmnNames.append(["'Y_VALUE'", "REAL", True])
 
-            # if there is no value for an attribute in a row: ignore this row to prevent false data type predictions
-            if element.text is None:
-                continue
+        self.create_db_table()
+        self._DbConnection.commit()
 
-            try:
-                dat = literal_eval(element.text.replace(",", "."))
-                if isinstance(dat, int):
-                    int_type_in_list = True
-                elif isinstance(dat, float):
-                    real_type_in_list = True
-                else:
-                    text_type_in_list = True
-            except:
-                text_type_in_list = True
-
-        if int_type_in_list and not real_type_in_list and not text_type_in_list:
-            data_type = "INTEGER"
-        elif real_type_in_list and not text_type_in_list:
-            data_type = "REAL"
-        else:
-            data_type = "TEXT"
+        self.__TableColumns = set([col[0] for col in self._lTableColmnNames])
+        self.__InsertStatements = {}
+        self.__BatchSignature = None
+        self.__Batch = []
 
-        return data_type
+    # inserts a tree element of xml file into database
+    # columns, that are not part of the table yet, are added to the table (streaming import only)
+    def insert_xml_element(self, element, ignorelist, geom_subpath):
+        col_list = []
+        insert_row = []
+        if self._CreateTwoColID:
+            col_list.append("'IAI_TreeID'")
+        for subelement in element:
+            tag_no_pref = subelement.tag.split("}")[-1]
+            if tag_no_pref not in ignorelist:
+                if "'%s'" % tag_no_pref not in self.__TableColumns:
+                    self._DbCursor.execute("ALTER TABLE %s ADD COLUMN '%s' TEXT;" % (self._DbTreeTableName,
+                                                                                    tag_no_pref))
+                    self._lTableColmnNames.append(["'%s'" % tag_no_pref, "TEXT", True])
+                    self.__TableColumns.add("'%s'" % tag_no_pref)
+                col_list.append("'%s'" % tag_no_pref)
+                insert_row.append(subelement.text)
+            if geom_subpath is not None:
+                for geom in subelement.findall(geom_subpath, self.__ns):
+                    coords = geom.text.split(" ")
+                    col_list.append("'X_VALUE'")
+                    insert_row.append(str(coords[0]))
+                    col_list.append("'Y_VALUE'")
+                    insert_row.append(str(coords[1]))
+
+        # insert row into specified columns
+        self.populate_db_table(insert_row, col_list)
 
     # method to add data row to database
+    # rows are collected and inserted in batches. A batch only contains rows with the same columns (signature),
+    # it is inserted as soon as a row with different columns arrives, which keeps the order of rows intact
     def populate_db_table(self, row, cols):
-        col_string = "("
-        insert_row = []
-        col_type_dict = {}
-
-        # create dictionary and their datatypes {col_name: datatype}
-        for col in self._lTableColmnNames:
-            col_type_dict["%s" % col[0]] = col[1]
+        signature = tuple(cols)
+        if signature != self.__BatchSignature or len(self.__Batch) >= self.__InsertBatchSize:
+            self.flush_xml_rows()
+            self.__BatchSignature = signature
 
-        # create col-string: String of columns that will be used in sql insert statement
-        for col in cols:
-            col_string += "%s, " % col
-        col_string = col_string[:-2] + ") "
-
-        # create sql insert statement
         if self._CreateTwoColID:
             row.insert(0, "%s_%s" % (row[self._CreateTwoColIDColumns[0]], row[self._CreateTwoColIDColumns[1]]))
-        statement = 'INSERT INTO %s ' + col_string + 'VALUES ('
-        for _ in row:
-            statement += "?, "
-        statement = statement[:-2] + ");"
-
-        # add values in their correct data types to input_row
-        for idx, element in enumerate(row):
-            if col_type_dict[cols[idx]] == "INTEGER" and element is not None:
-                insert_row.append(int(element))
-            elif col_type_dict[cols[idx]] == "REAL" and element is not None:
-                insert_row.append(float(element.replace(",", ".")))
-            else:
-                insert_row.append(element)
 
-        # insert row into database
-        self._DbCursor.execute(statement % self._DbTreeTableName, insert_row)
+        converters = self.get_xml_insert_statement(signature)[1]
+        self.__Batch.append([element if converter is None or element is None else converter(element)
+                             for converter, element in zip(converters, row)])
+
+    # returns sql insert statement and list of converters for a column signature
+    # both are compiled once per signature and reused for all following rows with the same columns
+    # converter is None for TEXT columns, values are inserted unchanged then
+    def get_xml_insert_statement(self, signature):
+        compiled = self.__InsertStatements.get(signature)
+        if compiled is None:
+            col_type_dict = {}
+            for col in self._lTableColmnNames:
+                col_type_dict[col[0]] = col[1]
+
+            statement = 'INSERT INTO %s (%s) VALUES (%s);' \
+                        % (self._DbTreeTableName, ", ".join(signature), ", ".join(["?"] * len(signature)))
+            converters = []
+            for col in signature:
+                if col_type_dict[col] == "INTEGER":
+                    converters.append(int)
+                elif col_type_dict[col] == "REAL":
+                    converters.append(convert_to_real)
+                else:
+                    converters.append(None)
+            compiled = (statement, converters)
+            self.__InsertStatements[signature] = compiled
+        return compiled
+
+    # inserts all rows of current batch into database
+    def flush_xml_rows(self):
+        if self.__Batch:
+            self._DbCursor.executemany(self.get_xml_insert_statement(self.__BatchSignature)[0], self.__Batch)
+            self.__Batch = []
+
+    # sets number of rows that are inserted into database at once
+    def set_insert_batch_size(self, value):
+        self.__InsertBatchSize = value
 
     # method to validate a xpath
     # start element for validation is root node
@@ -677,12 +1208,33 @@ class DatabaseFromXml(Database):
 
 
 class DatabaseFromOSM(Database):
-    def __init__(self):
-        Database.__init__(self)
+    def __init__(self, dbfilepath=None, in_memory=False):
+        Database.__init__(self, dbfilepath, in_memory)
 
         self.__query_bbox = []
         self.__epsg = None
 
+        self.__overpass_url = overpass.OVERPASS_URL  # url of overpass api interpreter
+        self.__tile_size = 0.05  # maximum edge length of query tiles in degrees, large bboxes are split into tiles
+        self.__max_workers = 2  # number of tiles downloaded at the same time
+        self.__request_timeout = (9.05, 27)  # (connect timeout, read timeout) of every request in seconds
+        self.__request_retries = 3  # number of repetitions of failed requests
+        self.__request_backoff = 2  # waiting time before first repetition of a failed request in seconds
+        self.__cache = None  # on-disk cache of overpass responses (OverpassCache object), disabled if None
+        self.__output_epsg = None  # epsg code of coordinates in database table
+        self.__transformer = None  # transforms WGS84 coordinates of trees into output coordinate system
+
+        # trees are inserted into staging table while overpass response is downloaded
+        # they are copied into the tree table at the end, since data types of columns are known only then
+        self.__StagingTableName = "osm_staging"
+        self.__StagingColumns = set()  # names of all columns in staging table
+        self.__InsertStatements = {}  # {tag keys of trees: sql insert statement}
+        self.__InsertBatchSize = 10000  # number of trees that are inserted into staging table at once
+        self.__Batch = []  # trees waiting to be inserted into staging table
+        self.__TreesRead = 0  # number of trees inserted into staging table so far
+        self.__InputFile = None  # osm file being imported (to report bytes read), None for downloads
+        self.__InputFileSize = 0  # size of osm file in bytes
+
     # method to set query bounding box coordinates
     # coordinates must be WGS84 geographic coordinates (EPSG:4326)
     def set_query_bbox(self, lower_bound, left_bound, upper_bound, right_bound, epsg):
@@ -690,9 +1242,7 @@ class DatabaseFromOSM(Database):
 
         # convert bounding box coordinates to WGS84, if they are not yet
         if self.__epsg != 4326:
-            crs_in = CRS.from_epsg(self.__epsg)
-            crs_out = CRS.from_epsg(4326)
-            transformer = Transformer.from_crs(crs_in, crs_out)
+            transformer = geometry.get_transformer(self.__epsg, 4326)
             lower_bound_new, left_bound_new = transformer.transform(left_bound, lower_bound)
             upper_bound_new, right_bound_new = transformer.transform(right_bound, upper_bound)
             bbox = [lower_bound_new, left_bound_new, upper_bound_new, right_bound_new]
@@ -701,97 +1251,282 @@ class DatabaseFromOSM(Database):
 
         self.__query_bbox.extend(bbox)
 
+    # sets url of overpass api interpreter, e.g. to use another overpass instance
+    def set_overpass_url(self, url):
+        self.__overpass_url = url
+
+    # sets maximum edge length of query tiles in degrees and number of tiles that are downloaded at the same time
+    def set_tiling(self, tile_size, max_workers):
+        self.__tile_size = tile_size
+        self.__max_workers = max_workers
+
+    # sets timeout (connect timeout, read timeout), number of repetitions and initial waiting time of requests
+    def set_request_options(self, timeout, retries, backoff):
+        self.__request_timeout = timeout
+        self.__request_retries = retries
+        self.__request_backoff = backoff
+
+    # enables on-disk cache of overpass responses, repeated queries of the same area are read from cache
+    # folder: cache folder. If None, subfolder of database folder is used
+    # ttl: time in seconds, after which cached responses are downloaded again
+    # max_size: maximum size of cache in bytes, least recently used responses are deleted first
+    def enable_cache(self, folder=None, ttl=86400, max_size=500 * 1024 * 1024):
+        if folder is None:
+            folder = self.generate_filepath('\\overpass_cache')
+        self.__cache = overpass.OverpassCache(folder, ttl, max_size)
+
+    # disables on-disk cache of overpass responses
+    def disable_cache(self):
+        self.__cache = None
+
+    # returns epsg code of tree coordinates in database table (only available after import)
+    def get_output_epsg(self):
+        return self.__output_epsg
+
+    # downloads trees inside query bounding box from overpass api
+    # bounding box is split into tiles, that are downloaded concurrently
+    # each tile is parsed as soon as it is downloaded, while following tiles are still downloaded
+    # trees on tile borders are contained in several tiles, they are inserted only once (by OSM_ID)
+    @bulk_import
     def import_osm_trees(self):
-        overpass_url = "http://overpass-api.de/api/interpreter"
-        overpass_ql_statement = "node(%s, %s, %s, %s)[natural=tree];out;" % (self.__query_bbox[0], self.__query_bbox[1],
-                                                                             self.__query_bbox[2], self.__query_bbox[3])
-        request_url = overpass_url + "?data=" + overpass_ql_statement
-
-        r = requests.get(request_url, timeout=(9.05, 27))
-
-        request_text = r.text
-
-        osmhandler = OSM_SAXHandler.OSMHandlerInspector()
-        xml.sax.parseString(request_text, osmhandler)
-
-        crs_in = CRS.from_epsg(4326)
-
         # specify output coordinate system
         if self.__epsg != 4326:
             output_epsg = self.__epsg
-            crs_out = CRS.from_epsg(output_epsg)
         else:
-            output_epsg = get_utm_epsg(self.__query_bbox[1])  # figure out utm epsg code
-            crs_out = CRS.from_epsg(output_epsg)
-        transformer = Transformer.from_crs(crs_in, crs_out)
+            output_epsg = get_utm_epsg(self.__query_bbox[1], self.__query_bbox[0])  # figure out utm epsg code
+        self.begin_osm_import(output_epsg)
+        self.start_import_progress()
+
+        osmhandler = OSM_SAXHandler.OSMHandlerInspector(self.add_osm_tree)
+        responses = overpass.fetch_trees_tiled(self.__overpass_url, self.__query_bbox, self.__tile_size,
+                                               self.__max_workers, self.__request_timeout,
+                                               self.__request_retries, self.__request_backoff, self.__cache)
+        try:
+            for response_file in responses:
+                with response_file:
+                    xml.sax.parse(response_file, osmhandler)
+        finally:
+            responses.close()
+
+        self.finish_osm_import(osmhandler)
+
+    # imports trees (nodes tagged natural=tree) from a local OpenStreetMap file, e.g. an extract of a whole country
+    # supported formats: .osm (xml, also compressed as .osm.bz2 or .osm.gz) and .osm.pbf
+    # file is read incrementally and trees are inserted in batches, the whole file is never held in memory
+    # output_epsg: epsg code of coordinate system of tree table. If None, utm zone of first tree is used
+    @bulk_import
+    def import_osm_file(self, filepath, output_epsg=None):
+        self.begin_osm_import(output_epsg)
+
+        osmhandler = OSM_SAXHandler.OSMHandlerInspector(self.add_osm_tree, ("natural", "tree"))
+        # bytes read are taken from the file on disk, also if it is compressed
+        self.__InputFileSize = os.path.getsize(filepath)
+        self.start_import_progress(self.__InputFileSize)
+        self.__InputFile = open(filepath, "rb")
+        try:
+            if filepath.endswith(".pbf"):
+                for osm_id, lat, lon, tags in osm_pbf.iter_file_nodes(self.__InputFile, "natural", "tree"):
+                    tree = {"OSM_ID": osm_id, "X_VALUE": lon, "Y_VALUE": lat}
+                    tree.update(tags)
+                    osmhandler.add_tree(tree)
+            else:
+                if filepath.endswith(".bz2"):
+                    osm_file = bz2.open(self.__InputFile, "rb")
+                elif filepath.endswith(".gz"):
+                    osm_file = gzip.open(self.__InputFile, "rb")
+                else:
+                    osm_file = self.__InputFile
+                xml.sax.parse(osm_file, osmhandler)
+
+            self.finish_osm_import(osmhandler)
+        finally:
+            self.__InputFile.close()
+            self.__InputFile = None
+
+    # prepares import of OpenStreetMap trees: creates staging table
+    # trees are inserted into staging table first, since data types of columns are only known after the last tree
+    # output_epsg: epsg code of coordinate system of tree table. If None, utm zone of first tree is used
+    def begin_osm_import(self, output_epsg):
+        self.__output_epsg = output_epsg
+        self.__transformer = None
+        if output_epsg is not None:
+            self.__transformer = geometry.get_transformer(4326, output_epsg)
+
+        self._DbCursor.execute('DROP TABLE IF EXISTS %s;' % self.__StagingTableName)
+        self._DbCursor.execute('CREATE TABLE %s ("OSM_ID" INT UNIQUE, "X_VALUE" REAL, "Y_VALUE" REAL);'
+                               % self.__StagingTableName)
+        self.__StagingColumns = set(["OSM_ID", "X_VALUE", "Y_VALUE"])
+        self.__InsertStatements = {}
+        self.__Batch = []
+        self.__TreesRead = 0
+
+    # finishes import of OpenStreetMap trees: creates tree table with columns found by osmhandler
+    # and copies trees from staging table into it
+    def finish_osm_import(self, osmhandler):
+        self.flush_osm_trees()
+        self.finish_import_progress(self.__TreesRead, self.get_osm_bytes_read())
+        if self.__output_epsg is None:
+            self.__output_epsg = 4326  # no trees found, coordinates are not transformed
 
         self._lTableColmnNames.append(["'OSM_ID'", "INT", True])
-        self._lTableColmnNames.append(["'X_VALUE_%s'" % output_epsg, "REAL", True])
-        self._lTableColmnNames.append(["'Y_VALUE_%s'" % output_epsg, "REAL", True])
-        self._lTableColmnNames.extend(osmhandler.get_columns())
+        self._lTableColmnNames.append(["'X_VALUE_%s'" % self.__output_epsg, "REAL", True])
+        self._lTableColmnNames.append(["'Y_VALUE_%s'" % self.__output_epsg, "REAL", True])
+        # tag columns are sorted by name: order of first appearance depends on tiling of query
+        self._lTableColmnNames.extend(sorted(osmhandler.get_columns(), key=lambda col: col[0]))
 
         self.create_db_table()
-        self._DbConnection.commit()
-
-        tree_list = osmhandler.get_tree_list()
-
-        # import trees in database:
-        for tree in tree_list:
-            columns = "("
-            values = "("
-            value_list = []
 
-            x_val = tree["X_VALUE"]
-            y_val = tree["Y_VALUE"]
-            x_val_new, y_val_new = transformer.transform(y_val, x_val)
-            tree["X_VALUE_%s" % output_epsg] = x_val_new
-            tree["Y_VALUE_%s" % output_epsg] = y_val_new
+        # copy trees from staging table: values are converted into data types of tree table on insert
+        # transformed coordinates are stored in columns X_VALUE and Y_VALUE of staging table
+        columns = ", ".join(['"%s"' % col[0][1:-1] for col in self._lTableColmnNames])
+        staging_columns = ", ".join(['"OSM_ID"', '"X_VALUE"', '"Y_VALUE"']
+                                    + ['"%s"' % col[0][1:-1] for col in self._lTableColmnNames[3:]])
+        self._DbCursor.execute('INSERT INTO %s (%s) SELECT %s FROM %s ORDER BY "OSM_ID";'
+                               % (self._DbTreeTableName, columns, staging_columns, self.__StagingTableName))
+        self._DbCursor.execute("DROP TABLE %s;" % self.__StagingTableName)
 
-            # loop over dict and create entry for tree in database
-            for key in tree:
-
-                # skip dict entries X_VALUE and Y_VALUE since they are not transformed
-                # X_VALUE_epsg is used instead
-                if key == "X_VALUE" or key == "Y_VALUE":
-                    continue
+        self._DbCursor.execute('''CREATE INDEX iaitreeidindex on trees("OSM_ID");''')
+        self._DbConnection.commit()
 
-                columns += '"%s", ' % key
-                values += "?, "
-                value_list.append(tree[key])
-            columns = columns[:-2] + ") "
-            values = values[:-2] + ")"
+        self.generate_sql_statement()
 
-            statement = "INSERT INTO %s " + columns + "VALUES " + values + ";"
-            self._DbCursor.execute(statement % self._DbTreeTableName, value_list)
+    # collects a tree, called by sax handler as soon as a tree is read completely
+    # columns for tags, that appear for the first time, are added to staging table
+    def add_osm_tree(self, tree):
+        for key in tree:
+            if key not in self.__StagingColumns:
+                self._DbCursor.execute('ALTER TABLE %s ADD COLUMN "%s";' % (self.__StagingTableName, key))
+                self.__StagingColumns.add(key)
+
+        self.__Batch.append(tree)
+        if len(self.__Batch) >= self.__InsertBatchSize:
+            self.flush_osm_trees()
+
+    # transforms coordinates of collected trees and inserts them into staging table
+    # coordinates of all trees in batch are transformed in one call
+    def flush_osm_trees(self):
+        if not self.__Batch:
+            return
+
+        # output coordinate system not specified: use utm zone of first tree
+        if self.__transformer is None:
+            self.__output_epsg = get_utm_epsg(self.__Batch[0]["X_VALUE"], self.__Batch[0]["Y_VALUE"])
+            self.__transformer = geometry.get_transformer(4326, self.__output_epsg)
+
+        x_values_new, y_values_new = self.__transformer.transform([tree["Y_VALUE"] for tree in self.__Batch],
+                                                                  [tree["X_VALUE"] for tree in self.__Batch])
+
+        # trees are grouped by their tag keys (signature), each group is inserted with one prepared statement
+        # trees are not padded to all columns of staging table, since osm data often contains many rare tags
+        groups = {}  # {signature: list of rows}
+        for tree, x_val_new, y_val_new in zip(self.__Batch, x_values_new, y_values_new):
+            # WGS84 coordinates are replaced by transformed coordinates
+            tree["X_VALUE"] = x_val_new
+            tree["Y_VALUE"] = y_val_new
+
+            # keys are sorted, so trees with same tags in different order share the same statement
+            signature = tuple(sorted(tree))
+            rows = groups.get(signature)
+            if rows is None:
+                rows = []
+                groups[signature] = rows
+            rows.append([tree[key] for key in signature])
+
+        for signature, rows in groups.items():
+            self._DbCursor.executemany(self.get_osm_insert_statement(signature), rows)
+        self.__TreesRead += len(self.__Batch)
+        self.__Batch = []
+
+        self.report_import_progress(self.__TreesRead, self.get_osm_bytes_read())
+
+    # returns number of bytes read from osm file, 0 for downloads
+    def get_osm_bytes_read(self):
+        if self.__InputFile is None:
+            return 0
+        if self.__InputFile.closed:
+            return self.__InputFileSize  # xml parser closes file after reading it completely
+        return self.__InputFile.tell()
+
+    # returns sql statement to insert trees with the given tag keys (signature) into staging table
+    # statements are compiled once per signature and reused for all following batches
+    def get_osm_insert_statement(self, signature):
+        statement = self.__InsertStatements.get(signature)
+        if statement is None:
+            statement = 'INSERT OR IGNORE INTO %s (%s) VALUES (%s);' \
+                        % (self.__StagingTableName, ", ".join(['"%s"' % key for key in signature]),
+                           ", ".join(["?"] * len(signature)))
+            self.__InsertStatements[signature] = statement
+        return statement
+
+
+# splits a xml path, that consists of child steps only (e.g. "./wfs:member/fis:s_wfs_baumbestand") into its steps
+# returns None, if path contains other xpath expressions (e.g. //, predicates, attributes)
+def get_xml_child_steps(path):
+    steps = []
+    for step in path.split("/"):
+        if step == ".":
+            continue
+        if step == "" or step == ".." or "[" in step or "@" in step:
+            return None
+        steps.append(step)
+    if not steps:
+        return None
+    return steps
+
+
+# returns True, if a xml tag (format: {namespace}name) matches a step of a xml path (format: prefix:name)
+def xml_tag_matches(tag, step, ns):
+    if step == "*":
+        return True
+    if step.startswith("{"):
+        return tag == step
+    if ":" in step:
+        prefix, name = step.split(":", 1)
+        if prefix not in ns:
+            return False
+        return tag == "{%s}%s" % (ns[prefix], name)
+    if "" in ns:
+        return tag == "{%s}%s" % (ns[""], step)
+    return tag == step
+
+
+# parses the beginning of a xml file only, e.g. to preview its structure in the GUI
+# parsing stops after element_limit direct children of root element have been read
+# returns tree with parsed elements and dictionary of namespaces {prefix: namespace}
+def parse_xml_preview(filepath, element_limit):
+    ns = {}
+    root = None
+    depth = 0
+    children = 0
+    for event, node in ET.iterparse(filepath, events=["start-ns", "start", "end"]):
+        if event == "start-ns":
+            ns[node[0]] = node[1]
+        elif event == "start":
+            if root is None:
+                root = node
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 1:
+                children += 1
+                if children >= element_limit:
+                    break
+    return ET.ElementTree(root), ns
 
-        self._DbCursor.execute('''CREATE INDEX iaitreeidindex on trees("'OSM_ID'");''')
-        self._DbConnection.commit()
 
-        self.generate_sql_statement()
+# converts a csv value into a float. Decimal commas are accepted
+def convert_to_real(value):
+    return float(value.replace(",", "."))
 
 
 # Look up UTM zone for longitude
-# Implemented european zones only so far
+# european zones use ETRS89 (ETRS89 / UTM zones 28 to 36, longitude -18 to 36, northern hemisphere)
+# everywhere else WGS84 / UTM zones are used (326zz north, 327zz south of the equator)
 # returns epsg code of corresponding utm zone code
-def get_utm_epsg(long):
-    epsg = 25800
-    add = 0
-    if -18 <= long < -12:
-        add = 28
-    if -12 <= long < -6:
-        add = 29
-    if -6 <= long < 0:
-        add = 30
-    if 0 <= long < 6:
-        add = 31
-    if 6 <= long < 12:
-        add = 32
-    if 12 <= long < 18:
-        add = 33
-    if 18 <= long < 24:
-        add = 34
-    if 24 <= long < 30:
-        add = 35
-    if 30 <= long <= 36:
-        add = 36
-    return epsg+add
+def get_utm_epsg(long, lat=0):
+    zone = min(int(math.floor((long + 180) / 6)) + 1, 60)  # utm zones are 6 degrees wide, zone 1 starts at -180
+    if -18 <= long <= 36 and lat >= 0:
+        return 25800 + min(zone, 36)
+    if lat >= 0:
+        return 32600 + zone
+    return 32700 + zone
@@ -0,0 +1,68 @@
+# this module detects the sqlite data type (INTEGER, REAL or TEXT) of imported values
+# it is shared by all importers (csv, xml and osm)
+
+import re
+
+# patterns of values that are imported as numbers. Decimal commas are replaced by points before matching
+# leading zeros are only allowed in real numbers, integers like "007" stay TEXT (e.g. to keep IDs intact)
+INTEGER_PATTERN = re.compile(r"[+-]?(0+|[1-9][0-9]*)")
+REAL_PATTERN = re.compile(r"[+-]?([0-9]+\.[0-9]*|\.[0-9]+)([eE][+-]?[0-9]+)?|[+-]?[0-9]+[eE][+-]?[0-9]+")
+
+
+# returns the sqlite data type of a single value: "INTEGER", "REAL" or "TEXT"
+def classify_value(value):
+    value = value.replace(",", ".")
+    if INTEGER_PATTERN.fullmatch(value):
+        return "INTEGER"
+    if REAL_PATTERN.fullmatch(value):
+        return "REAL"
+    return "TEXT"
+
+
+# Collects data type evidence of values for several keys (columns, xml tags, osm tags) at once
+# and derives the data type of each key from it
+class DataTypeInspector:
+    def __init__(self):
+        # dictionary {key: [int type found, real type found, text type found]}
+        # keys are stored in the order in which they were inspected first
+        self.__type_flags = {}
+
+    # adds evidence of a value to the data type of a key
+    # empty values (None or "") are ignored to prevent false data type predictions, but key is registered anyway
+    def inspect(self, key, value):
+        flags = self.__type_flags.get(key)
+        if flags is None:
+            flags = [False, False, False]
+            self.__type_flags[key] = flags
+
+        if value is None or value == "":
+            return
+
+        datatype = classify_value(value)
+        if datatype == "INTEGER":
+            flags[0] = True
+        elif datatype == "REAL":
+            flags[1] = True
+        else:
+            flags[2] = True
+
+    # returns True, if key has been inspected already
+    def contains(self, key):
+        return key in self.__type_flags
+
+    # returns list of all inspected keys in the order in which they were found
+    def get_keys(self):
+        return list(self.__type_flags)
+
+    # returns the data type of a key: "INTEGER", "REAL" or "TEXT"
+    # keys without any evidence are "TEXT"
+    def get_datatype(self, key):
+        int_type_in_list, real_type_in_list, text_type_in_list = self.__type_flags.get(key, [False, False, False])
+        if int_type_in_list and not real_type_in_list and not text_type_in_list:
+            data_type = "INTEGER"
+        elif real_type_in_list and not text_type_in_list:
+            data_type = "REAL"
+        else:
+            data_type = "TEXT"
+        return data_type
+
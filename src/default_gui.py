@@ -30,6 +30,23 @@ class MainWindow ( wx.Frame ):
 		self.osm_trees = wx.MenuItem( self.file, wx.ID_ANY, u"Get trees from OSM", wx.EmptyString, wx.ITEM_NORMAL )
 		self.file.Append( self.osm_trees )
 
+		self.osm_file = wx.MenuItem( self.file, wx.ID_ANY, u"Import trees from OSM file", wx.EmptyString, wx.ITEM_NORMAL )
+		self.file.Append( self.osm_file )
+
+		self.file.AppendSeparator()
+
+		self.open_project = wx.MenuItem( self.file, wx.ID_ANY, u"Open project", wx.EmptyString, wx.ITEM_NORMAL )
+		self.file.Append( self.open_project )
+
+		self.save_project = wx.MenuItem( self.file, wx.ID_ANY, u"Save project", wx.EmptyString, wx.ITEM_NORMAL )
+		self.file.Append( self.save_project )
+		self.save_project.Enable( False )
+
+		self.file.AppendSeparator()
+
+		self.work_in_memory = wx.MenuItem( self.file, wx.ID_ANY, u"Work in memory", u"Working database is kept in memory instead of a temporary file. Faster for datasets that fit into memory", wx.ITEM_CHECK )
+		self.file.Append( self.work_in_memory )
+
 		self.m_menu21 = wx.Menu()
 		self.export_citygml = wx.MenuItem( self.m_menu21, wx.ID_ANY, u"CityGML", wx.EmptyString, wx.ITEM_NORMAL )
 		self.m_menu21.Append( self.export_citygml )
@@ -144,6 +161,9 @@ class MainWindow ( wx.Frame ):
 		self.Bind( wx.EVT_CLOSE, self.OnClose )
 		self.Bind( wx.EVT_MENU, self.on_menu_open, id = self.open.GetId() )
 		self.Bind( wx.EVT_MENU, self.on_menu_get_osm_trees, id = self.osm_trees.GetId() )
+		self.Bind( wx.EVT_MENU, self.on_menu_import_osm_file, id = self.osm_file.GetId() )
+		self.Bind( wx.EVT_MENU, self.on_menu_open_project, id = self.open_project.GetId() )
+		self.Bind( wx.EVT_MENU, self.on_menu_save_project, id = self.save_project.GetId() )
 		self.Bind( wx.EVT_MENU, self.on_menu_export_citygml, id = self.export_citygml.GetId() )
 		self.Bind( wx.EVT_MENU, self.on_menu_export_cityjson, id = self.export_cityjson.GetId() )
 		self.Bind( wx.EVT_MENU, self.on_menu_export_ifc_4x1, id = self.export_ifc_4x1.GetId() )
@@ -178,6 +198,15 @@ class MainWindow ( wx.Frame ):
 	def on_menu_get_osm_trees( self, event ):
 		event.Skip()
 
+	def on_menu_import_osm_file( self, event ):
+		event.Skip()
+
+	def on_menu_open_project( self, event ):
+		event.Skip()
+
+	def on_menu_save_project( self, event ):
+		event.Skip()
+
 	def on_menu_export_citygml( self, event ):
 		event.Skip()
 
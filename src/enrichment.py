@@ -1,11 +1,12 @@
 import csv
 import sqlite3
 import threading
-import math
 
 import wx
 
 import default_gui
+import enrichment_core
+import progress_gui
 
 
 # GUI class to import DEM into database
@@ -34,7 +35,7 @@ class ImportHeight(default_gui.import_dem):
         # check if points have been imported already
         # if yes, ask user, if they should be kept in database to use now
         msg = ""
-        con = BasicDemConnection(self.__DbFilePath, 0, self.__mode)
+        con = enrichment_core.BasicDemConnection(self.__DbFilePath, 0, self.__mode)
         try:
             points = con.get_rowcount()
             if points > 0:
@@ -128,19 +129,21 @@ class ImportHeight(default_gui.import_dem):
         self.next.Enable(False)
 
         colstoimport = [self.xvalue.GetSelection(), self.yvalue.GetSelection(), self.heightvalue.GetSelection()]
-        importer = DemImporter(self.__filepath, self.__encoding, self.__seperator, colstoimport, self.epsg.GetValue(),
-                               self.__EmptyLinesBeforeDataStart, self.__DbFilePath, self.__mode)
+        importer = enrichment_core.DemImporter(self.__filepath, self.__encoding, self.__seperator, colstoimport,
+                                               self.epsg.GetValue(), self.__EmptyLinesBeforeDataStart,
+                                               self.__DbFilePath, self.__mode)
 
         # create table in database for elevation data (if not exists already)
         importer.create_table()
 
-        # start the import of file
-        imp = importer.import_file(self.__PointsImported, self.text_rowcount)  # start file import
+        # start the import of file, label shows number of imported points
+        progress = progress_gui.WidgetProgress(label=self.text_rowcount, count_text="%s points imported")
+        imp = importer.import_file(self.__PointsImported, progress)  # start file import
         if not imp[0]:
             importer.rollback()
             msg = wx.MessageDialog(self, imp[1], style=wx.ICON_WARNING | wx.CENTRE)
             msg.ShowModal()
-            self.text_rowcount.SetLabel("%s points imported" % self.__PointsImported)
+            progress.set_text("%s points imported" % self.__PointsImported)
 
         importer.commit()
 
@@ -148,7 +151,7 @@ class ImportHeight(default_gui.import_dem):
         self.__PointsImported = importer.get_rowcount()
 
         # Update Text in GUI to show number of points imported
-        self.text_rowcount.SetLabel("%s points imported" % self.__PointsImported)  # Update label in GUI
+        progress.set_text("%s points imported" % self.__PointsImported)  # Update label in GUI
         self.__ImportedFiles.append(self.__filepath)
 
         importer.close_connection()
@@ -175,10 +178,11 @@ class ImportHeight(default_gui.import_dem):
 
     # method to be called when all files are imported. Finish up import, initialize next step
     def end_next_step(self):
-        connection = BasicDemConnection(self.__DbFilePath, self.epsg.GetValue(), self.__mode)
-        self.text_rowcount.SetLabel("Please Wait: Generating Spatial Index...")
+        connection = enrichment_core.BasicDemConnection(self.__DbFilePath, self.epsg.GetValue(), self.__mode)
+        progress = progress_gui.WidgetProgress(label=self.text_rowcount)
+        progress.set_text("Please Wait: Generating Spatial Index...")
         connection.generate_spatial_index()
-        self.text_rowcount.SetLabel("Please Wait: Generating Convexhull...")
+        progress.set_text("Please Wait: Generating Convexhull...")
         connection.generate_convexhull()
         connection.commit()
         connection.close_connection()
@@ -309,173 +313,6 @@ class ImportHeight(default_gui.import_dem):
         self.heightvalue.SetItems(self.__FileColumns)
 
 
-# Real basic database connection with basic functionality
-# All other database connections inherit from this class
-class BasicConnection:
-    def __init__(self, databasepath, mode):
-        self._DbFilePath = databasepath
-        self._con = sqlite3.connect(self._DbFilePath)
-        self._cursor = self._con.cursor()
-        self._updatecursor = self._con.cursor()
-        self._con.enable_load_extension(True)
-        self._con.execute('SELECT load_extension("mod_spatialite");')
-
-        # next method call to initialize spatial metadata: causes error when called multiple times, but its harmless
-        self._con.execute('SELECT InitSpatialMetaData(1);')
-        self._con.commit()
-
-        self._mode = mode  # importer mode: "dem" or "pointcloud"
-        self._height_table_name = ""  # name of table into which file is imported
-        self._convexhull_table_name = ""  # name of convexhull table
-
-        # name of tables is determined
-        if self._mode == "dem":
-            self._height_table_name = "elevation"
-            self._convexhull_table_name = "convexhull_elevation"
-        elif self._mode == "pointcloud":
-            self._height_table_name = "pointcloud"
-            self._convexhull_table_name = "convexhull_pointcloud"
-
-    # performs a commit
-    def commit(self):
-        self._con.commit()
-
-    def rollback(self):
-        self._con.rollback()
-
-    # closes database connection
-    def close_connection(self):
-        self._con.close()
-
-    # returns number of imported points
-    def get_rowcount(self):
-        self._cursor.execute("SELECT COUNT(*) FROM %s" % self._height_table_name)
-        return self._cursor.fetchone()[0]
-
-    # updates a value in a database column
-    # cannot update with string values yet!!!
-    def update_value(self, tablename, insert_col, insert_val, where_col=None, where_val=None, where_lowercase=False):
-        statement = 'UPDATE %s SET "%s" = %s' % (tablename, insert_col, insert_val)
-        if where_col is not None and where_val is not None:
-            if not where_lowercase:
-                if type(where_val) == str:
-                    statement += ' WHERE "%s" = "%s"' % (where_col, where_val)
-                else:
-                    statement += ' WHERE "%s" = %s' % (where_col, where_val)
-            else:
-                if type(where_val) == str:
-                    statement += ' WHERE lower("%s") = "%s"' % (where_col, where_val)
-                else:
-                    statement += ' WHERE lower("%s") = %s' % (where_col, where_val)
-        statement += ';'
-        self._updatecursor.execute(statement)
-
-    def update_value_where_col_is_null(self, tablename, insert_col, insert_val, where_col):
-        statement = 'UPDATE %s SET "%s" = %s' % (tablename, insert_col, insert_val)
-        statement += ' WHERE "%s" is null;' % where_col
-        self._updatecursor.execute(statement)
-
-
-# Class with basic functionality for DEM importing
-class BasicDemConnection(BasicConnection):
-    def __init__(self, dbpath, ref, mode):
-        BasicConnection.__init__(self, dbpath, mode)
-        self._ReferenceSystemCode = ref
-
-    def delete_points(self):
-        self._cursor.execute("DROP TABLE IF EXISTS %s" % self._height_table_name)
-
-    # ceate a new table and store a convexhull-polygon in it
-    def generate_convexhull(self):
-        self._cursor.execute("DROP TABLE IF EXISTS %s;" % self._convexhull_table_name)
-        self._cursor.execute("CREATE TABLE %s (typ TEXT)" % self._convexhull_table_name)
-        self._cursor.execute(
-            'SELECT AddGeometryColumn("%s", "geom" , %s, "POLYGON", "XY");'
-            % (self._convexhull_table_name, self._ReferenceSystemCode))
-        self._cursor.execute('INSERT INTO %s SELECT "convex", ConvexHull(Collect(geom)) FROM %s;'
-                             % (self._convexhull_table_name, self._height_table_name))
-
-    # create a spatial over geometries
-    def generate_spatial_index(self):
-        self._cursor.execute("SELECT CreateSpatialIndex('%s', 'geom');" % self._height_table_name)
-
-
-# Class to import DEM into database
-class DemImporter(BasicDemConnection):
-    def __init__(self, filepath, encoding, sep, colstoimport, ref, emptylines, dbpath, mode):
-        self.__filepath = filepath
-        self.__encoding = encoding
-        self.__seperator = sep
-        self.__XColIndex = colstoimport[0]
-        self.__YColIndex = colstoimport[1]
-        self.__HColIndex = colstoimport[2]
-        self.__NumberOfEmptyLines = emptylines
-
-        BasicDemConnection.__init__(self, dbpath, ref, mode)
-
-    # class to create elevation table
-    def create_table(self):
-        self._cursor.execute('CREATE TABLE IF NOT EXISTS %s (height REAL);' % self._height_table_name)
-
-        self._cursor.execute("pragma table_info(%s);" % self._height_table_name)
-
-        colnames = []
-        for row in self._cursor:
-            colnames.append(row[1])
-
-        if 'geom' not in colnames:
-            self._cursor.execute('SELECT AddGeometryColumn("%s", "geom" , %s, "POINT", "XY");'
-                                 % (self._height_table_name, self._ReferenceSystemCode))
-        self._con.commit()
-
-    # class to DEM file into database
-    def import_file(self, imported_points, text_count):
-        success = True
-        message = ""
-        imported_row_count = imported_points
-        with open(self.__filepath, newline='', encoding=self.__encoding) as file:
-
-            # skip empty lines at beginning of file
-            counter = 0
-            while counter < self.__NumberOfEmptyLines:
-                file.readline()
-                counter += 1
-
-            csvreader = csv.reader(file, delimiter=self.__seperator)
-            for index, line in enumerate(csvreader):
-                # skip empty lines
-                if not line:
-                    continue
-
-                try:
-                    x = line[self.__XColIndex]
-                    y = line[self.__YColIndex]
-                    h = line[self.__HColIndex]
-                except IndexError:
-                    success = False
-                    message = "Error in line %s" % str(index + self.__NumberOfEmptyLines + 1)
-                    break
-
-                # Create Text to insert point into database
-                pointtext = "GeomFromText('POINT(%s %s)', 5677)" % (x, y)
-
-                # insert point into database
-                try:
-                    self._cursor.execute('INSERT INTO %s VALUES (%s, %s);' % (self._height_table_name, h, pointtext))
-                except sqlite3.OperationalError:
-                    success = False
-                    message = "Error in line %s" % str(index + self.__NumberOfEmptyLines + 1)
-                    break
-
-                imported_row_count += 1
-
-                # Update label in GUI every 10.000 imported lines
-                if imported_row_count % 10000 == 0:
-                    text_count.SetLabel("%s points imported" % imported_row_count)
-
-        return success, message
-
-
 # Derived GUI class to hight values
 class GrabHeight(default_gui.GrabHeight):
     def __init__(self, parent, dbpath):
@@ -594,93 +431,17 @@ class GrabHeight(default_gui.GrabHeight):
             defaultheight = float(self.default_height.GetValue().replace(",", "."))
         except ValueError:
             defaultheight = 0
-        assigner = AssignHeight(self.__DbFilePath, self.GetParent().db, self.id.GetStringSelection(),
-                                self.geom.GetStringSelection(), self.GetParent().db.get_tree_table_name(),
-                                self.gauge, self.use_defaultheight.GetValue(), defaultheight,
-                                self.use_radius.GetValue(), radius)
+        assigner = enrichment_core.AssignHeight(self.__DbFilePath, self.GetParent().db, self.id.GetStringSelection(),
+                                                self.geom.GetStringSelection(), self.GetParent().db.get_tree_table_name(),
+                                                progress_gui.WidgetProgress(self.gauge),
+                                                self.use_defaultheight.GetValue(), defaultheight,
+                                                self.use_radius.GetValue(), radius)
         assigner.assign()
         assigner.commit()
         assigner.close_connection()
         self.EndModal(1)
 
 
-# class that adds hight to the trees
-class AssignHeight(BasicConnection):
-    def __init__(self, dbpath, db, idcol, geomcol, treetable, gauge,
-                 use_defaultheight, defaultheight, use_searchradius, searchradius):
-        BasicConnection.__init__(self, dbpath, "dgm")
-        self.__db = db
-        self.__IdCol = idcol
-        self.__GeomCol = geomcol
-        self.__TreeTableName = treetable
-        self.__gauge = gauge
-        self.__use_defaultheight = use_defaultheight
-        self.__defaultheight = defaultheight
-        self.__use_searchradius = use_searchradius
-        self.__searchradius = searchradius
-
-    # method to do the actual assigning of hights
-    def assign(self):
-        innercursor = self._con.cursor()
-
-        # SELECT part of the statemnet
-        statement = 'SELECT %s."%s", X(%s."%s"), Y(%s."%s") FROM %s, convexhull_elevation'\
-                    % (self.__TreeTableName, self.__IdCol,
-                       self.__TreeTableName, self.__GeomCol,
-                       self.__TreeTableName, self.__GeomCol,
-                       self.__TreeTableName)
-        countstatement = 'SELECT count(%s.ROWID) FROM %s, convexhull_elevation' % (self.__TreeTableName, self.__TreeTableName)
-
-        # WHERE part of the statement
-        statement += ' WHERE Intersects(%s."%s", convexhull_elevation."geom")==1;' % (self.__TreeTableName, self.__GeomCol)
-        countstatement += ' WHERE Intersects(%s."%s", convexhull_elevation."geom")==1;' % (self.__TreeTableName, self.__GeomCol)
-        self._cursor.execute(countstatement)
-        self.__gauge.SetRange(self._cursor.fetchone()[0])
-        self._cursor.execute(statement)
-
-        for idx, row in enumerate(self._cursor):
-            # SELECT part of the inner statement
-            statement = 'SELECT elevation.height, Distance(%s."%s", elevation."geom") FROM elevation, %s' \
-                        % (self.__TreeTableName, self.__GeomCol, self.__TreeTableName)
-
-            # WHERE part of the inner statement
-            if type(row[0]) == str:
-                statement += ' WHERE %s."%s" = "%s"' % (self.__TreeTableName, self.__IdCol, row[0])
-            else:
-                statement += ' WHERE %s."%s" = %s' % (self.__TreeTableName, self.__IdCol, row[0])
-
-            # Add index constraints to statements (MUCH faster querying!)
-            if self.__use_searchradius:
-                x = row[1]  # X koordinate of tree
-                y = row[2]  # Y koordinate of tree
-                statement += ''' AND elevation.ROWID IN'''
-                statement += ''' (SELECT ROWID FROM SpatialIndex WHERE f_table_name = 'elevation' '''
-                statement += '''AND search_frame = BuildCircleMBR(%s, %s, %s))''' % (x, y, self.__searchradius)
-
-            # ORDER BY part of inner statement to find 4 closest points
-            statement += ' ORDER BY Distance(%s."%s", elevation."geom") LIMIT 4;'\
-                         % (self.__TreeTableName, self.__GeomCol)
-
-            innercursor.execute(statement)
-
-            # IDW Interpolation (quadratic weights)
-            zaehler = 0
-            nenner = 0
-            for innerrow in innercursor:
-                weight = 1. / (innerrow[1]) ** 2
-                zaehler += (weight * innerrow[0])
-                nenner += weight
-            hoehe = zaehler / nenner
-
-            self.update_value(self.__TreeTableName, "Height_DEM", hoehe, self.__IdCol, row[0])
-            self.__gauge.SetValue(self.__gauge.GetValue() + 1)
-
-        # assign defaultheight to all other trees
-        if self.__use_defaultheight:
-            self.update_value_where_col_is_null(self.__TreeTableName, "Height_DEM", self.__defaultheight,
-                                                "Height_DEM")
-
-
 class DefaulHeight(default_gui.DefaultHeight):
     def __init__(self, parent, filepath, table):
         default_gui.DefaultHeight.__init__(self, parent)
@@ -704,9 +465,10 @@ class DefaulHeight(default_gui.DefaultHeight):
 
         height = float(self.height_input.GetValue().replace(",", "."))
 
-        db = BasicConnection(self.__dbpath, "dgm")
+        db = enrichment_core.BasicConnection(self.__dbpath, "dgm")
         db.update_value(self.__TreeTableName, self.__default_height_col_name, height)
         db.commit()
+        db.close_connection()
 
         self.EndModal(1234)
 
@@ -824,12 +586,14 @@ class DerivePointcloudGUI(default_gui.pointcloud_process):
         thread.start()
 
     def start_derive(self):
-        self.gauge.SetValue(0)
-        processor = ProcessPointcloud(self.__DbFilePath, self.GetParent().db, self.id.GetStringSelection(),
-                                      self.geom.GetStringSelection(), self.ref_height.GetStringSelection(),
-                                      self.crown_diam.GetStringSelection(), self.crown_unit.GetStringSelection(),
-                                      self.crown_type.GetStringSelection(), self.GetParent().db.get_tree_table_name(),
-                                      self.gauge)
+        processor = enrichment_core.ProcessPointcloud(self.__DbFilePath, self.GetParent().db,
+                                                      self.id.GetStringSelection(), self.geom.GetStringSelection(),
+                                                      self.ref_height.GetStringSelection(),
+                                                      self.crown_diam.GetStringSelection(),
+                                                      self.crown_unit.GetStringSelection(),
+                                                      self.crown_type.GetStringSelection(),
+                                                      self.GetParent().db.get_tree_table_name(),
+                                                      progress_gui.WidgetProgress(self.gauge))
 
         # percentag of points which should be used for tree height
         height_precision = 0.0
@@ -871,6 +635,7 @@ class DerivePointcloudGUI(default_gui.pointcloud_process):
         processor.derive_tree_parameters()  # method to start deriving tree parameters
 
         processor.commit()
+        processor.close_connection()
 
         self.EndModal(1)
 
@@ -968,195 +733,6 @@ class DerivePointcloudGUI(default_gui.pointcloud_process):
             self.tree_height.Enable(False)
 
 
-class ProcessPointcloud(BasicConnection):
-    def __init__(self, dbpath, db, idcol, geomcol, refcol, crowncol, crownunit, crowntype, treetable, gauge):
-        BasicConnection.__init__(self, dbpath, "pointcloud")
-        self.__db = db
-        self.__IdCol = idcol
-        self.__GeomCol = geomcol
-        self.__RefHeightCol = refcol
-        self.__CrownDiamCol = crowncol
-        self.__crown_unit = crownunit
-        self.__crowntype = crowntype
-        self.__DefaultCrownDiam = 0
-        self.__TreeTableName = treetable
-        self.__gauge = gauge
-
-        self.__height_precision = 0.0
-        self.__crown_precision = 0.0
-
-        self.__derive_tree_height = False
-        self.__derive_crown_height = False
-
-        self.__use_height_from_pointcloud = None
-        self.__HeightCol = None
-
-        self.__GroundThreshold = 0
-
-    def derive_tree_parameters(self):
-        innercursor = self._con.cursor()
-
-        # SELECT part of the statemnet
-        if not self.__derive_crown_height or (self.__derive_crown_height and self.__use_height_from_pointcloud):
-            statement = 'SELECT %s."%s", X(%s."%s"), Y(%s."%s"), %s."%s", %s."%s" FROM %s, convexhull_pointcloud' \
-                        % (self.__TreeTableName, self.__IdCol,
-                           self.__TreeTableName, self.__GeomCol,
-                           self.__TreeTableName, self.__GeomCol,
-                           self.__TreeTableName, self.__CrownDiamCol,
-                           self.__TreeTableName, self.__RefHeightCol,
-                           self.__TreeTableName)
-        else:
-            statement = 'SELECT %s."%s", X(%s."%s"), Y(%s."%s"), %s."%s", %s."%s", %s."%s" FROM %s, convexhull_pointcloud' \
-                        % (self.__TreeTableName, self.__IdCol,
-                           self.__TreeTableName, self.__GeomCol,
-                           self.__TreeTableName, self.__GeomCol,
-                           self.__TreeTableName, self.__CrownDiamCol,
-                           self.__TreeTableName, self.__RefHeightCol,
-                           self.__TreeTableName, self.__HeightCol,
-                           self.__TreeTableName)
-
-        countstatement = 'SELECT count(%s.ROWID) FROM %s, convexhull_pointcloud'\
-                         % (self.__TreeTableName, self.__TreeTableName)
-
-        # WHERE part of the statement
-        statement += ' WHERE Intersects(%s."%s", convexhull_pointcloud."geom")==1;'\
-                     % (self.__TreeTableName, self.__GeomCol)
-        countstatement += ' WHERE Intersects(%s."%s", convexhull_pointcloud."geom")==1;'\
-                          % (self.__TreeTableName, self.__GeomCol)
-        self._cursor.execute(countstatement)
-        self.__gauge.SetRange(self._cursor.fetchone()[0])
-        self._cursor.execute(statement)
-
-        for idx, row in enumerate(self._cursor):
-
-            x = row[1]  # X koordinate of tree
-            y = row[2]  # Y koordinate of tree
-            diam = row[3]  # crown diameter of tree
-            ref_height = row[4]
-
-            if diam is None:
-                diam = self.__DefaultCrownDiam
-            else:
-                if self.__crown_unit == "centimeter":
-                    diam /= 100
-                if self.__crowntype == "is circumference":
-                    diam /= math.pi
-
-            if ref_height is None:
-                continue
-
-            # SELECT part of the inner statement
-            statement = 'SELECT pointcloud.height FROM pointcloud, %s' % self.__TreeTableName
-
-            # WHERE part of the inner statement
-            if type(row[0]) == str:
-                statement += ' WHERE %s."%s" = "%s"' % (self.__TreeTableName, self.__IdCol, row[0])
-            else:
-                statement += ' WHERE %s."%s" = %s' % (self.__TreeTableName, self.__IdCol, row[0])
-
-            statement += ' AND DISTANCE(%s."%s", pointcloud.geom) < %s' % (self.__TreeTableName, self.__GeomCol, diam/2)
-
-            statement += ''' AND pointcloud.ROWID IN'''
-            statement += ''' (SELECT ROWID FROM SpatialIndex WHERE f_table_name = 'pointcloud' '''
-            statement += '''AND search_frame = BuildCircleMBR(%s, %s, %s));''' % (x, y, diam)
-
-            innercursor.execute(statement)
-
-            # create list of height values of all points in raidus
-            height_values = []
-            for innerrow in innercursor:
-                if innerrow[0] > ref_height + self.__GroundThreshold:
-                    height_values.append(innerrow[0])
-
-            if not height_values:
-                continue
-
-            # derive tree height from point cloud
-            if self.__derive_tree_height:
-                tree_height_values = sorted(height_values, reverse=True)  # sort list
-                num_height_values = len(tree_height_values)  # length of list
-                num_height_values_used = round(num_height_values * self.__height_precision)  # number of points to use
-                tree_height_values_used = tree_height_values[0:num_height_values_used]  # height values of points to use
-
-                # calculate average of heighest points
-                average = 0
-                for num in tree_height_values_used:
-                    average += num
-
-                try:
-                    # use average height of points to use as tree height
-                    average /= num_height_values_used
-                    tree_height = average-ref_height
-                    self.update_value(self.__TreeTableName, "tree_h_pointcloud", tree_height, self.__IdCol, row[0])
-                except ZeroDivisionError:
-                    if tree_height_values:
-                        # use heightest point as tree height
-                        tree_height = tree_height_values[0] - ref_height
-                        self.update_value(self.__TreeTableName, "tree_h_pointcloud", tree_height, self.__IdCol, row[0])
-
-            # derive crown height from point cloud
-            if self.__derive_crown_height:
-                crown_height_values = sorted(height_values)  # sort point list
-                num_crown_height_values = len(crown_height_values)  # number of points in list
-                num_crown_height_values_used = round(num_crown_height_values * self.__crown_precision)  # number of pts
-                crown_height_values_used = crown_height_values[0:num_crown_height_values_used]  # list of points to use
-
-                # calculate average of lowest points
-                crown_average = 0
-                for num in crown_height_values_used:
-                    crown_average += num
-
-                try:
-                    # use average to calulate crown height
-                    crown_average /= num_crown_height_values_used
-                    if self.__use_height_from_pointcloud:
-                        # use height value from point cloud for calcuoation
-                        crown_height = tree_height - (crown_average - ref_height)
-                    else:
-                        # use height value from column for calcuoation
-                        crown_height = row[5] - (crown_average - ref_height)
-                    self.update_value(self.__TreeTableName, "crown_height_pointcloud", crown_height, self.__IdCol,
-                                      row[0])
-                except ZeroDivisionError:
-                    # use lowest point to calculate crown height
-                    if crown_height_values:
-                        if self.__use_height_from_pointcloud:
-                            # use height value from point cloud for calcuoation
-                            crown_height = tree_height - (crown_height_values[0] - ref_height)
-                        else:
-                            # use height value from column for calcuoation
-                            crown_height = row[5] - (crown_height_values[0] - ref_height)
-                        self.update_value(self.__TreeTableName, "crown_height_pointcloud", crown_height, self.__IdCol,
-                                          row[0])
-
-            # move gauge in gui to indicate progress
-            self.__gauge.SetValue(self.__gauge.GetValue() + 1)
-
-    def set_height_precision(self, val):
-        self.__height_precision = val
-
-    def set_crown_precision(self, val):
-        self.__crown_precision = val
-
-    def set_derive_tree_height(self, val):
-        self.__derive_tree_height = val
-
-    def set_derive_crown_height(self, val):
-        self.__derive_crown_height = val
-
-    def set_height_col(self, val):
-        self.__HeightCol = val
-
-    def set_use_height_from_pointcloud(self, val):
-        self.__use_height_from_pointcloud = val
-
-    def set_ground_threshold(self, val):
-        self.__GroundThreshold = val
-
-    def set_default_crown_diam(self, val):
-        self.__DefaultCrownDiam = val * 2
-
-
 # Class to add Geom objects into the database
 class AddGeometry(default_gui.geom_props):
     def __init__(self, parent):
@@ -1186,6 +762,7 @@ class AddGeometry(default_gui.geom_props):
             self.xvalue.SetStringSelection(coords[0])
             self.yvalue.SetStringSelection(coords[1])
 
+    # id column is not needed to create geometries, it is optional and only remembered in column settings
     def save_column_preselection(self):
         if self.id.GetSelection() != wx.NOT_FOUND:
             self.__col_settings.set_id(self.id.GetStringSelection())
@@ -1203,8 +780,6 @@ class AddGeometry(default_gui.geom_props):
             valid = False
         if self.yvalue.GetSelection() == wx.NOT_FOUND:
             valid = False
-        if self.id.GetSelection() == wx.NOT_FOUND:
-            valid = False
         if self.epsg.GetValue() == "":
             valid = False
 
@@ -1222,25 +797,18 @@ class AddGeometry(default_gui.geom_props):
 
         self.save_column_preselection()
 
-        self.GetParent().db.add_geom_col(self.epsg.GetValue())
-
-        collist = [self.id.GetStringSelection(), self.xvalue.GetStringSelection(), self.yvalue.GetStringSelection()]
-        cursor = self.GetParent().db.get_data_by_collist(collist)
-        for row in cursor:
-            try:
-                self.GetParent().db.update_value("geom", "GeomFromText('POINT(%s %s)',%s)" % (row[1], row[2],
-                                                                                              self.epsg.GetValue()),
-                                                 self.id.GetStringSelection(), row[0])
-            except sqlite3.OperationalError:
-                self.GetParent().db.rollback()
-                self.GetParent().db.remove_col_from_collist("geom")
-                msg = "Something went wrong while creating geometries."
-                dlg = wx.MessageDialog(self, msg, style=wx.ICON_WARNING | wx.CENTRE)
-                dlg.ShowModal()
-                break
-        else:
-            self.GetParent().db.commit()
-        self.GetParent().db.set_contains_geom(True)
+        db = self.GetParent().db
+        success = db.add_geometries(self.xvalue.GetStringSelection(), self.yvalue.GetStringSelection(),
+                                    self.epsg.GetValue())
+        if not success:
+            msg = "Something went wrong while creating geometries."
+            dlg = wx.MessageDialog(self, msg, style=wx.ICON_WARNING | wx.CENTRE)
+            dlg.ShowModal()
+        elif db.get_invalid_geom_count() > 0:
+            msg = "%s rows have coordinates, that could not be converted to points.\n" \
+                  "Their geometry is empty." % db.get_invalid_geom_count()
+            dlg = wx.MessageDialog(self, msg, style=wx.ICON_WARNING | wx.CENTRE)
+            dlg.ShowModal()
         self.EndModal(1)
 
     # method to validate user input
@@ -1284,64 +852,7 @@ class AddCityGmlVegetationCodeGUI(default_gui.add_vegetation_code):
 
     # method to fill the dictionary which is used to look up values
     def fill_dict(self):
-        success = True
-        text = ""
-        try:
-            with open("citygml_vegetation_codes.code", encoding="utf-8") as file:
-                csvfile = csv.reader(file, delimiter=":")
-                for idx, line in enumerate(csvfile):
-
-                    # ignore empty lines
-                    if not line:
-                        continue
-
-                    # ignore comments
-                    if line[0][0] == "#":
-                        continue
-
-                    # Error if there are more than two Doppelpunkt in a line
-                    if len(line) < 3:
-                        text = "Cannot import Species vegetation codes\n" \
-                               "Error in file citygml_vegetation_codes.code in line %s:\n" \
-                               "Less than 3 colons in line detected." % str(idx+1)
-                        self.__CodeList.clear()
-                        success = False
-                        break
-
-                    # Error if there are more than two Doppelpunkt in a line
-                    if len(line) > 3:
-                        text = "Cannot import Species vegetation codes\n" \
-                               "Error in file citygml_vegetation_codes.code in line %s:\n" \
-                               "More than 3 colons in line detected." % str(idx + 1)
-                        self.__CodeList.clear()
-                        success = False
-                        break
-
-                    # species code must be cast to an integer
-                    try:
-                        entry = [line[0], int(line[1]), int(line[2])]
-                    except ValueError:
-                        text = "Cannot import Species vegetation codes\n" \
-                               "Error in file citygml_vegetation_codes.code in line %s:\n" \
-                               "Code not an integer." % str(idx + 1)
-                        self.__CodeList.clear()
-                        success = False
-                        break
-
-                    if entry[2] not in [1060, 1070, 9999]:
-                        text = "Cannot import Species vegetation codes.\n" \
-                               "Error in file citygml_vegetation_codes.code in line %s:\n" \
-                               "CityGML class code not supported. Supported class codes are 1060, 1070, 9999.\n" \
-                               "Class code %s detected." % (str(idx+1), str(entry[2]))
-                        self.__CodeList.clear()
-                        success = False
-                        break
-
-                    self.__CodeList.append(entry)
-        except FileNotFoundError:
-            success = False
-            text = "Cannot import Species Vegetation codes.\n" \
-                   "Could not find file citygml_vegetation_codes.code in curent directory."
+        success, text, self.__CodeList = enrichment_core.read_vegetation_codes("citygml_vegetation_codes.code")
         return success, text
 
     # method is called when choice is changed
@@ -1364,9 +875,6 @@ class AddCityGmlVegetationCodeGUI(default_gui.add_vegetation_code):
         self.GetParent().db.add_col(self.__species_col_name, "INT")  # add species code column to database table
         self.GetParent().db.add_col(self.__class_col_name, "INT")  # add species code column to database table
         self.GetParent().db.commit()
-        con = BasicConnection(self.__DbPath, None)
-        for entry in self.__CodeList:
-            con.update_value(self.__DbTreeTableName, self.__species_col_name, entry[1], veg_column, entry[0], True)
-            con.update_value(self.__DbTreeTableName, self.__class_col_name, entry[2], veg_column, entry[0], True)
-        con.commit()
+        enrichment_core.assign_vegetation_codes(self.__DbPath, self.__DbTreeTableName, veg_column,
+                                                self.__species_col_name, self.__class_col_name, self.__CodeList)
         self.EndModal(1)
@@ -0,0 +1,540 @@
+import csv
+import sqlite3
+import math
+
+import connection_manager
+
+
+# Real basic database connection with basic functionality
+# All other database connections inherit from this class
+class BasicConnection:
+    # profile: performance profile of connection (see connection_manager.PROFILES)
+    # if None, profile selected for database is used
+    def __init__(self, databasepath, mode, profile=None):
+        self._DbFilePath = databasepath
+
+        # connection is taken from connection pool: spatialite is already loaded and spatial metadata initialized
+        self._con = connection_manager.get_connection(self._DbFilePath, profile)
+        spatialite_status = connection_manager.get_spatialite_status(self._con)
+        if not spatialite_status[0]:
+            connection_manager.release_connection(self._con)
+            raise sqlite3.OperationalError(spatialite_status[1])
+        self._cursor = self._con.cursor()
+        self._updatecursor = self._con.cursor()
+
+        self._mode = mode  # importer mode: "dem" or "pointcloud"
+        self._height_table_name = ""  # name of table into which file is imported
+        self._convexhull_table_name = ""  # name of convexhull table
+
+        # name of tables is determined
+        if self._mode == "dem":
+            self._height_table_name = "elevation"
+            self._convexhull_table_name = "convexhull_elevation"
+        elif self._mode == "pointcloud":
+            self._height_table_name = "pointcloud"
+            self._convexhull_table_name = "convexhull_pointcloud"
+
+    # performs a commit
+    def commit(self):
+        self._con.commit()
+
+    def rollback(self):
+        self._con.rollback()
+
+    # sets performance profile of connection (see connection_manager.PROFILES)
+    def set_performance_profile(self, profile):
+        connection_manager.set_profile(self._con, profile)
+
+    # closes database connection: connection is handed back to connection pool
+    def close_connection(self):
+        if self._con is not None:
+            connection_manager.release_connection(self._con)
+            self._con = None
+
+    # returns number of imported points
+    def get_rowcount(self):
+        self._cursor.execute("SELECT COUNT(*) FROM %s" % self._height_table_name)
+        return self._cursor.fetchone()[0]
+
+    # updates a value in a database column
+    # cannot update with string values yet!!!
+    def update_value(self, tablename, insert_col, insert_val, where_col=None, where_val=None, where_lowercase=False):
+        statement = 'UPDATE %s SET "%s" = %s' % (tablename, insert_col, insert_val)
+        if where_col is not None and where_val is not None:
+            if not where_lowercase:
+                if type(where_val) == str:
+                    statement += ' WHERE "%s" = "%s"' % (where_col, where_val)
+                else:
+                    statement += ' WHERE "%s" = %s' % (where_col, where_val)
+            else:
+                if type(where_val) == str:
+                    statement += ' WHERE lower("%s") = "%s"' % (where_col, where_val)
+                else:
+                    statement += ' WHERE lower("%s") = %s' % (where_col, where_val)
+        statement += ';'
+        self._updatecursor.execute(statement)
+
+    # writes values into a column: every row gets the value of its key (key column, optionally lowercase)
+    # values: list of (key, value) tuples. All values are written with one statement (see connection_manager)
+    def bulk_update(self, tablename, insert_col, key_col, values, key_lowercase=False):
+        connection_manager.bulk_update(self._con, tablename, insert_col, key_col, values, key_lowercase)
+
+    def update_value_where_col_is_null(self, tablename, insert_col, insert_val, where_col):
+        statement = 'UPDATE %s SET "%s" = %s' % (tablename, insert_col, insert_val)
+        statement += ' WHERE "%s" is null;' % where_col
+        self._updatecursor.execute(statement)
+
+
+# Class with basic functionality for DEM importing
+class BasicDemConnection(BasicConnection):
+    def __init__(self, dbpath, ref, mode, profile=None):
+        BasicConnection.__init__(self, dbpath, mode, profile)
+        self._ReferenceSystemCode = ref
+
+    def delete_points(self):
+        self._cursor.execute("DROP TABLE IF EXISTS %s" % self._height_table_name)
+
+    # ceate a new table and store a convexhull-polygon in it
+    def generate_convexhull(self):
+        self._cursor.execute("DROP TABLE IF EXISTS %s;" % self._convexhull_table_name)
+        self._cursor.execute("CREATE TABLE %s (typ TEXT)" % self._convexhull_table_name)
+        self._cursor.execute(
+            'SELECT AddGeometryColumn("%s", "geom" , %s, "POLYGON", "XY");'
+            % (self._convexhull_table_name, self._ReferenceSystemCode))
+        self._cursor.execute('INSERT INTO %s SELECT "convex", ConvexHull(Collect(geom)) FROM %s;'
+                             % (self._convexhull_table_name, self._height_table_name))
+
+    # create a spatial over geometries
+    def generate_spatial_index(self):
+        self._cursor.execute("SELECT CreateSpatialIndex('%s', 'geom');" % self._height_table_name)
+
+
+# Class to import DEM into database
+class DemImporter(BasicDemConnection):
+    def __init__(self, filepath, encoding, sep, colstoimport, ref, emptylines, dbpath, mode):
+        self.__filepath = filepath
+        self.__encoding = encoding
+        self.__seperator = sep
+        self.__XColIndex = colstoimport[0]
+        self.__YColIndex = colstoimport[1]
+        self.__HColIndex = colstoimport[2]
+        self.__NumberOfEmptyLines = emptylines
+
+        # millions of points may be imported: bulk import profile is used
+        BasicDemConnection.__init__(self, dbpath, ref, mode, connection_manager.BULK_IMPORT_PROFILE)
+
+    # class to create elevation table
+    def create_table(self):
+        self._cursor.execute('CREATE TABLE IF NOT EXISTS %s (height REAL);' % self._height_table_name)
+
+        self._cursor.execute("pragma table_info(%s);" % self._height_table_name)
+
+        colnames = []
+        for row in self._cursor:
+            colnames.append(row[1])
+
+        if 'geom' not in colnames:
+            self._cursor.execute('SELECT AddGeometryColumn("%s", "geom" , %s, "POINT", "XY");'
+                                 % (self._height_table_name, self._ReferenceSystemCode))
+        self._con.commit()
+
+    # class to DEM file into database
+    # progress: ProgressReporter (see module progress), count is total number of imported points
+    def import_file(self, imported_points, progress):
+        success = True
+        message = ""
+        imported_row_count = imported_points
+        with open(self.__filepath, newline='', encoding=self.__encoding) as file:
+
+            # skip empty lines at beginning of file
+            counter = 0
+            while counter < self.__NumberOfEmptyLines:
+                file.readline()
+                counter += 1
+
+            csvreader = csv.reader(file, delimiter=self.__seperator)
+            for index, line in enumerate(csvreader):
+                # skip empty lines
+                if not line:
+                    continue
+
+                try:
+                    x = line[self.__XColIndex]
+                    y = line[self.__YColIndex]
+                    h = line[self.__HColIndex]
+                except IndexError:
+                    success = False
+                    message = "Error in line %s" % str(index + self.__NumberOfEmptyLines + 1)
+                    break
+
+                # Create Text to insert point into database
+                pointtext = "GeomFromText('POINT(%s %s)', 5677)" % (x, y)
+
+                # insert point into database
+                try:
+                    self._cursor.execute('INSERT INTO %s VALUES (%s, %s);' % (self._height_table_name, h, pointtext))
+                except sqlite3.OperationalError:
+                    success = False
+                    message = "Error in line %s" % str(index + self.__NumberOfEmptyLines + 1)
+                    break
+
+                imported_row_count += 1
+                progress.update(imported_row_count)
+
+        progress.finish()
+        return success, message
+
+
+# class that adds hight to the trees
+class AssignHeight(BasicConnection):
+    # progress: ProgressReporter (see module progress), progress value is number of processed trees
+    def __init__(self, dbpath, db, idcol, geomcol, treetable, progress,
+                 use_defaultheight, defaultheight, use_searchradius, searchradius):
+        BasicConnection.__init__(self, dbpath, "dgm")
+        self.__db = db
+        self.__IdCol = idcol
+        self.__GeomCol = geomcol
+        self.__TreeTableName = treetable
+        self.__progress = progress
+        self.__use_defaultheight = use_defaultheight
+        self.__defaultheight = defaultheight
+        self.__use_searchradius = use_searchradius
+        self.__searchradius = searchradius
+
+    # method to do the actual assigning of hights
+    def assign(self):
+        self.__db.create_id_index(self.__IdCol)  # trees are looked up by id for every tree
+        innercursor = self._con.cursor()
+
+        # SELECT part of the statemnet
+        statement = 'SELECT %s."%s", X(%s."%s"), Y(%s."%s") FROM %s, convexhull_elevation'\
+                    % (self.__TreeTableName, self.__IdCol,
+                       self.__TreeTableName, self.__GeomCol,
+                       self.__TreeTableName, self.__GeomCol,
+                       self.__TreeTableName)
+        countstatement = 'SELECT count(%s.ROWID) FROM %s, convexhull_elevation' % (self.__TreeTableName, self.__TreeTableName)
+
+        # WHERE part of the statement
+        statement += ' WHERE Intersects(%s."%s", convexhull_elevation."geom")==1;' % (self.__TreeTableName, self.__GeomCol)
+        countstatement += ' WHERE Intersects(%s."%s", convexhull_elevation."geom")==1;' % (self.__TreeTableName, self.__GeomCol)
+        self._cursor.execute(countstatement)
+        self.__progress.start(self._cursor.fetchone()[0])
+        self._cursor.execute(statement)
+
+        # heights are collected and written in batches
+        height_update = connection_manager.BulkUpdate(self._con, self.__TreeTableName, "Height_DEM", self.__IdCol)
+        for idx, row in enumerate(self._cursor):
+            # SELECT part of the inner statement
+            statement = 'SELECT elevation.height, Distance(%s."%s", elevation."geom") FROM elevation, %s' \
+                        % (self.__TreeTableName, self.__GeomCol, self.__TreeTableName)
+
+            # WHERE part of the inner statement
+            if type(row[0]) == str:
+                statement += ' WHERE %s."%s" = "%s"' % (self.__TreeTableName, self.__IdCol, row[0])
+            else:
+                statement += ' WHERE %s."%s" = %s' % (self.__TreeTableName, self.__IdCol, row[0])
+
+            # Add index constraints to statements (MUCH faster querying!)
+            if self.__use_searchradius:
+                x = row[1]  # X koordinate of tree
+                y = row[2]  # Y koordinate of tree
+                statement += ''' AND elevation.ROWID IN'''
+                statement += ''' (SELECT ROWID FROM SpatialIndex WHERE f_table_name = 'elevation' '''
+                statement += '''AND search_frame = BuildCircleMBR(%s, %s, %s))''' % (x, y, self.__searchradius)
+
+            # ORDER BY part of inner statement to find 4 closest points
+            statement += ' ORDER BY Distance(%s."%s", elevation."geom") LIMIT 4;'\
+                         % (self.__TreeTableName, self.__GeomCol)
+
+            innercursor.execute(statement)
+
+            # IDW Interpolation (quadratic weights)
+            zaehler = 0
+            nenner = 0
+            for innerrow in innercursor:
+                weight = 1. / (innerrow[1]) ** 2
+                zaehler += (weight * innerrow[0])
+                nenner += weight
+            hoehe = zaehler / nenner
+
+            height_update.add(row[0], hoehe)
+            self.__progress.advance()
+        height_update.flush()
+        self.__progress.finish()
+
+        # assign defaultheight to all other trees
+        if self.__use_defaultheight:
+            self.update_value_where_col_is_null(self.__TreeTableName, "Height_DEM", self.__defaultheight,
+                                                "Height_DEM")
+
+
+class ProcessPointcloud(BasicConnection):
+    # progress: ProgressReporter (see module progress), progress value is number of processed trees
+    def __init__(self, dbpath, db, idcol, geomcol, refcol, crowncol, crownunit, crowntype, treetable, progress):
+        BasicConnection.__init__(self, dbpath, "pointcloud")
+        self.__db = db
+        self.__IdCol = idcol
+        self.__GeomCol = geomcol
+        self.__RefHeightCol = refcol
+        self.__CrownDiamCol = crowncol
+        self.__crown_unit = crownunit
+        self.__crowntype = crowntype
+        self.__DefaultCrownDiam = 0
+        self.__TreeTableName = treetable
+        self.__progress = progress
+
+        self.__height_precision = 0.0
+        self.__crown_precision = 0.0
+
+        self.__derive_tree_height = False
+        self.__derive_crown_height = False
+
+        self.__use_height_from_pointcloud = None
+        self.__HeightCol = None
+
+        self.__GroundThreshold = 0
+
+    def derive_tree_parameters(self):
+        self.__db.create_id_index(self.__IdCol)  # trees are looked up by id for every tree
+        innercursor = self._con.cursor()
+
+        # SELECT part of the statemnet
+        if not self.__derive_crown_height or (self.__derive_crown_height and self.__use_height_from_pointcloud):
+            statement = 'SELECT %s."%s", X(%s."%s"), Y(%s."%s"), %s."%s", %s."%s" FROM %s, convexhull_pointcloud' \
+                        % (self.__TreeTableName, self.__IdCol,
+                           self.__TreeTableName, self.__GeomCol,
+                           self.__TreeTableName, self.__GeomCol,
+                           self.__TreeTableName, self.__CrownDiamCol,
+                           self.__TreeTableName, self.__RefHeightCol,
+                           self.__TreeTableName)
+        else:
+            statement = 'SELECT %s."%s", X(%s."%s"), Y(%s."%s"), %s."%s", %s."%s", %s."%s" FROM %s, convexhull_pointcloud' \
+                        % (self.__TreeTableName, self.__IdCol,
+                           self.__TreeTableName, self.__GeomCol,
+                           self.__TreeTableName, self.__GeomCol,
+                           self.__TreeTableName, self.__CrownDiamCol,
+                           self.__TreeTableName, self.__RefHeightCol,
+                           self.__TreeTableName, self.__HeightCol,
+                           self.__TreeTableName)
+
+        countstatement = 'SELECT count(%s.ROWID) FROM %s, convexhull_pointcloud'\
+                         % (self.__TreeTableName, self.__TreeTableName)
+
+        # WHERE part of the statement
+        statement += ' WHERE Intersects(%s."%s", convexhull_pointcloud."geom")==1;'\
+                     % (self.__TreeTableName, self.__GeomCol)
+        countstatement += ' WHERE Intersects(%s."%s", convexhull_pointcloud."geom")==1;'\
+                          % (self.__TreeTableName, self.__GeomCol)
+        self._cursor.execute(countstatement)
+        self.__progress.start(self._cursor.fetchone()[0])
+        self._cursor.execute(statement)
+
+        # derived heights are collected and written in batches
+        tree_height_update = connection_manager.BulkUpdate(self._con, self.__TreeTableName, "tree_h_pointcloud",
+                                                           self.__IdCol)
+        crown_height_update = connection_manager.BulkUpdate(self._con, self.__TreeTableName,
+                                                            "crown_height_pointcloud", self.__IdCol)
+        for idx, row in enumerate(self._cursor):
+
+            x = row[1]  # X koordinate of tree
+            y = row[2]  # Y koordinate of tree
+            diam = row[3]  # crown diameter of tree
+            ref_height = row[4]
+
+            if diam is None:
+                diam = self.__DefaultCrownDiam
+            else:
+                if self.__crown_unit == "centimeter":
+                    diam /= 100
+                if self.__crowntype == "is circumference":
+                    diam /= math.pi
+
+            if ref_height is None:
+                continue
+
+            # SELECT part of the inner statement
+            statement = 'SELECT pointcloud.height FROM pointcloud, %s' % self.__TreeTableName
+
+            # WHERE part of the inner statement
+            if type(row[0]) == str:
+                statement += ' WHERE %s."%s" = "%s"' % (self.__TreeTableName, self.__IdCol, row[0])
+            else:
+                statement += ' WHERE %s."%s" = %s' % (self.__TreeTableName, self.__IdCol, row[0])
+
+            statement += ' AND DISTANCE(%s."%s", pointcloud.geom) < %s' % (self.__TreeTableName, self.__GeomCol, diam/2)
+
+            statement += ''' AND pointcloud.ROWID IN'''
+            statement += ''' (SELECT ROWID FROM SpatialIndex WHERE f_table_name = 'pointcloud' '''
+            statement += '''AND search_frame = BuildCircleMBR(%s, %s, %s));''' % (x, y, diam)
+
+            innercursor.execute(statement)
+
+            # create list of height values of all points in raidus
+            height_values = []
+            for innerrow in innercursor:
+                if innerrow[0] > ref_height + self.__GroundThreshold:
+                    height_values.append(innerrow[0])
+
+            if not height_values:
+                continue
+
+            # derive tree height from point cloud
+            if self.__derive_tree_height:
+                tree_height_values = sorted(height_values, reverse=True)  # sort list
+                num_height_values = len(tree_height_values)  # length of list
+                num_height_values_used = round(num_height_values * self.__height_precision)  # number of points to use
+                tree_height_values_used = tree_height_values[0:num_height_values_used]  # height values of points to use
+
+                # calculate average of heighest points
+                average = 0
+                for num in tree_height_values_used:
+                    average += num
+
+                try:
+                    # use average height of points to use as tree height
+                    average /= num_height_values_used
+                    tree_height = average-ref_height
+                    tree_height_update.add(row[0], tree_height)
+                except ZeroDivisionError:
+                    if tree_height_values:
+                        # use heightest point as tree height
+                        tree_height = tree_height_values[0] - ref_height
+                        tree_height_update.add(row[0], tree_height)
+
+            # derive crown height from point cloud
+            if self.__derive_crown_height:
+                crown_height_values = sorted(height_values)  # sort point list
+                num_crown_height_values = len(crown_height_values)  # number of points in list
+                num_crown_height_values_used = round(num_crown_height_values * self.__crown_precision)  # number of pts
+                crown_height_values_used = crown_height_values[0:num_crown_height_values_used]  # list of points to use
+
+                # calculate average of lowest points
+                crown_average = 0
+                for num in crown_height_values_used:
+                    crown_average += num
+
+                try:
+                    # use average to calulate crown height
+                    crown_average /= num_crown_height_values_used
+                    if self.__use_height_from_pointcloud:
+                        # use height value from point cloud for calcuoation
+                        crown_height = tree_height - (crown_average - ref_height)
+                    else:
+                        # use height value from column for calcuoation
+                        crown_height = row[5] - (crown_average - ref_height)
+                    crown_height_update.add(row[0], crown_height)
+                except ZeroDivisionError:
+                    # use lowest point to calculate crown height
+                    if crown_height_values:
+                        if self.__use_height_from_pointcloud:
+                            # use height value from point cloud for calcuoation
+                            crown_height = tree_height - (crown_height_values[0] - ref_height)
+                        else:
+                            # use height value from column for calcuoation
+                            crown_height = row[5] - (crown_height_values[0] - ref_height)
+                        crown_height_update.add(row[0], crown_height)
+
+            # report progress (output is updated only a few times per second)
+            self.__progress.advance()
+        tree_height_update.flush()
+        crown_height_update.flush()
+        self.__progress.finish()
+
+    def set_height_precision(self, val):
+        self.__height_precision = val
+
+    def set_crown_precision(self, val):
+        self.__crown_precision = val
+
+    def set_derive_tree_height(self, val):
+        self.__derive_tree_height = val
+
+    def set_derive_crown_height(self, val):
+        self.__derive_crown_height = val
+
+    def set_height_col(self, val):
+        self.__HeightCol = val
+
+    def set_use_height_from_pointcloud(self, val):
+        self.__use_height_from_pointcloud = val
+
+    def set_ground_threshold(self, val):
+        self.__GroundThreshold = val
+
+    def set_default_crown_diam(self, val):
+        self.__DefaultCrownDiam = val * 2
+
+
+# reads CityGML species and class codes from code file (lines: botanical name:species code:class code)
+# returns success, error message and list of code entries [botanical name, species code, class code]
+def read_vegetation_codes(filepath):
+    success = True
+    text = ""
+    code_list = []
+    try:
+        with open(filepath, encoding="utf-8") as file:
+            csvfile = csv.reader(file, delimiter=":")
+            for idx, line in enumerate(csvfile):
+
+                # ignore empty lines
+                if not line:
+                    continue
+
+                # ignore comments
+                if line[0][0] == "#":
+                    continue
+
+                # Error if there are more than two Doppelpunkt in a line
+                if len(line) < 3:
+                    text = "Cannot import Species vegetation codes\n" \
+                           "Error in file %s in line %s:\n" \
+                           "Less than 3 colons in line detected." % (filepath, str(idx+1))
+                    code_list.clear()
+                    success = False
+                    break
+
+                # Error if there are more than two Doppelpunkt in a line
+                if len(line) > 3:
+                    text = "Cannot import Species vegetation codes\n" \
+                           "Error in file %s in line %s:\n" \
+                           "More than 3 colons in line detected." % (filepath, str(idx + 1))
+                    code_list.clear()
+                    success = False
+                    break
+
+                # species code must be cast to an integer
+                try:
+                    entry = [line[0], int(line[1]), int(line[2])]
+                except ValueError:
+                    text = "Cannot import Species vegetation codes\n" \
+                           "Error in file %s in line %s:\n" \
+                           "Code not an integer." % (filepath, str(idx + 1))
+                    code_list.clear()
+                    success = False
+                    break
+
+                if entry[2] not in [1060, 1070, 9999]:
+                    text = "Cannot import Species vegetation codes.\n" \
+                           "Error in file %s in line %s:\n" \
+                           "CityGML class code not supported. Supported class codes are 1060, 1070, 9999.\n" \
+                           "Class code %s detected." % (filepath, str(idx+1), str(entry[2]))
+                    code_list.clear()
+                    success = False
+                    break
+
+                code_list.append(entry)
+    except FileNotFoundError:
+        success = False
+        text = "Cannot import Species Vegetation codes.\n" \
+               "Could not find file %s." % filepath
+    return success, text, code_list
+
+
+# writes CityGML species and class codes into tree table
+# trees are matched by botanical name in column veg_column (lowercase)
+def assign_vegetation_codes(dbpath, tablename, veg_column, species_col, class_col, code_list):
+    con = BasicConnection(dbpath, None)
+    con.bulk_update(tablename, species_col, veg_column, [(entry[0], entry[1]) for entry in code_list], True)
+    con.bulk_update(tablename, class_col, veg_column, [(entry[0], entry[2]) for entry in code_list], True)
+    con.commit()
+    con.close_connection()
@@ -1,5 +1,6 @@
 from pyproj import CRS
 from pyproj import Transformer
+import functools
 import math
 
 # do not delete this line of code
@@ -1049,7 +1050,15 @@ def add_cityjson_number(boundaries_list, number):
             boundaries_list[i] += number
 
 
+@functools.lru_cache(maxsize=16)
 def get_transformer(from_epsg, to_epsg):
+    """
+    Creates a transformer between two coordinate reference systems
+    Transformers are cached, since creating them is expensive (same transformer is returned for same epsg codes)
+    :param from_epsg: EPSG code of source coordinate reference system
+    :param to_epsg: EPSG code of target coordinate reference system
+    :return: pyproj.Transformer() object
+    """
     source_epsg = CRS.from_epsg(from_epsg)
     target_epsg = CRS.from_epsg(to_epsg)
 
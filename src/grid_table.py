@@ -0,0 +1,156 @@
+# virtual table of the main data grid
+# the grid asks the table for the values of visible cells only. Values are read page by page from the database,
+# recently used pages are kept in a cache. Memory usage depends on the size of the cache, not on the size of the data
+# sorted rows are read through the sort permutation of the column (rowids in sorted order, see Database):
+# the rowids of a page are looked up in the permutation, so no page requires sorting the table
+
+from collections import OrderedDict
+
+import wx
+import wx.grid
+
+PAGE_SIZE = 200  # number of rows read from database at once
+CACHE_PAGES = 50  # number of pages kept in cache (least recently used pages are removed first)
+AUTOSIZE_ROWS = 200  # number of rows, that are used to determine column widths
+
+ID_COLOUR = wx.Colour(255, 255, 128)  # background colour of ID columns (ROWID or IAI_TreeID)
+
+
+# grid table, that reads values of visible rows from database
+class DatabaseGridTable(wx.grid.GridTableBase):
+    # db: Database object. If None, table is empty
+    # sort_col: rows are sorted by this column. If None, rows are sorted by rowid (order of import)
+    def __init__(self, db, sort_col=None, descending=False):
+        wx.grid.GridTableBase.__init__(self)
+        self.__db = db
+        self.__SortCol = None
+        self.__descending = False
+        self.__permutation = None  # rowids sorted by sort column, None if rows are sorted by rowid
+
+        if db is not None:
+            self.__ColLabels = db.get_column_names()
+            self.__RowCount = db.get_number_of_tablerecords()
+        else:
+            self.__ColLabels = []
+            self.__RowCount = 0
+
+        self.__pages = OrderedDict()  # page number: list of rows, ordered from least to most recently used
+        self.__PageKeys = {}  # page number: key of last row of page, to read following page (keyset pagination)
+
+        # ID columns are highlighted: first column (ROWID or IAI_TreeID), second column if both are used
+        self.__IdColumns = []
+        if db is not None:
+            if db.get_create_id() or db.get_use_rowid():
+                self.__IdColumns.append(0)
+            if db.get_create_id() and db.get_use_rowid():
+                self.__IdColumns.append(1)
+        self.__IdAttr = wx.grid.GridCellAttr()
+        self.__IdAttr.SetBackgroundColour(ID_COLOUR)
+
+        self.set_sorting(sort_col, descending)
+
+    # changes order of rows. Columns (labels, order, width, visibility) are not affected
+    # grid must be refreshed afterwards
+    # sort_col: rows are sorted by this column. If None, rows are sorted by rowid (order of import)
+    def set_sorting(self, sort_col, descending=False):
+        self.__SortCol = sort_col
+        self.__descending = descending
+        if sort_col is not None and self.__db is not None:
+            self.__permutation = self.__db.get_sort_permutation(sort_col)
+        else:
+            self.__permutation = None
+        self.__pages.clear()
+        self.__PageKeys.clear()
+
+    def GetNumberRows(self):
+        return self.__RowCount
+
+    def GetNumberCols(self):
+        return len(self.__ColLabels)
+
+    def GetColLabelValue(self, col):
+        return self.__ColLabels[col]
+
+    # column labels are changed to show sort indicators
+    def SetColLabelValue(self, col, value):
+        self.__ColLabels[col] = value
+
+    def IsEmptyCell(self, row, col):
+        return self.GetValue(row, col) == ""
+
+    # returns value of a cell as string, empty string for NULL values
+    # empty string is returned as well, if row does not exist (anymore): page is short, if table has changed
+    # after row count and sort order of this table have been read
+    def GetValue(self, row, col):
+        page = self.get_page(row // PAGE_SIZE)
+        if row % PAGE_SIZE >= len(page):
+            return ""
+        value = page[row % PAGE_SIZE][col]
+        if value is None:
+            return ""
+        return str(value)
+
+    # grid is read only
+    def SetValue(self, row, col, value):
+        pass
+
+    # returns cell attributes: background colour of ID columns
+    def GetAttr(self, row, col, kind):
+        if col in self.__IdColumns:
+            self.__IdAttr.IncRef()
+            return self.__IdAttr
+        return None
+
+    # returns rows of a page from cache, or reads them from database if page is not cached
+    def get_page(self, page_number):
+        if page_number in self.__pages:
+            self.__pages.move_to_end(page_number)
+            return self.__pages[page_number]
+
+        # sorted rows are read by rowids of page in sort permutation
+        # unsorted rows: following page is read by key of last row of previous page (fast), other pages by offset
+        previous_key = self.__PageKeys.get(page_number - 1)
+        # permutation is indexed by its own length: it may differ from row count, if table has changed meanwhile
+        if self.__permutation is not None:
+            permutation_length = len(self.__permutation)
+            start = page_number * PAGE_SIZE
+            end = min(start + PAGE_SIZE, permutation_length)
+            if self.__descending:
+                rowids = [self.__permutation[permutation_length - 1 - i] for i in range(start, end)]
+            else:
+                rowids = self.__permutation[start:end]
+            rows = self.__db.get_data_by_rowids(rowids)
+            last_key = None
+        elif previous_key is not None:
+            rows, last_key = self.__db.get_data_page(PAGE_SIZE, previous_key)
+        else:
+            rows, last_key = self.__db.get_data_page(PAGE_SIZE, offset=page_number * PAGE_SIZE)
+        self.__PageKeys[page_number] = last_key
+
+        self.__pages[page_number] = rows
+        if len(self.__pages) > CACHE_PAGES:
+            self.__pages.popitem(last=False)
+        return rows
+
+    # returns rows of the first page (at most AUTOSIZE_ROWS rows), e.g. to determine column widths
+    def get_first_rows(self):
+        if self.__RowCount == 0:
+            return []
+        return self.get_page(0)[:AUTOSIZE_ROWS]
+
+
+# sets widths of grid columns, so labels and values of the first rows fit into columns
+# replaces grid.AutoSizeColumns(), which would read all rows of the table
+def autosize_columns(grid, table):
+    rows = table.get_first_rows()
+    label_font = grid.GetLabelFont()
+    cell_font = grid.GetDefaultCellFont()
+    margin = 10
+    for col in range(table.GetNumberCols()):
+        width = grid.GetFullTextExtent(table.GetColLabelValue(col), label_font)[0]
+        for row in rows:
+            value = row[col]
+            if value is not None:
+                width = max(width, grid.GetFullTextExtent(str(value), cell_font)[0])
+        grid.SetColMinimalWidth(col, width + margin)
+        grid.SetColSize(col, width + margin)
@@ -0,0 +1,283 @@
+# reader for OpenStreetMap PBF files (.osm.pbf), e.g. extracts from download.geofabrik.de
+# pure python implementation of the file format (protocol buffers, zlib compressed blocks), no additional packages
+# file is read block by block, so only one block (max. 32 MB) is held in memory at any time
+# format specification: https://wiki.openstreetmap.org/wiki/PBF_Format
+
+import struct
+import zlib
+
+
+# custom exception: file is not a valid PBF file or uses unsupported features
+class PbfFormatException(Exception):
+    pass
+
+
+# reads a varint from buffer at position pos
+# returns value and position after varint
+def read_varint(buf, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+# converts zigzag encoded varint into signed integer (protobuf sint32/sint64)
+def zigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+# converts varint into signed 64 bit integer (protobuf int64, negative values are stored as two's complement)
+def to_int64(value):
+    if value >= 1 << 63:
+        value -= 1 << 64
+    return value
+
+
+# iterates over all fields of a protobuf message
+# yields field number, wire type and value
+# value is an integer for varints and a bytes object (memoryview) for length delimited fields
+def iter_fields(buf):
+    buf = memoryview(buf)
+    pos = 0
+    end = len(buf)
+    while pos < end:
+        key, pos = read_varint(buf, pos)
+        field = key >> 3
+        wire_type = key & 0x07
+        if wire_type == 0:
+            value, pos = read_varint(buf, pos)
+        elif wire_type == 2:
+            length, pos = read_varint(buf, pos)
+            value = buf[pos:pos + length]
+            pos += length
+        elif wire_type == 1:
+            value = buf[pos:pos + 8]
+            pos += 8
+        elif wire_type == 5:
+            value = buf[pos:pos + 4]
+            pos += 4
+        else:
+            raise PbfFormatException("Unsupported protobuf wire type %s" % wire_type)
+        yield field, wire_type, value
+
+
+# decodes a packed repeated varint field
+# returns list of unsigned integers
+# varints are decoded byte by byte in one loop, which is much faster than calling read_varint for each value
+def decode_packed(buf):
+    values = []
+    append = values.append
+    result = 0
+    shift = 0
+    for byte in bytes(buf):
+        if byte < 0x80:
+            append(result | (byte << shift))
+            result = 0
+            shift = 0
+        else:
+            result |= (byte & 0x7f) << shift
+            shift += 7
+    return values
+
+
+# decodes a packed repeated delta coded sint64 field (e.g. ids and coordinates of dense nodes)
+# returns list of absolute values
+def decode_packed_delta(buf):
+    values = []
+    append = values.append
+    current = 0
+    for value in decode_packed(buf):
+        current += (value >> 1) ^ -(value & 1)  # zigzag decoding
+        append(current)
+    return values
+
+
+# iterates over all file blocks
+# yields block type ("OSMHeader" or "OSMData") and uncompressed block data
+def iter_blocks(file):
+    while True:
+        header_size_bytes = file.read(4)
+        if len(header_size_bytes) == 0:
+            return
+        if len(header_size_bytes) < 4:
+            raise PbfFormatException("Unexpected end of file")
+        header_size = struct.unpack(">I", header_size_bytes)[0]
+
+        block_type = None
+        data_size = 0
+        for field, _, value in iter_fields(file.read(header_size)):
+            if field == 1:
+                block_type = bytes(value).decode("utf-8")
+            elif field == 3:
+                data_size = value
+
+        raw_data = None
+        zlib_data = None
+        for field, _, value in iter_fields(file.read(data_size)):
+            if field == 1:
+                raw_data = bytes(value)
+            elif field == 3:
+                zlib_data = value
+            elif field in (4, 5, 6, 7):
+                raise PbfFormatException("Unsupported compression of file block (only zlib is supported)")
+
+        if raw_data is not None:
+            yield block_type, raw_data
+        elif zlib_data is not None:
+            yield block_type, zlib.decompress(zlib_data)
+
+
+# iterates over all nodes of a primitive block (data block)
+# key, value: only nodes with this tag are returned. If None, all nodes are returned
+# yields id, latitude, longitude and dictionary of tags of each node
+def iter_block_nodes(block, key=None, value=None):
+    strings = []
+    groups = []
+    granularity = 100
+    lat_offset = 0
+    lon_offset = 0
+    for field, _, field_value in iter_fields(block):
+        if field == 1:
+            strings = [bytes(s).decode("utf-8") for f, _, s in iter_fields(field_value) if f == 1]
+        elif field == 2:
+            groups.append(field_value)
+        elif field == 17:
+            granularity = field_value
+        elif field == 19:
+            lat_offset = to_int64(field_value)
+        elif field == 20:
+            lon_offset = to_int64(field_value)
+
+    # block does not contain searched tag: no need to decode nodes
+    if key is not None:
+        if key not in strings or value not in strings:
+            return
+        key_index = strings.index(key)
+        value_index = strings.index(value)
+    else:
+        key_index = value_index = None
+
+    for group in groups:
+        for field, _, field_value in iter_fields(group):
+            if field == 1:
+                node = decode_node(field_value, strings, key_index, value_index)
+                if node is not None:
+                    osm_id, lat, lon, tags = node
+                    yield osm_id, 1e-9 * (lat_offset + granularity * lat), \
+                        1e-9 * (lon_offset + granularity * lon), tags
+            elif field == 2:
+                for osm_id, lat, lon, tags in decode_dense_nodes(field_value, strings, key_index, value_index):
+                    yield osm_id, 1e-9 * (lat_offset + granularity * lat), \
+                        1e-9 * (lon_offset + granularity * lon), tags
+
+
+# decodes a single node message
+# returns id, latitude, longitude (not yet scaled by granularity) and tags,
+# or None if node does not contain searched tag (key_index, value_index: indexes in string table)
+def decode_node(buf, strings, key_index, value_index):
+    osm_id = lat = lon = 0
+    keys = []
+    values = []
+    for field, _, value in iter_fields(buf):
+        if field == 1:
+            osm_id = zigzag(value)
+        elif field == 2:
+            keys = decode_packed(value)
+        elif field == 3:
+            values = decode_packed(value)
+        elif field == 8:
+            lat = zigzag(value)
+        elif field == 9:
+            lon = zigzag(value)
+
+    if key_index is not None and (key_index, value_index) not in zip(keys, values):
+        return None
+    return osm_id, lat, lon, dict([(strings[k], strings[v]) for k, v in zip(keys, values)])
+
+
+# decodes dense nodes message (nodes of a block stored in parallel arrays)
+# yields id, latitude, longitude (not yet scaled by granularity) and tags of each node,
+# that contains searched tag (key_index, value_index: indexes in string table)
+def decode_dense_nodes(buf, strings, key_index, value_index):
+    ids = []
+    lats = []
+    lons = []
+    keys_vals = []
+    for field, _, value in iter_fields(buf):
+        if field == 1:
+            ids = value
+        elif field == 8:
+            lats = value
+        elif field == 9:
+            lons = value
+        elif field == 10:
+            keys_vals = decode_packed(value)
+
+    # tags of all nodes are stored in one list: key, value, key, value, ..., 0 (end of node), key, value, ...
+    # list is empty, if no node of the block has tags
+    node_tags = []
+    selected = []  # indexes of nodes that contain searched tag
+    if not keys_vals and key_index is None:
+        selected = list(range(len(decode_packed(ids))))
+        node_tags = [{} for _ in selected]
+    pos = 0
+    node_index = 0
+    while pos < len(keys_vals):
+        tags = {}
+        found = key_index is None
+        while keys_vals[pos] != 0:
+            k = keys_vals[pos]
+            v = keys_vals[pos + 1]
+            if k == key_index and v == value_index:
+                found = True
+            tags[k] = v
+            pos += 2
+        pos += 1
+        if found:
+            selected.append(node_index)
+            node_tags.append(tags)
+        node_index += 1
+    if not selected:
+        return
+
+    # ids and coordinates are delta coded: all values have to be decoded, even if only a few nodes are needed
+    ids = decode_packed_delta(ids)
+    lats = decode_packed_delta(lats)
+    lons = decode_packed_delta(lons)
+    for node_index, tags in zip(selected, node_tags):
+        yield ids[node_index], lats[node_index], lons[node_index], \
+            dict([(strings[k], strings[v]) for k, v in tags.items()])
+
+
+# iterates over all nodes of a PBF file
+# key, value: only nodes with this tag are returned (e.g. "natural", "tree"). If None, all nodes are returned
+# yields id, latitude, longitude and dictionary of tags of each node
+def iter_nodes(filepath, key=None, value=None):
+    with open(filepath, "rb") as file:
+        for node in iter_file_nodes(file, key, value):
+            yield node
+
+
+# iterates over all nodes of a PBF file opened in binary mode (see iter_nodes)
+def iter_file_nodes(file, key=None, value=None):
+    for block_type, block in iter_blocks(file):
+        if block_type == "OSMHeader":
+            check_header(block)
+        elif block_type == "OSMData":
+            for node in iter_block_nodes(block, key, value):
+                yield node
+
+
+# raises PbfFormatException, if file requires features this reader does not support
+def check_header(block):
+    supported_features = ["OsmSchema-V0.6", "DenseNodes"]
+    for field, _, value in iter_fields(block):
+        if field == 4:
+            feature = bytes(value).decode("utf-8")
+            if feature not in supported_features:
+                raise PbfFormatException("Unsupported feature required by file: %s" % feature)
@@ -0,0 +1,243 @@
+# this module downloads data from the overpass api (OpenStreetMap)
+# large bounding boxes are split into tiles, which are downloaded concurrently
+# responses can be stored in an on-disk cache, so repeated queries do not need to be downloaded again
+
+import collections
+import hashlib
+import math
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+OVERPASS_URL = "http://overpass-api.de/api/interpreter"  # default url of overpass api interpreter
+
+# http status codes, after which a request is repeated (too many requests, server busy or timed out)
+RETRY_STATUS_CODES = [429, 502, 503, 504]
+
+SPOOL_SIZE = 4 * 1024 * 1024  # responses larger than this (bytes) are buffered in a temporary file, not in memory
+
+# temporary files in cache folder, that have not been written to for this time (seconds), belong to aborted downloads
+TEMP_FILE_MAX_AGE = 3600
+
+
+# splits bounding box [lower, left, upper, right] (WGS84) into a grid of tiles with a maximum edge length
+# tile_size: maximum edge length of tiles in degrees
+# returns list of tile bounding boxes [lower, left, upper, right], ordered row by row from lower left corner
+def get_bbox_tiles(bbox, tile_size):
+    lower, left, upper, right = bbox
+    rows = max(1, int(math.ceil((upper - lower) / tile_size)))
+    cols = max(1, int(math.ceil((right - left) / tile_size)))
+    row_height = (upper - lower) / rows
+    col_width = (right - left) / cols
+
+    tiles = []
+    for row in range(rows):
+        tile_lower = lower + row * row_height
+        tile_upper = upper if row == rows - 1 else lower + (row + 1) * row_height
+        for col in range(cols):
+            tile_left = left + col * col_width
+            tile_right = right if col == cols - 1 else left + (col + 1) * col_width
+            tiles.append([tile_lower, tile_left, tile_upper, tile_right])
+    return tiles
+
+
+# removes all whitespaces from overpass ql statement, except whitespaces in quoted strings (e.g. tag values)
+def normalize_overpass_ql(overpass_ql_statement):
+    normalized = []
+    quote = None  # quote character of current string, None outside of strings
+    escaped = False
+    for char in overpass_ql_statement:
+        if quote is not None:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char == '"' or char == "'":
+            quote = char
+        elif char.isspace():
+            continue
+        normalized.append(char)
+    return "".join(normalized)
+
+
+# on-disk cache of overpass responses
+# every response is stored in a file named by the hash of overpass url and normalized overpass ql statement
+# modification time of a file is the download time, access time is set to the time of last use
+class OverpassCache:
+    # folder: cache folder, is created if it does not exist
+    # ttl: time in seconds, after which cached responses expire and are downloaded again
+    # max_size: maximum size of all cached responses in bytes, least recently used responses are deleted first
+    def __init__(self, folder, ttl, max_size):
+        self.__folder = folder
+        self.__ttl = ttl
+        self.__max_size = max_size
+        self.__lock = threading.Lock()  # responses are stored by several download threads at the same time
+
+        if not os.path.exists(self.__folder):
+            os.makedirs(self.__folder)
+
+    # returns path of cache file of an overpass query
+    # statements that only differ in whitespaces share the same cache file
+    def get_entry_path(self, url, overpass_ql_statement):
+        normalized_statement = normalize_overpass_ql(overpass_ql_statement)
+        key = hashlib.sha256(("%s\n%s" % (url, normalized_statement)).encode("utf-8")).hexdigest()
+        return os.path.join(self.__folder, key + ".osm")
+
+    # returns opened cache file of an overpass query or None, if query is not cached or cache entry expired
+    def get(self, url, overpass_ql_statement):
+        path = self.get_entry_path(url, overpass_ql_statement)
+        try:
+            stat = os.stat(path)
+            now = time.time()
+            if now - stat.st_mtime > self.__ttl:
+                return None
+            os.utime(path, (now, stat.st_mtime))  # mark entry as recently used
+            return open(path, "rb")
+        except OSError:
+            return None
+
+    # returns new temporary file in cache folder, to which a response can be downloaded
+    def create_temp_file(self):
+        return tempfile.NamedTemporaryFile(dir=self.__folder, suffix=".tmp", delete=False)
+
+    # moves downloaded temporary file into cache and deletes old entries, if cache is too large
+    # returns opened cache file
+    def store(self, url, overpass_ql_statement, temp_path):
+        path = self.get_entry_path(url, overpass_ql_statement)
+        with self.__lock:
+            try:
+                os.replace(temp_path, path)  # atomic: other processes never read a partially written response
+            except OSError:
+                # entry is in use by another process (Windows), cached response is not updated
+                return open(temp_path, "rb")
+            response_file = open(path, "rb")
+            self.evict(path)
+        return response_file
+
+    # deletes least recently used responses until size of cache is smaller than maximum size
+    # expired responses and temporary files of aborted downloads are deleted in any case
+    # keep_path: path of a response that must not be deleted (e.g. response that has just been stored)
+    def evict(self, keep_path=None):
+        now = time.time()
+        entries = []
+        for filename in os.listdir(self.__folder):
+            path = os.path.join(self.__folder, filename)
+            try:
+                stat = os.stat(path)
+                if filename.endswith(".tmp") and now - stat.st_mtime > TEMP_FILE_MAX_AGE:
+                    os.remove(path)
+            except OSError:
+                continue
+            if filename.endswith(".osm") and path != keep_path:
+                entries.append([stat.st_atime, stat.st_mtime, stat.st_size, path])
+
+        total_size = sum([entry[2] for entry in entries])
+        if keep_path is not None:
+            total_size += os.path.getsize(keep_path)
+        for last_used, downloaded, size, path in sorted(entries):
+            if total_size <= self.__max_size and now - downloaded <= self.__ttl:
+                continue
+            try:
+                os.remove(path)
+                total_size -= size
+            except OSError:
+                pass  # entry is in use (Windows)
+
+    # deletes all cached responses
+    def clear(self):
+        for filename in os.listdir(self.__folder):
+            if filename.endswith(".osm"):
+                try:
+                    os.remove(os.path.join(self.__folder, filename))
+                except OSError:
+                    pass
+
+
+# sends overpass ql statement to overpass api and downloads the response
+# requests are repeated after connection errors, timeouts and busy server responses, waiting longer each time
+# timeout: tuple (connect timeout, read timeout) in seconds
+# retries: number of repetitions before the last error is raised
+# backoff: waiting time in seconds before first repetition, doubled for every following repetition
+# cache: OverpassCache object or None. Cached responses are returned without request
+# returns file object (positioned at start) with response body
+def fetch_overpass(url, overpass_ql_statement, timeout, retries, backoff, cache=None):
+    if cache is not None:
+        response_file = cache.get(url, overpass_ql_statement)
+        if response_file is not None:
+            return response_file
+
+    attempt = 0
+    while True:
+        try:
+            with requests.get(url, params={"data": overpass_ql_statement}, timeout=timeout, stream=True) as r:
+                r.raise_for_status()
+                if cache is not None:
+                    response_file = cache.create_temp_file()
+                else:
+                    response_file = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+                try:
+                    for chunk in r.iter_content(chunk_size=65536):
+                        response_file.write(chunk)
+                except BaseException:
+                    response_file.close()
+                    if cache is not None:
+                        os.remove(response_file.name)
+                    raise
+
+            if cache is not None:
+                response_file.close()
+                return cache.store(url, overpass_ql_statement, response_file.name)
+            response_file.seek(0)
+            return response_file
+        except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+            if isinstance(e, requests.HTTPError) and e.response is not None \
+                    and e.response.status_code not in RETRY_STATUS_CODES:
+                raise
+            if attempt >= retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+            attempt += 1
+
+
+# downloads trees (nodes tagged natural=tree) inside a bounding box [lower, left, upper, right] (WGS84)
+# bounding box is split into tiles, which are downloaded concurrently by max_workers threads
+# generator: yields response file of every tile in tile order, while following tiles are still downloaded
+# at most 2 * max_workers tiles are downloaded ahead of the consumer, so finished responses do not pile up
+# remaining downloads are cancelled, if a tile fails or the generator is closed
+# cache: OverpassCache object or None
+def fetch_trees_tiled(url, bbox, tile_size, max_workers, timeout, retries, backoff, cache=None):
+    statements = iter(["node(%s, %s, %s, %s)[natural=tree];out;" % (tile[0], tile[1], tile[2], tile[3])
+                       for tile in get_bbox_tiles(bbox, tile_size)])
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = collections.deque()  # downloads in tile order, that have not been yielded yet
+
+    # submits downloads of next tiles, until maximum number of downloads ahead of consumer is reached
+    def submit_tiles():
+        while len(futures) < 2 * max_workers:
+            statement = next(statements, None)
+            if statement is None:
+                return
+            futures.append(executor.submit(fetch_overpass, url, statement, timeout, retries, backoff, cache))
+
+    try:
+        submit_tiles()
+        while futures:
+            future = futures.popleft()
+            submit_tiles()
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+        # close responses, that have been downloaded, but not passed to the consumer
+        for future in futures:
+            if not future.cancelled() and future.exception() is None:
+                future.result().close()
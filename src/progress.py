@@ -0,0 +1,126 @@
+# reporting of progress of long running operations: import, enrichment, analysis and export
+# core classes report progress to a ProgressReporter, which passes it on to an output (gui or console)
+# output is updated at most a few times per second, so loops over many items do not pay for an update per item
+# ProgressReporter itself has no output: it is used, if progress should not be shown
+# wxPython outputs are in module progress_gui, this module does not depend on wxPython
+
+import time
+
+UPDATES_PER_SECOND = 10  # default maximum number of output updates per second
+
+
+# class to report progress: keeps track of progress value and number of processed items, estimates remaining time
+# subclasses show progress by overriding show() and show_text()
+class ProgressReporter:
+    # updates_per_second: maximum number of progress updates passed to output per second. If 0, every update is shown
+    def __init__(self, updates_per_second=UPDATES_PER_SECOND):
+        if updates_per_second > 0:
+            self.__interval = 1 / updates_per_second
+        else:
+            self.__interval = 0
+        self.__total = 0  # maximum progress value, 0 if unknown
+        self.__value = 0  # progress value (e.g. number of processed trees or bytes read)
+        self.__count = 0  # number of processed items (e.g. rows), if different from progress value
+        self.__StartTime = time.monotonic()
+        self.__LastUpdate = 0  # time progress was passed to output last
+
+    # starts an operation: progress is set to 0 and shown
+    # total: maximum progress value (e.g. number of trees or size of file in bytes), 0 if unknown
+    def start(self, total=0):
+        self.__total = total
+        self.__StartTime = time.monotonic()
+        self.reset()
+
+    # sets progress back to 0 and shows it (e.g. to empty gauge after operation)
+    def reset(self):
+        self.__value = 0
+        self.__count = 0
+        self.finish()
+
+    # sets progress value. Output is only updated, if last update is long enough ago
+    # count: number of processed items, if it differs from value (e.g. rows imported, if value is bytes read)
+    def update(self, value, count=None):
+        self.__value = value
+        if count is None:
+            self.__count = value
+        else:
+            self.__count = count
+        now = time.monotonic()
+        if now - self.__LastUpdate >= self.__interval:
+            self.__LastUpdate = now
+            self.show(self.__value, self.__total, self.__count)
+
+    # advances progress by a number of processed items
+    def advance(self, steps=1):
+        self.update(self.__value + steps, self.__count + steps)
+
+    # shows current progress regardless of update rate, must be called at the end of an operation
+    def finish(self):
+        self.__LastUpdate = time.monotonic()
+        self.show(self.__value, self.__total, self.__count)
+
+    # shows a text, e.g. current step of operation. Texts are shown immediately
+    def set_text(self, text):
+        self.show_text(text)
+
+    def get_value(self):
+        return self.__value
+
+    def get_total(self):
+        return self.__total
+
+    def get_count(self):
+        return self.__count
+
+    # returns estimated remaining time of operation in seconds, None if it cannot be estimated
+    def get_remaining_time(self):
+        if self.__total <= 0 or self.__value <= 0:
+            return None
+        elapsed = time.monotonic() - self.__StartTime
+        return max(elapsed * (self.__total - self.__value) / self.__value, 0)
+
+    # output of progress, overridden in subclasses
+    # total is 0, if maximum progress value is unknown
+    def show(self, value, total, count):
+        pass
+
+    # output of text, overridden in subclasses
+    def show_text(self, text):
+        pass
+
+
+# class to show progress on the console
+# progress is printed in steps of 10%, texts are printed as they are
+class ConsoleProgress(ProgressReporter):
+    def __init__(self, prefix, quiet=False):
+        ProgressReporter.__init__(self)
+        self.__prefix = prefix  # text at beginning of each line (job and step name)
+        self.__quiet = quiet  # no output, if True
+        self.__last_percentage = -1  # last percentage printed to console
+
+    def start(self, total=0):
+        self.__last_percentage = -1
+        ProgressReporter.start(self, total)
+
+    # prints progress to console in steps of 10%
+    def show(self, value, total, count):
+        if total <= 0:
+            return
+        percentage = int(10 * value / total) * 10
+        if percentage != self.__last_percentage:
+            self.__last_percentage = percentage
+            self.show_text("%s%%" % percentage)
+
+    def show_text(self, text):
+        if not self.__quiet:
+            print("%s: %s" % (self.__prefix, text), flush=True)
+
+
+# formats a duration in seconds as text, e.g. "1 h 5 min" or "3 min 20 s"
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return "%s h %s min" % (seconds // 3600, seconds % 3600 // 60)
+    if seconds >= 60:
+        return "%s min %s s" % (seconds // 60, seconds % 60)
+    return "%s s" % seconds
@@ -0,0 +1,101 @@
+# wxPython outputs of progress reporters (see module progress)
+# progress is often reported by worker threads: widgets are only updated by the gui thread
+# updates from worker threads are passed on with wx.CallAfter, updates from the gui thread are shown directly
+
+import wx
+
+import progress
+
+# range of progress bar in import progress dialog
+IMPORT_PROGRESS_RANGE = 1000
+
+
+# calls function with arguments in gui thread: directly, if called by gui thread, otherwise with wx.CallAfter
+# operations running in gui thread (e.g. duplicate check) would only show their progress after they finished otherwise
+def call_in_gui_thread(function, *args):
+    if wx.IsMainThread():
+        function(*args)
+    else:
+        wx.CallAfter(function, *args)
+
+
+# shows progress on a gauge and/or number of processed items on a label
+class WidgetProgress(progress.ProgressReporter):
+    # gauge: wx.Gauge or None, label: wx.StaticText or None
+    # count_text: text of label with number of processed items, e.g. "%s points imported"
+    # if count_text is None, label only shows texts (set_text)
+    def __init__(self, gauge=None, label=None, count_text=None):
+        progress.ProgressReporter.__init__(self)
+        self.__gauge = gauge
+        self.__label = label
+        self.__CountText = count_text
+
+    def show(self, value, total, count):
+        call_in_gui_thread(self.show_widgets, value, total, count)
+
+    def show_text(self, text):
+        call_in_gui_thread(self.show_label, text)
+
+    # updates gauge and label (gui thread only)
+    # widgets may have been destroyed meanwhile (e.g. dialog closed after operation), they are skipped then
+    def show_widgets(self, value, total, count):
+        if self.__gauge:
+            if total > 0:
+                if self.__gauge.GetRange() != total:
+                    self.__gauge.SetRange(total)
+                self.__gauge.SetValue(min(value, total))
+            elif value > 0:
+                self.__gauge.Pulse()
+            else:
+                self.__gauge.SetValue(0)
+        if self.__CountText is not None:
+            self.show_label(self.__CountText % count)
+
+    # sets text of label (gui thread only)
+    def show_label(self, text):
+        if self.__label:
+            self.__label.SetLabel(text)
+
+
+# progress dialog of imports, that run in a worker thread (see MainTableFrame.run_import)
+# progress value is number of bytes read, total is size of file
+# shows number of rows, bytes read and estimated remaining time. Import can be cancelled with cancel button
+class ImportProgressDialog(progress.ProgressReporter):
+    def __init__(self, parent, title):
+        progress.ProgressReporter.__init__(self)
+        self.__dialog = wx.ProgressDialog(title, "Starting import...\n\n", maximum=IMPORT_PROGRESS_RANGE,
+                                          parent=parent,
+                                          style=wx.PD_APP_MODAL | wx.PD_CAN_ABORT | wx.PD_ELAPSED_TIME)
+        self.__closed = False  # True, if dialog has been closed. Progress updates still waiting are ignored then
+
+    def show(self, value, total, count):
+        call_in_gui_thread(self.show_dialog, value, total, count, self.get_remaining_time())
+
+    # updates progress bar and message (gui thread only)
+    def show_dialog(self, bytes_read, bytes_total, rows, remaining):
+        if self.__closed:
+            return
+
+        message = "%s rows imported" % "{:,}".format(rows)
+        if bytes_total <= 0:
+            self.__dialog.Pulse(message + "\n\n")
+            return
+
+        message += "\n%.1f of %.1f MB read" % (bytes_read / 1048576, bytes_total / 1048576)
+        if remaining is not None:
+            message += "\nabout %s remaining" % progress.format_duration(remaining)
+        else:
+            message += "\n"
+
+        # progress bar must not reach its maximum, before dialog is closed
+        value = min(IMPORT_PROGRESS_RANGE * bytes_read // bytes_total, IMPORT_PROGRESS_RANGE - 1)
+        self.__dialog.Update(value, message)
+
+    # returns True, if cancel button has been pressed
+    def was_cancelled(self):
+        return self.__dialog.WasCancelled()
+
+    # closes dialog after import
+    def close(self):
+        self.__closed = True
+        self.__dialog.Destroy()
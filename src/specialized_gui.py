@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 
 # import python libraries
+import os
+import sqlite3
+import threading
 import xml.etree.ElementTree as ET
+import xml.sax
 
 # import wxPython classes
 import wx
@@ -19,6 +23,13 @@ import analysis
 import export
 import enrichment
 import config
+import grid_table
+import progress_gui
+import osm_pbf
+
+
+# number of elements that are read to preview the structure of xml files
+XML_PREVIEW_ELEMENTS = 1000
 
 
 class MainTableFrame(default_gui.MainWindow):
@@ -31,6 +42,7 @@ class MainTableFrame(default_gui.MainWindow):
 
         # initialize database
         self.db = None
+        self.__grid_table = None  # virtual table of grid, reads visible rows from database
 
         # initiate gloabl settings
         self.__column_settings = config.ColumnNames()
@@ -78,7 +90,7 @@ class MainTableFrame(default_gui.MainWindow):
 
             # opening procedure when a csv file is detected
             if pathname[-4:] == ".csv":
-                self.db = data.DatabaseFromCsv()
+                self.db = data.DatabaseFromCsv(in_memory=self.work_in_memory.IsChecked())
                 dlg = OpenDialogCSV(self, path=pathname)
                 dlg.Layout()
                 dlg.DoLayoutAdaptation()
@@ -86,8 +98,13 @@ class MainTableFrame(default_gui.MainWindow):
                 import_success = None
                 text = ""
                 try:
-                    import_success = self.db.import_csv_file(filepath=pathname)
+                    import_success = self.run_import("Importing CSV file",
+                                                     lambda: self.db.import_csv_file(filepath=pathname))
                     text = "CSV file imported successfully"
+                except data.ImportCancelledException:
+                    import_success = False
+                    text = "CSV file import cancelled"
+                    self.reset_program()
                 except UnicodeDecodeError:
                     import_success = False
                     text = "CSV file import failed.\n" \
@@ -113,16 +130,10 @@ class MainTableFrame(default_gui.MainWindow):
 
             # opening procedure when xml file is detected
             elif pathname[-4:] == ".xml":
-                tree = None
-                text = "XML File will be parsed now.\n" \
-                       "This might take some time for larger files."
-                msg = wx.MessageDialog(self, text, style=wx.OK | wx.CENTRE)
-                msg.ShowModal()
-
-                # parse xml Tree. Show warning and abort if file cant be parsed
+                # parse beginning of xml file to preview its structure. Show warning and abort if file cant be parsed
                 success = True
                 try:
-                    tree = ET.parse(pathname)
+                    tree, ns = data.parse_xml_preview(pathname, XML_PREVIEW_ELEMENTS)
                     text = "XML file parsed successfully"
                 except ET.ParseError:
                     success = False
@@ -140,15 +151,35 @@ class MainTableFrame(default_gui.MainWindow):
                         msg.ShowModal()
                         return
 
-                self.db = data.DatabaseFromXml()
-                dlg = OpenDialogXML(self, pathname, tree)
+                self.db = data.DatabaseFromXml(in_memory=self.work_in_memory.IsChecked())
+                dlg = OpenDialogXML(self, pathname, tree, ns)
                 dlg.Layout()
                 dlg.DoLayoutAdaptation()
                 dlg.ShowModal()
                 treepath = dlg.treepath.GetValue()
                 geompath = dlg.geompath.GetValue()
                 ignore = dlg.ignorelist.GetValue()
-                self.db.import_xml_file(pathname, treepath, geompath, ignore, tree)
+
+                # import file in one pass, if tree path and inspection limit allow it
+                # otherwise whole file is parsed into memory
+                try:
+                    if self.db.use_streaming_import(treepath):
+                        self.run_import("Importing XML file",
+                                        lambda: self.db.import_xml_file_streaming(pathname, treepath, geompath,
+                                                                                  ignore))
+                    else:
+                        text = "XML File will be parsed now.\n" \
+                               "This might take some time for larger files."
+                        msg = wx.MessageDialog(self, text, style=wx.OK | wx.CENTRE)
+                        msg.ShowModal()
+                        self.run_import("Importing XML file",
+                                        lambda: self.db.import_xml_file(pathname, treepath, geompath, ignore,
+                                                                        ET.parse(pathname)))
+                except data.ImportCancelledException:
+                    self.reset_program()
+                    msg = wx.MessageDialog(self, "XML file import cancelled", style=wx.OK | wx.CENTRE)
+                    msg.ShowModal()
+                    return
 
         if not self.db.get_spatialite_status()[0]:
             text = "could not load sqlite extension SpatiaLite.\n" \
@@ -160,9 +191,7 @@ class MainTableFrame(default_gui.MainWindow):
             msg = wx.MessageDialog(self, str(text), style=wx.ICON_WARNING | wx.CENTRE)
             msg.ShowModal()
 
-        self.show_data_in_grid(self.db.get_number_of_columns(),
-                               self.db.get_number_of_tablerecords(),
-                               self.db.get_data())
+        self.show_data_in_grid()
 
         # Enable menu items
         self.enable_menu_items(True)
@@ -175,7 +204,8 @@ class MainTableFrame(default_gui.MainWindow):
         if dialog.ShowModal() != 1234:
             return
 
-        self.db = data.DatabaseFromOSM()
+        self.db = data.DatabaseFromOSM(in_memory=self.work_in_memory.IsChecked())
+        self.db.enable_cache()
 
         bbox_upper, bbox_left, bbox_lower, bbox_right = dialog.get_bbox()
         epsg = dialog.get_epsg()
@@ -185,10 +215,14 @@ class MainTableFrame(default_gui.MainWindow):
         text = ""
 
         try:
-            self.db.import_osm_trees()
+            self.run_import("Importing trees from OpenStreetMap", self.db.import_osm_trees)
             n = self.db.get_number_of_tablerecords()
             text = "OSM Import successfull.\n" \
                    "%s trees in request" % n
+        except data.ImportCancelledException:
+            import_success = False
+            text = "Importing trees from OpenStreetMap cancelled"
+            self.reset_program()
         except requests.ConnectionError:
             import_success = False
             text = "Importing trees from OpenStreetMap failed!\n" \
@@ -201,22 +235,167 @@ class MainTableFrame(default_gui.MainWindow):
             import_success = False
             text = "Importing trees from OpenStreetMap failed!\n" \
                    "Too many Redirects."
+        except requests.HTTPError as e:
+            import_success = False
+            text = "Importing trees from OpenStreetMap failed!\n" \
+                   "OSM server responded with an error:\n%s" % e
+        finally:
+            msg = wx.MessageDialog(self, text, style=wx.OK | wx.CENTRE)
+            msg.ShowModal()
+            if not import_success:
+                return
+
+        self.show_data_in_grid()
+
+        self.enable_menu_items(True)
+
+        self.__column_settings.set_id("OSM_ID")
+        self.__column_settings.set_coordinates("X_VALUE_%s" % self.db.get_output_epsg(),
+                                               "Y_VALUE_%s" % self.db.get_output_epsg())
+
+    # method to be called when clicking File > Import trees from OSM file
+    # imports trees from a local OpenStreetMap file (e.g. extract of a country), coordinates are converted to utm
+    def on_menu_import_osm_file(self, event):
+        with wx.FileDialog(self, "Import trees from OSM file",
+                           wildcard="OSM files (*.osm.pbf;*.osm;*.osm.bz2;*.osm.gz)|*.osm.pbf;*.osm;*.osm.bz2;*.osm.gz",
+                           style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as fileDialog:
+            if fileDialog.ShowModal() == wx.ID_CANCEL:
+                return
+            pathname = fileDialog.GetPath()
+
+        self.reset_program()
+        self.db = data.DatabaseFromOSM(in_memory=self.work_in_memory.IsChecked())
+
+        import_success = True
+        text = ""
+
+        try:
+            self.run_import("Importing trees from OSM file", lambda: self.db.import_osm_file(pathname))
+            n = self.db.get_number_of_tablerecords()
+            text = "OSM Import successfull.\n" \
+                   "%s trees in file" % n
+        except data.ImportCancelledException:
+            import_success = False
+            text = "Importing trees from OSM file cancelled"
+            self.reset_program()
+        except (xml.sax.SAXException, osm_pbf.PbfFormatException) as e:
+            import_success = False
+            text = "Importing trees from OSM file failed!\n" \
+                   "File could not be read: %s" % e
+        except OSError as e:
+            import_success = False
+            text = "Importing trees from OSM file failed!\n" \
+                   "%s" % e
         finally:
             msg = wx.MessageDialog(self, text, style=wx.OK | wx.CENTRE)
             msg.ShowModal()
             if not import_success:
                 return
 
-        self.show_data_in_grid(self.db.get_number_of_columns(),
-                               self.db.get_number_of_tablerecords(),
-                               self.db.get_data())
+        self.show_data_in_grid()
 
         self.enable_menu_items(True)
 
         self.__column_settings.set_id("OSM_ID")
-        self.__column_settings.set_coordinates("X_VALUE", "Y_VALUE")
+        self.__column_settings.set_coordinates("X_VALUE_%s" % self.db.get_output_epsg(),
+                                               "Y_VALUE_%s" % self.db.get_output_epsg())
+
+    # method to be called when clicking File > Open project
+    # restores a project saved before, instead of importing a file again
+    def on_menu_open_project(self, event):
+        with wx.FileDialog(self, "Open project", wildcard="tree3d project files (*.sqlite)|*.sqlite",
+                           style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as fileDialog:
+            if fileDialog.ShowModal() == wx.ID_CANCEL:
+                return
+            pathname = fileDialog.GetPath()
+
+        self.reset_program()
+
+        self.db = data.DatabaseFromProject(in_memory=self.work_in_memory.IsChecked())
+        open_success = True
+        try:
+            self.db.open_project(pathname, self.__column_settings)
+        except data.InvalidProjectException:
+            open_success = False
+            text = "Cannot open project.\n" \
+                   "File is not a tree3d project file."
+        except sqlite3.DatabaseError:
+            open_success = False
+            text = "Cannot open project.\n" \
+                   "File is not a valid database."
+        if not open_success:
+            msg = wx.MessageDialog(self, text, style=wx.ICON_WARNING | wx.CENTRE)
+            msg.ShowModal()
+            self.reset_program()
+            return
+
+        self.show_data_in_grid()
+
+        self.enable_menu_items(True)
+
+    # method to be called when clicking File > Save project
+    # saves database and program settings to a project file
+    def on_menu_save_project(self, event):
+        with wx.FileDialog(self, "Save project", wildcard="tree3d project files (*.sqlite)|*.sqlite",
+                           style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as fileDialog:
+            if fileDialog.ShowModal() == wx.ID_CANCEL:
+                return
+            pathname = fileDialog.GetPath()
+
+        if os.path.normcase(os.path.abspath(pathname)) == os.path.normcase(os.path.abspath(self.db.get_db_filepath())):
+            msg = wx.MessageDialog(self, "Cannot save project into the working database of tree3d.",
+                                   style=wx.ICON_WARNING | wx.CENTRE)
+            msg.ShowModal()
+            return
+
+        if os.path.exists(pathname):
+            os.remove(pathname)
+
+        try:
+            self.db.save_project(pathname, self.__column_settings)
+            text = "Project saved successfully"
+            icon = wx.OK
+        except (sqlite3.Error, OSError) as e:
+            text = "Saving project failed.\n%s" % str(e)
+            icon = wx.ICON_WARNING
+        msg = wx.MessageDialog(self, text, style=icon | wx.CENTRE)
+        msg.ShowModal()
+
+    # runs an import of the database in a worker thread, while a progress dialog is shown
+    # gui stays responsive, import can be stopped with the cancel button of the dialog
+    # import_function: function without arguments, that runs the import
+    # returns return value of import_function. Exceptions of import_function are raised again in the gui thread,
+    # data.ImportCancelledException if import has been cancelled (imported rows have been rolled back then)
+    def run_import(self, title, import_function):
+        result = []
+        errors = []
+
+        def run():
+            try:
+                result.append(import_function())
+            except BaseException as e:
+                errors.append(e)
+
+        dialog = progress_gui.ImportProgressDialog(self, title)
+        self.db.set_progress_reporter(dialog)
+        thread = threading.Thread(target=run)
+        thread.start()
+
+        # wait for import: meanwhile, events of gui (progress updates, cancel button) are processed
+        while thread.is_alive():
+            thread.join(0.05)
+            wx.YieldIfNeeded()
+            if dialog.was_cancelled():
+                self.db.cancel_import()
+
+        self.db.set_progress_reporter(None)
+        dialog.close()
+        if errors:
+            raise errors[0]
+        return result[0]
 
     def enable_menu_items(self, b_value):
+        self.save_project.Enable(b_value)
         self.export_citygml.Enable(b_value)
         self.export_cityjson.Enable(b_value)
         self.export_geojson.Enable(b_value)
@@ -265,60 +444,30 @@ class MainTableFrame(default_gui.MainWindow):
     def get_column_config(self):
         return self.__column_settings
 
-    # adjusts numbers of rows and columns to match data
-    # populates grid with data afterwards
-    def show_data_in_grid(self, col_number, row_number, data_table):
-        self.reset_grid_size()
-
-        # set number of rows and columns in grid
-        self.table_view_panel.grid.InsertCols(pos=0, numCols=col_number)
-        self.table_view_panel.grid.InsertRows(pos=0, numRows=row_number)
-
-        # add column names to grid
-        for idx, colname in enumerate(self.db.get_column_names()):
-            self.table_view_panel.grid.SetColLabelValue(idx, colname)
-
-        # fill grid with data
-        for RowIdx, row in enumerate(data_table):
-            for ColIdx, val in enumerate(row):
-                # show empty cell if database delivers None object
-                if val is None:
-                    val = ''
-
-                # yellow for ID columns (ROWID or IAI_TreeID)
-                if ColIdx == 0 and self.db.get_create_id():
-                    self.table_view_panel.grid.SetCellBackgroundColour(RowIdx, ColIdx, wx.Colour(255, 255, 128))
-                if ColIdx == 0 and self.db.get_use_rowid():
-                    self.table_view_panel.grid.SetCellBackgroundColour(RowIdx, ColIdx, wx.Colour(255, 255, 128))
-                if ColIdx == 1 and self.db.get_create_id() and self.db.get_use_rowid():
-                    self.table_view_panel.grid.SetCellBackgroundColour(RowIdx, ColIdx, wx.Colour(255, 255, 128))
-                self.table_view_panel.grid.SetCellValue(RowIdx, ColIdx, str(val))
+    # shows data of database in grid
+    # grid uses a virtual table: only values of visible rows are read from database (see grid_table)
+    def show_data_in_grid(self):
+        self.__grid_table = grid_table.DatabaseGridTable(self.db)
+        self.table_view_panel.grid.SetTable(self.__grid_table, False)
 
         # Layout for the grid
-        self.table_view_panel.grid.AutoSizeColumns(setAsMin=True)
-        self.table_view_panel.grid.AutoSizeRows(setAsMin=True)
+        grid_table.autosize_columns(self.table_view_panel.grid, self.__grid_table)
 
         # Make grid visible
         self.table_view_panel.grid.Show(True)
 
         # Update panel layout to fit new grid size
         self.table_view_panel.Layout()
+        self.table_view_panel.grid.ForceRefresh()
 
         # write number of rows in statusbar
-        self.m_statusBar3.SetStatusText("%s rows displayed in table" % row_number, 0)
+        self.m_statusBar3.SetStatusText("%s rows displayed in table" % self.__grid_table.GetNumberRows(), 0)
 
     # resets size of grid to 0 columns and 0 rows
-    # Deletes all columns and rows of grid, so new data can be displayed properly
-    # rows and columns can only be deleted if their number is not null (on program start)
+    # replaces table of grid by an empty table, so new data can be displayed properly
     def reset_grid_size(self):
-        try:
-            self.table_view_panel.grid.DeleteRows(pos=0, numRows=self.table_view_panel.grid.GetNumberRows())
-        except wx._core.wxAssertionError:
-            pass
-        try:
-            self.table_view_panel.grid.DeleteCols(pos=0, numCols=self.table_view_panel.grid.GetNumberCols())
-        except wx._core.wxAssertionError:
-            pass
+        self.__grid_table = grid_table.DatabaseGridTable(None)
+        self.table_view_panel.grid.SetTable(self.__grid_table, False)
 
     # method resets order of columns back to default
     # overrides method in parent class
@@ -386,55 +535,26 @@ class MainTableFrame(default_gui.MainWindow):
         self.table_view_panel.grid.HideCol(col)
 
     # method is called when right-clicking a column label > "sort grid by column ascending"
+    # only the order of rows is changed: order, width and visibility of columns are kept
     def on_sort_col_asc(self, col):
 
         # if the list is already sorted ascending by this column, dont do anything
         if self.table_view_panel.grid.GetColLabelValue(col)[-1:] == "▲":
             return
 
-        # BUG IN wxPython LIBRARY:
-        # when position of first column was altered, program crashes during restoration of position later
-        # workaround: manually reset position of this column now, manually restore this position later
-        first_col_moved = False
-        first_col_position = self.table_view_panel.grid.GetColPos(0)
-        if self.table_view_panel.grid.GetColPos(0) != 0:
-            self.table_view_panel.grid.SetColPos(0, 0)
-            first_col_moved = True
-
-        # get current order and visibility of columns
-        col_order = self.get_all_col_position()
-        col_visiblity = self.get_all_col_visiblity()
-
         # remove possible column sort indicators from column header
         self.remove_col_sort_indicator()
 
         # get column label from right-column
         col_label = self.table_view_panel.grid.GetColLabelValue(col)
 
-        # query database, sorts result by column
-        sorted_data = self.db.get_data_with_sorting('ORDER BY "%s" ASC' % col_label)
-
-        # display fetched data in grid
-        number_of_cols = self.table_view_panel.grid.GetNumberCols()
-        number_of_rows = self.table_view_panel.grid.GetNumberRows()
-        self.show_data_in_grid(number_of_cols, number_of_rows, sorted_data)
+        # sort rows by column: rows are read through sort permutation of column, when they become visible
+        self.__grid_table.set_sorting(col_label)
 
         # update column label: append sorting indicator
         col_label_new = col_label + " ▲"
         self.table_view_panel.grid.SetColLabelValue(col, col_label_new)
-        self.table_view_panel.grid.AutoSizeColumns(setAsMin=True)
-
-        # restores order of grid columns (was lost while adding newly fetched data to grid)
-        self.table_view_panel.grid.SetColumnsOrder(col_order)
-
-        # due to library bug mentioned above: reset column position for first column manually
-        if first_col_moved:
-            self.table_view_panel.grid.SetColPos(0, first_col_position)
-
-        # restores visibility for grid columns (was lost while adding newly fetched data to grid)
-        for idx, value in enumerate(col_visiblity):
-            if not value:
-                self.table_view_panel.grid.HideCol(idx)
+        self.table_view_panel.grid.ForceRefresh()
 
     # method is called when right-clicking a column label > "sort grid by column descending
     def on_sort_col_desc(self, col):
@@ -443,41 +563,19 @@ class MainTableFrame(default_gui.MainWindow):
         if self.table_view_panel.grid.GetColLabelValue(col)[-1:] == "▼":
             return
 
-        first_col_moved = False
-        first_col_position = self.table_view_panel.grid.GetColPos(0)
-        if self.table_view_panel.grid.GetColPos(0) != 0:
-            self.table_view_panel.grid.SetColPos(0, 0)
-            first_col_moved = True
-
-        col_order = self.get_all_col_position()
-        col_visiblity = self.get_all_col_visiblity()
-
         self.remove_col_sort_indicator()
 
         col_label = self.table_view_panel.grid.GetColLabelValue(col)
 
-        sorted_data = self.db.get_data_with_sorting('ORDER BY "%s" DESC' % col_label)
-
-        number_of_cols = self.table_view_panel.grid.GetNumberCols()
-        number_of_rows = self.table_view_panel.grid.GetNumberRows()
-        self.show_data_in_grid(number_of_cols, number_of_rows, sorted_data)
+        self.__grid_table.set_sorting(col_label, True)
 
         col_label_new = col_label + " ▼"
         self.table_view_panel.grid.SetColLabelValue(col, col_label_new)
-        self.table_view_panel.grid.AutoSizeColumns(setAsMin=True)
-
-        self.table_view_panel.grid.SetColumnsOrder(col_order)
-
-        if first_col_moved:
-            self.table_view_panel.grid.SetColPos(0, first_col_position)
-
-        for idx, value in enumerate(col_visiblity):
-            if not value:
-                self.table_view_panel.grid.HideCol(idx)
+        self.table_view_panel.grid.ForceRefresh()
 
     # method is used to remove column sort indicators (little triangles) from grid
     def remove_col_sort_indicator(self):
-        for col_idx in range(0, self.table_view_panel.grid.GetNumberCols() - 1):
+        for col_idx in range(0, self.table_view_panel.grid.GetNumberCols()):
             col_label = self.table_view_panel.grid.GetColLabelValue(col_idx)
             if col_label[-1:] == "▲" or col_label[-1:] == "▼":
                 self.table_view_panel.grid.SetColLabelValue(col_idx, col_label[:-2])
@@ -501,9 +599,7 @@ class MainTableFrame(default_gui.MainWindow):
             dlg = enrichment.AddGeometry(self)
             code = dlg.ShowModal()
             if code == 1:
-                self.show_data_in_grid(self.db.get_number_of_columns(),
-                                       self.db.get_number_of_tablerecords(),
-                                       self.db.get_data())
+                self.show_data_in_grid()
         else:
             text = "Cannot perform this operation since SpatiaLite extension could not be loaded"
             msg = wx.MessageDialog(None, text, style=wx.ICON_WARNING | wx.CENTRE)
@@ -513,9 +609,7 @@ class MainTableFrame(default_gui.MainWindow):
         dlg = enrichment.AddCityGmlVegetationCodeGUI(self, self.db.get_db_filepath(), self.db.get_tree_table_name())
         code = dlg.ShowModal()
         if code == 1:
-            self.show_data_in_grid(self.db.get_number_of_columns(),
-                                   self.db.get_number_of_tablerecords(),
-                                   self.db.get_data())
+            self.show_data_in_grid()
 
     def on_add_reference_height_dem(self, event):
         if not self.db.get_spatialite_status()[0]:
@@ -535,17 +629,13 @@ class MainTableFrame(default_gui.MainWindow):
         if importgui.ShowModal() == 1234:
             derivegui = enrichment.GrabHeight(self, self.db.get_db_filepath())
             if derivegui.ShowModal() == 1:
-                self.show_data_in_grid(self.db.get_number_of_columns(),
-                                       self.db.get_number_of_tablerecords(),
-                                       self.db.get_data())
+                self.show_data_in_grid()
 
     def on_add_default_reference_height(self, event):
         dlg = enrichment.DefaulHeight(self, self.db.get_db_filepath(), self.db.get_tree_table_name())
         code = dlg.ShowModal()
         if code == 1234:
-            self.show_data_in_grid(self.db.get_number_of_columns(),
-                                   self.db.get_number_of_tablerecords(),
-                                   self.db.get_data())
+            self.show_data_in_grid()
 
     def on_derive_from_pointcloud(self, event):
         if not self.db.get_spatialite_status()[0]:
@@ -565,9 +655,7 @@ class MainTableFrame(default_gui.MainWindow):
         if importgui.ShowModal() == 1234:
             derivegui = enrichment.DerivePointcloudGUI(self, self.db.get_db_filepath())
             if derivegui.ShowModal() == 1:
-                self.show_data_in_grid(self.db.get_number_of_columns(),
-                                       self.db.get_number_of_tablerecords(),
-                                       self.db.get_data())
+                self.show_data_in_grid()
 
     # method to called when "? > License information (english)"
     def on_license_english(self, event):
@@ -803,7 +891,8 @@ class OpenDialogCSV(OpenDialog):
 
 
 class OpenDialogXML(OpenDialog):
-    def __init__(self, parent, path, tree):
+    # tree: preview of xml file (see data.parse_xml_preview), ns: namespaces of xml file
+    def __init__(self, parent, path, tree, ns):
         super().__init__(parent, path)
 
         # disable csv gui stuff
@@ -816,7 +905,7 @@ class OpenDialogXML(OpenDialog):
         self.SetTitle("XML import options")
 
         self.__Tree = tree
-        self.__ns = dict([node for _, node in ET.iterparse(self._filepath, events=['start-ns'])])
+        self.__ns = ns
         self.__Root = self.__Tree.getroot()
 
     # Populates dropdown menus after xml was opened
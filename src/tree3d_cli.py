@@ -0,0 +1,613 @@
+# command line interface of tree3d
+# runs import, enrichment and export steps described in json job files without graphical user interface (no wxPython)
+# several job files can be processed in parallel, processing times of each step are reported
+#
+# usage: python tree3d_cli.py job1.json [job2.json ...] [--processes 4] [--report timings.json] [--in-memory]
+#
+# example of a job file (relative paths are relative to the job file):
+# {
+#     "name": "district_01",
+#     "input": {"type": "csv", "file": "trees.csv", "seperator": ";", "encoding": "utf-8-sig",
+#               "data_inspection_limit": 500, "id_columns": [0, 1]},
+#     "steps": [
+#         {"step": "add_geometry", "x": "X", "y": "Y", "epsg": 31467},
+#         {"step": "vegetation_code", "column": "Baumart"},
+#         {"step": "dem", "files": ["dem.xyz"], "seperator": " ", "columns": [0, 1, 2], "epsg": 31467,
+#          "search_radius": 5},
+#         {"step": "export", "format": "citygml", "file": "trees.gml", "epsg": 31467,
+#          "height": "Hoehe", "height_unit": "m", "crown_diam": "Krone", "crown_diam_unit": "m",
+#          "trunk_diam": "Stamm", "trunk_diam_unit": "cm", "trunk_is_circumference": true,
+#          "crown_height": "2/3 the tree height", "lod1": {"geomtype": "cylinder", "segments": 10}}
+#     ],
+#     "project": "district_01.sqlite",
+#     "in_memory": false
+# }
+#
+# in_memory: working database is kept in memory instead of a temporary file (faster for datasets that fit into
+# memory). It is written to the project file, if one is given. --in-memory enables it for all jobs
+#
+# supported input types: csv, xml, osm, osm_file, project
+# osm input: {"type": "osm", "bbox": [lower, left, upper, right], "epsg": 4326, "overpass_url": "...",
+#             "tile_size": 0.05, "max_workers": 2, "cache_folder": "overpass_cache", "cache_ttl": 86400,
+#             "cache_max_size": 524288000}
+# osm_file input: {"type": "osm_file", "file": "baden-wuerttemberg-latest.osm.pbf", "epsg": 25832}
+#                 (.osm, .osm.bz2, .osm.gz or .osm.pbf, epsg is optional: utm zone of first tree by default)
+# supported steps: add_geometry, vegetation_code, default_height, dem, pointcloud, export
+#
+# sqlite performance profiles: "safe" (default), "bulk-import" or "read-heavy export"
+# profile of all steps of a job is set by key "profile" of the job, profile of a single step by key "profile" of
+# the step. Imports (input, dem and pointcloud files) use "bulk-import", exports use "read-heavy export",
+# unless the step selects a profile
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from multiprocessing import Pool
+
+import data
+import config
+import connection_manager
+import enrichment_core
+import export_core
+import progress
+
+
+# Dictionary to find the geometry code to each geometry type (same names as in export GUI)
+GEOMTYPE_TO_GEOMCODE = {"line": 0,
+                        "cylinder": 1,
+                        "rectangles": 2,
+                        "tree contour polygons": 3,
+                        "highly simplified tree": 4,
+                        "simplified tree": 5,
+                        "point": 6}
+
+# Dictionary to find the crown height code to each crown height option (same names as in export GUI)
+CROWN_HEIGHT_TO_CODE = {"same as crown diameter": 0,
+                        "1/2 the tree height": 1,
+                        "2/3 the tree height": 2,
+                        "3/4 the tree height": 3,
+                        "4/5 the tree height": 4,
+                        "from column": 5}
+
+# Dictionary to find the tree type code to each default tree type (same names as in export GUI)
+DEFAULT_TYPE_TO_CODE = {"none": 0,
+                        "deciduous tree": 1070,
+                        "coniferous tree": 1060}
+
+
+# custom exception: job file is invalid or a step of the job failed
+class JobError(Exception):
+    pass
+
+
+# class to run a job: import of one dataset, enrichment steps and export
+class JobRunner:
+    def __init__(self, job, jobfolder, quiet=False):
+        self.__job = job
+        self.__JobFolder = jobfolder  # folder of job file: relative paths in job are relative to this folder
+        self.__name = job.get("name", "job")
+        self.__quiet = quiet
+
+        self.__db = None
+        self.__col_settings = config.ColumnNames()
+        self.__timings = []  # list of [step name, processing time in seconds]
+
+    # runs all steps of the job
+    # returns list of processing times of all steps
+    def run(self):
+        # every job uses its own database, so jobs can run in parallel
+        dbfolder = tempfile.mkdtemp(prefix="tree3d_")
+        try:
+            self.run_step("import", self.import_data, self.get_required(self.__job, "input"),
+                          os.path.join(dbfolder, "tree3d_db.sqlite"))
+
+            step_methods = {"add_geometry": self.add_geometry,
+                            "vegetation_code": self.add_vegetation_code,
+                            "default_height": self.add_default_height,
+                            "dem": self.add_dem_height,
+                            "pointcloud": self.derive_from_pointcloud,
+                            "export": self.export}
+            for step in self.__job.get("steps", []):
+                step_name = self.get_required(step, "step")
+                if step_name not in step_methods:
+                    raise JobError("Unknown step: %s" % step_name)
+                self.__db.set_performance_profile(self.get_profile(step, connection_manager.DEFAULT_PROFILE))
+                self.run_step(step_name, step_methods[step_name], step)
+
+            if "project" in self.__job:
+                self.run_step("save project", self.save_project, self.__job["project"])
+        finally:
+            if self.__db is not None:
+                self.__db.close_db_connection()
+                self.__db.delete_db()
+            shutil.rmtree(dbfolder, ignore_errors=True)
+        return self.__timings
+
+    # runs a single step and measures processing time
+    def run_step(self, step_name, method, *args):
+        start = time.perf_counter()
+        method(*args)
+        duration = time.perf_counter() - start
+        self.__timings.append([step_name, duration])
+        self.log("%s finished in %.2f s" % (step_name, duration))
+
+    # returns list of [step name, processing time in seconds] of steps finished so far
+    def get_timings(self):
+        return self.__timings
+
+    def log(self, text):
+        if not self.__quiet:
+            print("%s: %s" % (self.__name, text), flush=True)
+
+    # returns new progress reporter for a step, progress is printed to console
+    def get_progress(self, step_name):
+        return progress.ConsoleProgress("%s: %s" % (self.__name, step_name), self.__quiet)
+
+    # returns performance profile of a step: profile of step, profile of job or default
+    # raises JobError, if profile does not exist
+    def get_profile(self, step, default):
+        profile = step.get("profile", self.__job.get("profile", default))
+        if profile not in connection_manager.PROFILES:
+            raise JobError("Unknown performance profile: %s" % profile)
+        return profile
+
+    # returns absolute path of path from job file
+    def get_path(self, path):
+        return os.path.join(self.__JobFolder, path)
+
+    # returns value of key in dictionary from job file. Raises JobError if key is missing
+    @staticmethod
+    def get_required(dictionary, key):
+        if key not in dictionary:
+            raise JobError('Key "%s" missing in job' % key)
+        return dictionary[key]
+
+    # returns value from job step. If step does not contain key, default value is returned.
+    # if there is no default value either, JobError is raised
+    def get_column(self, step, key, default):
+        value = step.get(key, default)
+        if value is None:
+            raise JobError('Column "%s" not specified' % key)
+        if value not in self.__db.get_column_names():
+            raise JobError('Column "%s" not found in data' % value)
+        return value
+
+    # imports data from file, from OpenStreetMap or from project file
+    def import_data(self, input_config, dbfilepath):
+        input_type = self.get_required(input_config, "type")
+        in_memory = self.__job.get("in_memory", False)
+
+        if input_type == "csv":
+            self.__db = data.DatabaseFromCsv(dbfilepath, in_memory)
+            self.__db.set_seperator(input_config.get("seperator", ";"))
+            self.__db.set_file_encoding(input_config.get("encoding", "utf-8-sig"))
+            self.__db.set_data_inspection_limit(input_config.get("data_inspection_limit", 500))
+            if "id_columns" in input_config:
+                self.__db.set_create_id(True)
+                self.__db.set_id_columns(input_config["id_columns"])
+                self.__col_settings.set_id("IAI_TreeID")
+            if input_config.get("use_rowid", False):
+                self.__db.set_use_rowid(True)
+                self.__col_settings.set_id("ROWID")
+            self.__db.import_csv_file(self.get_path(self.get_required(input_config, "file")))
+
+        elif input_type == "xml":
+            filepath = self.get_path(self.get_required(input_config, "file"))
+            treepath = self.get_required(input_config, "treepath")
+            geompath = self.get_required(input_config, "geompath")
+            self.__db = data.DatabaseFromXml(dbfilepath, in_memory)
+            self.__db.set_data_inspection_limit(input_config.get("data_inspection_limit", 500))
+            # streaming: True/False forces (or disables) streaming import, if tree path allows it
+            # if it is not specified, streaming import is used, if inspection limit is large enough
+            streaming = input_config.get("streaming")
+            if streaming is None:
+                streaming = self.__db.use_streaming_import(treepath)
+            elif streaming:
+                streaming = data.get_xml_child_steps(treepath) is not None
+            if streaming:
+                self.__db.import_xml_file_streaming(filepath, treepath, geompath, input_config.get("ignore", ""))
+            else:
+                self.__db.import_xml_file(filepath, treepath, geompath, input_config.get("ignore", ""),
+                                          ET.parse(filepath))
+
+        elif input_type == "osm":
+            bbox_lower, bbox_left, bbox_upper, bbox_right = self.get_required(input_config, "bbox")
+            self.__db = data.DatabaseFromOSM(dbfilepath, in_memory)
+            self.__db.set_query_bbox(bbox_lower, bbox_left, bbox_upper, bbox_right,
+                                     self.get_required(input_config, "epsg"))
+            if "overpass_url" in input_config:
+                self.__db.set_overpass_url(input_config["overpass_url"])
+            self.__db.set_tiling(input_config.get("tile_size", 0.05), input_config.get("max_workers", 2))
+            if "cache_folder" in input_config:
+                self.__db.enable_cache(self.get_path(input_config["cache_folder"]),
+                                       input_config.get("cache_ttl", 86400),
+                                       input_config.get("cache_max_size", 500 * 1024 * 1024))
+            self.__db.import_osm_trees()
+            self.__col_settings.set_id("OSM_ID")
+            self.__col_settings.set_coordinates("X_VALUE_%s" % self.__db.get_output_epsg(),
+                                                "Y_VALUE_%s" % self.__db.get_output_epsg())
+
+        elif input_type == "osm_file":
+            self.__db = data.DatabaseFromOSM(dbfilepath, in_memory)
+            self.__db.import_osm_file(self.get_path(self.get_required(input_config, "file")),
+                                      input_config.get("epsg", None))
+            self.__col_settings.set_id("OSM_ID")
+            self.__col_settings.set_coordinates("X_VALUE_%s" % self.__db.get_output_epsg(),
+                                                "Y_VALUE_%s" % self.__db.get_output_epsg())
+
+        elif input_type == "project":
+            self.__db = data.DatabaseFromProject(dbfilepath, in_memory)
+            self.__db.open_project(self.get_path(self.get_required(input_config, "file")), self.__col_settings)
+
+        else:
+            raise JobError("Unknown input type: %s" % input_type)
+
+        self.log("%s trees imported" % self.__db.get_number_of_tablerecords())
+
+    # creates point geometries from x and y columns
+    def add_geometry(self, step):
+        if not self.__db.get_spatialite_status()[0]:
+            raise JobError("SpatiaLite could not be loaded: %s" % self.__db.get_spatialite_status()[1])
+
+        coords = self.__col_settings.get_coordinates()
+        xcol = self.get_column(step, "x", coords[0])
+        ycol = self.get_column(step, "y", coords[1])
+        epsg = int(self.get_required(step, "epsg"))
+
+        if not self.__db.add_geometries(xcol, ycol, epsg):
+            raise JobError("Something went wrong while creating geometries.")
+        if self.__db.get_invalid_geom_count() > 0:
+            self.log("%s rows have coordinates, that could not be converted to points. Their geometry is empty"
+                     % self.__db.get_invalid_geom_count())
+
+        # id column is not needed to create geometries, it is only remembered for later steps
+        if "id" in step:
+            self.__col_settings.set_id(self.get_column(step, "id", None))
+        self.__col_settings.set_coordinates(xcol, ycol)
+        self.__col_settings.set_geom("geom")
+
+    # adds CityGML species and class codes, derived from botanical names
+    def add_vegetation_code(self, step):
+        veg_column = self.get_column(step, "column", None)
+        if "code_file" in step:
+            code_file = self.get_path(step["code_file"])
+        else:
+            code_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "citygml_vegetation_codes.code")
+        success, text, code_list = enrichment_core.read_vegetation_codes(code_file)
+        if not success:
+            raise JobError(text)
+
+        species_col_name = "CityGML_Species_Code"
+        class_col_name = "CityGML_Class_Code"
+        self.__db.add_col(species_col_name, "INT")
+        self.__db.add_col(class_col_name, "INT")
+        self.__db.commit()
+        enrichment_core.assign_vegetation_codes(self.__db.get_db_filepath(), self.__db.get_tree_table_name(),
+                                                veg_column, species_col_name, class_col_name, code_list)
+
+        self.__col_settings.set_species(species_col_name)
+        self.__col_settings.set_class(class_col_name)
+
+    # adds the same reference height to all trees
+    def add_default_height(self, step):
+        default_height_col_name = "Height_Default"
+        height = float(self.get_required(step, "height"))
+
+        self.__db.add_col(default_height_col_name, "REAL")
+        self.__db.commit()
+
+        con = enrichment_core.BasicConnection(self.__db.get_db_filepath(), "dgm")
+        con.update_value(self.__db.get_tree_table_name(), default_height_col_name, height)
+        con.commit()
+        con.close_connection()
+
+        self.__col_settings.set_ref_height(default_height_col_name)
+
+    # imports points from files (DEM or point cloud) into database
+    # generates spatial index and convex hull afterwards
+    def import_points(self, step, mode):
+        if not self.__db.get_spatialite_status()[0]:
+            raise JobError("SpatiaLite could not be loaded: %s" % self.__db.get_spatialite_status()[1])
+
+        epsg = self.get_required(step, "epsg")
+        colstoimport = step.get("columns", [0, 1, 2])
+        reporter = self.get_progress(mode)
+
+        # points imported before (e.g. in project file) are deleted, unless they should be kept
+        if not step.get("keep_points", False):
+            con = enrichment_core.BasicDemConnection(self.__db.get_db_filepath(), epsg, mode)
+            con.delete_points()
+            con.commit()
+            con.close_connection()
+
+        points_imported = 0
+        for filename in self.get_required(step, "files"):
+            importer = enrichment_core.DemImporter(self.get_path(filename), step.get("encoding", "utf-8"),
+                                                   step.get("seperator", " "), colstoimport, epsg,
+                                                   step.get("skip_lines", 0), self.__db.get_db_filepath(), mode)
+            if "profile" in step:
+                importer.set_performance_profile(step["profile"])
+            importer.create_table()
+            success, message = importer.import_file(points_imported, reporter)
+            if not success:
+                importer.rollback()
+                importer.close_connection()
+                raise JobError("%s: %s" % (filename, message))
+            importer.commit()
+            points_imported = importer.get_rowcount()
+            importer.close_connection()
+            reporter.set_text("%s points imported" % points_imported)
+
+        con = enrichment_core.BasicDemConnection(self.__db.get_db_filepath(), epsg, mode)
+        reporter.set_text("Generating Spatial Index...")
+        con.generate_spatial_index()
+        reporter.set_text("Generating Convexhull...")
+        con.generate_convexhull()
+        con.commit()
+        con.close_connection()
+
+    # imports DEM and assigns reference height to trees
+    def add_dem_height(self, step):
+        idcol = self.get_column(step, "id", self.__col_settings.get_id())
+        geomcol = self.get_column(step, "geom", self.__col_settings.get_geom())
+
+        self.import_points(step, "dem")
+
+        self.__db.add_col("Height_DEM", "REAL")
+        self.__db.commit()
+
+        use_defaultheight = step.get("default_height") is not None
+        use_radius = step.get("search_radius") is not None
+        assigner = enrichment_core.AssignHeight(self.__db.get_db_filepath(), self.__db, idcol, geomcol,
+                                                self.__db.get_tree_table_name(), self.get_progress("dem"),
+                                                use_defaultheight, float(step.get("default_height") or 0),
+                                                use_radius, int(step.get("search_radius") or 0))
+        assigner.assign()
+        assigner.commit()
+        assigner.close_connection()
+
+        self.__col_settings.set_id(idcol)
+        self.__col_settings.set_geom(geomcol)
+        self.__col_settings.set_ref_height("Height_DEM")
+
+    # imports point cloud and derives tree height and crown height from it
+    def derive_from_pointcloud(self, step):
+        crowndiam = self.__col_settings.get_crown_diam()
+        idcol = self.get_column(step, "id", self.__col_settings.get_id())
+        geomcol = self.get_column(step, "geom", self.__col_settings.get_geom())
+        refcol = self.get_column(step, "ref_height", self.__col_settings.get_ref_height())
+        crowncol = self.get_column(step, "crown_diam", crowndiam[0])
+        crownunit = step.get("crown_diam_unit", crowndiam[2] or "m")
+        crowntype = step.get("crown_diam_type", crowndiam[1] or "is diameter")
+
+        derive_height = step.get("derive_tree_height", True)
+        derive_crown = step.get("derive_crown_height", False)
+        heightcol = None
+        if derive_crown and "tree_height" in step:
+            heightcol = self.get_column(step, "tree_height", None)
+
+        self.import_points(step, "pointcloud")
+
+        if derive_height:
+            self.__db.add_col("tree_h_pointcloud", "REAL")
+            self.__db.commit()
+        if derive_crown:
+            self.__db.add_col("crown_height_pointcloud", "REAL")
+            self.__db.commit()
+
+        processor = enrichment_core.ProcessPointcloud(self.__db.get_db_filepath(), self.__db, idcol, geomcol, refcol,
+                                                      crowncol, crownunit, crowntype,
+                                                      self.__db.get_tree_table_name(), self.get_progress("pointcloud"))
+        processor.set_height_precision(step.get("height_precision", 0.05))
+        processor.set_crown_precision(step.get("crown_precision", 0.05))
+        processor.set_default_crown_diam(float(step.get("default_crown_diam", 3)))
+        processor.set_derive_tree_height(derive_height)
+        if derive_crown:
+            processor.set_derive_crown_height(True)
+            processor.set_ground_threshold(float(step.get("ground_threshold", 0)))
+            if heightcol is not None:
+                processor.set_height_col(heightcol)
+                processor.set_use_height_from_pointcloud(False)
+            else:
+                processor.set_use_height_from_pointcloud(True)
+
+        processor.derive_tree_parameters()
+        processor.commit()
+        processor.close_connection()
+
+        self.__col_settings.set_id(idcol)
+        self.__col_settings.set_geom(geomcol)
+        self.__col_settings.set_ref_height(refcol)
+        self.__col_settings.set_crown_diam(crowncol, crowntype, crownunit)
+        if derive_height:
+            self.__col_settings.set_tree_height("tree_h_pointcloud", "m")
+        if derive_crown:
+            self.__col_settings.set_crown_height("crown_height_pointcloud")
+
+    # exports trees into output file
+    def export(self, step):
+        exp_format = self.get_required(step, "format")
+        filepath = self.get_path(self.get_required(step, "file"))
+        dbpath = self.__db.get_db_filepath()
+        epsg = int(self.get_required(step, "epsg"))
+        col_names = self.__db.get_column_names()
+        self.__db.commit()
+
+        if exp_format == "citygml":
+            exporter = export_core.CityGmlExport(filepath, dbpath)
+        elif exp_format == "cityjson":
+            exporter = export_core.CityJSONExport(filepath, dbpath)
+        elif exp_format == "ifc":
+            export_core.IFC_OID.reset()
+            exporter = export_core.IfcExport(filepath, dbpath, step.get("ifc_version", "IFC4x1"))
+        elif exp_format == "geojson":
+            exporter = export_core.GeoJSONExport(filepath, dbpath)
+            exporter.setup_transformer(epsg, 4326)
+        else:
+            raise JobError("Unknown export format: %s" % exp_format)
+
+        exporter.set_tree_table_name(self.__db.get_tree_table_name())
+        if "profile" in step:
+            exporter.set_performance_profile(step["profile"])
+        exporter.set_prettyprint(step.get("prettyprint", False))
+        exporter.set_format(exp_format)
+        exporter.set_epsg(epsg)
+
+        coords = self.__col_settings.get_coordinates()
+        exporter.set_x_col_idx(col_names.index(self.get_column(step, "x", coords[0])))
+        exporter.set_y_col_idx(col_names.index(self.get_column(step, "y", coords[1])))
+        exporter.set_ref_height_col_idx(col_names.index(self.get_column(step, "ref_height",
+                                                                        self.__col_settings.get_ref_height())))
+
+        treeheight = self.__col_settings.get_tree_height()
+        if step.get("height", treeheight[0]) is not None:
+            exporter.set_height_col_index(col_names.index(self.get_column(step, "height", treeheight[0])))
+            exporter.set_height_unit(step.get("height_unit", treeheight[1] or "m"))
+
+        trunk = self.__col_settings.get_trunk_diam()
+        if step.get("trunk_diam", trunk[0]) is not None:
+            exporter.set_trunk_diam_col_index(col_names.index(self.get_column(step, "trunk_diam", trunk[0])))
+            exporter.set_trunk_diam_unit(step.get("trunk_diam_unit", trunk[2] or "m"))
+            if step.get("trunk_is_circumference", trunk[1] == "is circumference"):
+                exporter.set_trunk_is_circ(True)
+
+        crown = self.__col_settings.get_crown_diam()
+        if step.get("crown_diam", crown[0]) is not None:
+            exporter.set_crown_diam_col_index(col_names.index(self.get_column(step, "crown_diam", crown[0])))
+            exporter.set_crown_diam_unit(step.get("crown_diam_unit", crown[2] or "m"))
+            if step.get("crown_is_circumference", crown[1] == "is circumference"):
+                exporter.set_crown_is_circ(True)
+
+        if step.get("species", self.__col_settings.get_species()) is not None:
+            exporter.set_species_col_index(col_names.index(self.get_column(step, "species",
+                                                                           self.__col_settings.get_species())))
+
+        if step.get("class", self.__col_settings.get_class()) is not None:
+            exporter.set_class_col_index(col_names.index(self.get_column(step, "class",
+                                                                         self.__col_settings.get_class())))
+
+        exporter.set_generate_generic_attributes(step.get("generic_attributes", True))
+        exporter.set_col_datatypes(self.__db.get_column_datatypes())
+        exporter.set_col_names(col_names)
+
+        default_type = step.get("default_type", "none")
+        if default_type not in DEFAULT_TYPE_TO_CODE:
+            raise JobError("Unknown default tree type: %s" % default_type)
+        exporter.set_default_export_type(DEFAULT_TYPE_TO_CODE[default_type])
+
+        if step.get("explicit", True):
+            exporter.set_geomtype("EXPLICIT")
+        else:
+            exporter.set_geomtype("IMPLICIT")
+
+        # Setup of geometries for all LODs
+        for lod in ["lod1", "lod2", "lod3", "lod4"]:
+            if lod not in step:
+                continue
+            if not hasattr(exporter, "setup_%s" % lod):
+                raise JobError("%s geometries are not supported by %s export" % (lod.upper(), exp_format))
+            geomtype = self.get_required(step[lod], "geomtype")
+            if geomtype not in GEOMTYPE_TO_GEOMCODE:
+                raise JobError("Unknown geometry type: %s" % geomtype)
+            getattr(exporter, "setup_%s" % lod)(True, GEOMTYPE_TO_GEOMCODE[geomtype], step[lod].get("segments"))
+
+        crown_height = step.get("crown_height", "same as crown diameter")
+        if crown_height not in CROWN_HEIGHT_TO_CODE:
+            raise JobError("Unknown crown height option: %s" % crown_height)
+        exporter.set_crown_height_code(CROWN_HEIGHT_TO_CODE[crown_height])
+        if CROWN_HEIGHT_TO_CODE[crown_height] == 5:
+            exporter.set_crown_height_col_index(col_names.index(
+                self.get_column(step, "crown_height_col", self.__col_settings.get_crown_height())))
+
+        if step.get("appearance", False):
+            exporter.set_use_appearance(True)
+
+        if exp_format == "ifc":
+            exporter.generate_header()
+            exporter.start_data_section()
+
+        export_status = exporter.export(self.get_progress("export"))
+        exporter.save_file()
+
+        self.log("%s trees exported to %s" % (export_status[0], filepath))
+        for lod_number, invalid in enumerate(export_status[1:], start=1):
+            if invalid > 0:
+                self.log("LOD%s: %s geometries could not be created" % (lod_number, invalid))
+
+    # saves database and column settings into project file, which can be opened in the GUI
+    def save_project(self, filepath):
+        filepath = self.get_path(filepath)
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        self.__db.save_project(filepath, self.__col_settings)
+
+
+# runs the job from a job file (called in worker processes)
+# returns path of job file, list of processing times and error message (None if job was successful)
+# if job fails, processing times of steps finished before are returned
+def run_job_file(args):
+    jobfilepath, quiet, in_memory = args
+    runner = None
+    try:
+        with open(jobfilepath, encoding="utf-8") as file:
+            job = json.load(file)
+        job.setdefault("name", os.path.splitext(os.path.basename(jobfilepath))[0])
+        if in_memory:
+            job["in_memory"] = True
+        runner = JobRunner(job, os.path.dirname(os.path.abspath(jobfilepath)), quiet)
+        return jobfilepath, runner.run(), None
+    except Exception as e:
+        timings = runner.get_timings() if runner is not None else []
+        return jobfilepath, timings, "%s: %s" % (type(e).__name__, str(e))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="tree3d %s command line interface: "
+                                                 "converts tree datasets as described in json job files"
+                                                 % config.get_program_version())
+    parser.add_argument("jobs", nargs="+", help="json job files")
+    parser.add_argument("-p", "--processes", type=int, default=1, help="number of jobs to run in parallel")
+    parser.add_argument("-r", "--report", help="write processing times of all jobs and steps to this json file")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print summary")
+    parser.add_argument("-m", "--in-memory", action="store_true",
+                        help="keep working databases in memory instead of temporary files")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    job_args = [(jobfilepath, args.quiet, args.in_memory) for jobfilepath in args.jobs]
+    if args.processes > 1 and len(job_args) > 1:
+        with Pool(min(args.processes, len(job_args))) as pool:
+            results = pool.map(run_job_file, job_args)
+    else:
+        results = [run_job_file(job_arg) for job_arg in job_args]
+    total_time = time.perf_counter() - start
+
+    # print summary
+    report = []
+    failed = 0
+    for jobfilepath, timings, error in results:
+        job_time = sum(timing[1] for timing in timings)
+        if error is None:
+            print("%s: finished in %.2f s (%s)"
+                  % (jobfilepath, job_time, ", ".join("%s %.2f s" % (name, t) for name, t in timings)))
+        else:
+            failed += 1
+            print("%s: FAILED: %s" % (jobfilepath, error))
+        report.append({"job": jobfilepath, "error": error, "time": job_time,
+                       "steps": [{"step": name, "time": t} for name, t in timings]})
+    print("%s of %s jobs finished successfully in %.2f s" % (len(results) - failed, len(results), total_time))
+
+    if args.report is not None:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump({"total_time": total_time, "processes": args.processes, "jobs": report}, file, indent=2)
+
+    return 1 if failed > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+# import of csv files
+
+import pytest
+
+import data
+
+
+def test_failed_import_is_rolled_back(tmp_path):
+    csv_path = tmp_path / "trees.csv"
+    rows = ["id;height"] + ["%s;%s" % (i, i / 10) for i in range(25)] + ["25;2.5;too many values"]
+    csv_path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+    db = data.DatabaseFromCsv(str(tmp_path / "tree3d.sqlite"))
+    db.set_seperator(";")
+    db.set_file_encoding("utf-8")
+    db.set_data_inspection_limit(5)
+    db.set_insert_batch_size(10)  # some batches are inserted before the invalid line is read
+    try:
+        with pytest.raises(data.TooManyItemsException):
+            db.import_csv_file(str(csv_path))
+        assert db.get_number_of_tablerecords() == 0
+    finally:
+        db.close_db_connection()
+        db.delete_db()
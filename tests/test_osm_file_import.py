@@ -0,0 +1,46 @@
+# imports of local OpenStreetMap files without specified output coordinate system (utm zone of first tree is used)
+
+import data
+
+OSM_FILE = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6">
+  <node id="1" lat="%s" lon="%s">
+    <tag k="natural" v="tree"/>
+    <tag k="height" v="12"/>
+  </node>
+</osm>
+"""
+
+
+def import_single_tree(tmp_path, lat, lon):
+    osm_path = tmp_path / "tree.osm"
+    osm_path.write_text(OSM_FILE % (lat, lon), encoding="utf-8")
+    db = data.DatabaseFromOSM(str(tmp_path / "tree3d.sqlite"))
+    try:
+        db.import_osm_file(str(osm_path))
+        return db.get_column_names(), list(db.get_data())
+    finally:
+        db.close_db_connection()
+        db.delete_db()
+
+
+def test_get_utm_epsg():
+    assert data.get_utm_epsg(8.4, 49.0) == 25832  # Europe: ETRS89
+    assert data.get_utm_epsg(-100, 40) == 32614  # North America: WGS84, northern hemisphere
+    assert data.get_utm_epsg(151.2, -33.9) == 32756  # Australia: WGS84, southern hemisphere
+    assert data.get_utm_epsg(20, -30) == 32734  # southern Africa: not covered by ETRS89
+    assert data.get_utm_epsg(180, 10) == 32660
+
+
+def test_import_tree_outside_europe(tmp_path):
+    columns, rows = import_single_tree(tmp_path, 40, -100)
+    assert columns[:3] == ["OSM_ID", "X_VALUE_32614", "Y_VALUE_32614"]
+    assert len(rows) == 1
+    assert 400000 < rows[0][1] < 500000  # longitude -100 is 1 degree west of central meridian of zone 14 (-99)
+    assert 4400000 < rows[0][2] < 4500000
+
+
+def test_import_tree_in_europe(tmp_path):
+    columns, rows = import_single_tree(tmp_path, 49, 8.4)
+    assert columns[:3] == ["OSM_ID", "X_VALUE_25832", "Y_VALUE_25832"]
+    assert len(rows) == 1
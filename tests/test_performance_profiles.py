@@ -0,0 +1,30 @@
+# performance profiles of database connections (see connection_manager.PROFILES)
+
+import pytest
+
+import connection_manager
+import data
+
+
+def test_profile_is_not_changed_with_open_transaction(tmp_path):
+    db = data.DatabaseFromCsv(str(tmp_path / "tree3d.sqlite"))
+    con = db._DbConnection
+    try:
+        con.execute("CREATE TABLE test (value);")
+        con.commit()
+        con.execute("INSERT INTO test VALUES (1);")
+        with pytest.raises(connection_manager.OpenTransactionException):
+            db.set_performance_profile(connection_manager.BULK_IMPORT_PROFILE)
+
+        # neither connection nor database file use the new profile
+        assert db.get_performance_profile() == connection_manager.DEFAULT_PROFILE
+        assert connection_manager.get_profile(con) == connection_manager.DEFAULT_PROFILE
+        assert connection_manager.POOL.get_default_profile(db.get_db_filepath()) == connection_manager.DEFAULT_PROFILE
+
+        db.commit()
+        db.set_performance_profile(connection_manager.BULK_IMPORT_PROFILE)
+        assert connection_manager.POOL.get_default_profile(db.get_db_filepath()) \
+            == connection_manager.BULK_IMPORT_PROFILE
+    finally:
+        db.close_db_connection()
+        db.delete_db()
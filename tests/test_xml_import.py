@@ -0,0 +1,54 @@
+# tree import and streaming import of xml files with the Berlin sample data
+
+import os
+import xml.etree.ElementTree as ET
+
+import data
+
+XML_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "berlin_pariserplatz",
+                        "Berlin-Pariser-Platz.xml")
+TREE_PATH = "./wfs:member/fis:s_wfs_baumbestand"
+GEOM_PATH = "./fis:ORA_GEOMETRY/gml:Point/gml:pos"
+IGNORE = "ORA_GEOMETRY"
+
+
+# imports sample file and returns list of (column name, data type) and all rows
+def import_xml(tmp_path, inspection_limit, streaming):
+    db = data.DatabaseFromXml(str(tmp_path / "tree3d.sqlite"))
+    db.set_data_inspection_limit(inspection_limit)
+    try:
+        if streaming:
+            db.import_xml_file_streaming(XML_FILE, TREE_PATH, GEOM_PATH, IGNORE)
+        else:
+            db.import_xml_file(XML_FILE, TREE_PATH, GEOM_PATH, IGNORE, ET.parse(XML_FILE))
+        return list(zip(db.get_column_names(), db.get_column_datatypes())), list(db.get_data())
+    finally:
+        db.close_db_connection()
+        db.delete_db()
+
+
+def test_streaming_import_equals_tree_import(tmp_path):
+    assert import_xml(tmp_path, 500, True) == import_xml(tmp_path, 500, False)
+
+
+# ZUSATZ appears for the first time after the first tree element: with inspection limit 0, streaming import
+# adds it as TEXT column behind the coordinates, while tree import finds it during inspection
+def test_late_column_with_small_inspection_limit(tmp_path):
+    tree_columns = [name for name, _ in import_xml(tmp_path, 0, False)[0]]
+    stream_columns = import_xml(tmp_path, 0, True)[0]
+    assert tree_columns.index("ZUSATZ") < tree_columns.index("X_VALUE")
+    assert stream_columns[-1] == ("ZUSATZ", "TEXT")
+    assert sorted(tree_columns) == sorted(name for name, _ in stream_columns)
+
+
+def test_streaming_import_is_default_for_large_inspection_limits():
+    db = data.DatabaseFromXml(in_memory=True)
+    try:
+        db.set_data_inspection_limit(0)
+        assert not db.use_streaming_import(TREE_PATH)
+        db.set_data_inspection_limit(data.XML_STREAMING_MIN_INSPECTION_LIMIT)
+        assert db.use_streaming_import(TREE_PATH)
+        assert not db.use_streaming_import(".//fis:s_wfs_baumbestand")  # not supported by streaming import
+    finally:
+        db.close_db_connection()
+        db.delete_db()